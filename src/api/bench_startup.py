@@ -0,0 +1,71 @@
+"""
+Cold-start benchmark for the embedding service.
+
+usage (from the project root, ideally inside the embedding image):
+    python -m src.api.bench_startup
+    EMBEDDER_THREADS=2 python -m src.api.bench_startup --runs 3
+
+Every run is a fresh interpreter, so import time is really cold. It reports
+separately: importing fastembed, building the ONNX session (load) and the
+first and second inference.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+from src.api.embedding_config import CACHE_DIR, MODEL_NAME
+
+RUN_ONCE = """
+import json, os, time
+t0 = time.perf_counter()
+from fastembed import TextEmbedding
+t1 = time.perf_counter()
+model = TextEmbedding(
+    model_name=os.environ["BENCH_MODEL"],
+    cache_dir=os.environ["BENCH_CACHE_DIR"],
+    threads=int(os.getenv("EMBEDDER_THREADS", "0")) or None,
+)
+t2 = time.perf_counter()
+list(model.embed(["Hola, esto es una prueba de arranque."]))
+t3 = time.perf_counter()
+list(model.embed(["Segunda inferencia, ya en caliente."]))
+t4 = time.perf_counter()
+print(json.dumps({
+    "import_ms": (t1 - t0) * 1000,
+    "load_ms": (t2 - t1) * 1000,
+    "first_inference_ms": (t3 - t2) * 1000,
+    "second_inference_ms": (t4 - t3) * 1000,
+}))
+"""
+
+
+def run_once(model_name: str, cache_dir: str) -> dict:
+    env = {**os.environ, "BENCH_MODEL": model_name, "BENCH_CACHE_DIR": cache_dir}
+    result = subprocess.run(
+        [sys.executable, "-c", RUN_ONCE],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--model", default=MODEL_NAME)
+    args = parser.parse_args()
+
+    runs = [run_once(args.model, CACHE_DIR) for _ in range(args.runs)]
+    print(f"model={args.model} threads={os.getenv('EMBEDDER_THREADS', 'auto')}")
+    for key in runs[0]:
+        values = sorted(run[key] for run in runs)
+        print(f"{key:>20}: median {values[len(values) // 2]:8.1f}  min {values[0]:8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,29 +1,261 @@
-from fastapi import FastAPI, HTTPException
+import asyncio
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
-from typing import List
-from pathlib import Path
+import numpy as np
+from typing import List, Optional
 import os
-from fastembed import TextEmbedding
+from src.api.embedding_cache import EmbeddingCache
+from src.api.embedding_config import CACHE_DIR, MODEL_NAME
 
-# 🛠️ Apuntamos a la carpeta .data en el top-level de tu app
-DATA_DIR = Path(__file__).resolve().parent.parent.parent / ".data"
-CACHE_DIR = str(DATA_DIR / "fastembed_cache")
+try:
+    import resource
+except ImportError:  # Windows: /stats omite la memoria del proceso
+    resource = None
 
-# El modelo nativo equivalente y optimizado en fastembed
-MODEL_NAME = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
+DIMENSION = int(os.getenv("EMBEDDER_DIMENSION", "384"))
+# hilos de ONNX Runtime por sesión (fastembed los usa para intra e inter-op); None = todos los núcleos
+THREADS = int(os.getenv("EMBEDDER_THREADS", "0")) or None
+# true: el modelo se carga en segundo plano al arrancar; false: en la primera petición
+PRELOAD = os.getenv("EMBEDDER_PRELOAD", "true").lower() == "true"
 
 # Flujo simple: fastembed busca en el cache_dir de forma automática.
 # Si el Dockerfile empaquetó los pesos ahí, los levanta en milisegundos con ONNX Runtime.
 # Si no existiera la carpeta (ej. local nuevo), descarga el .onnx plano de internet de inmediato.
-print(f"🔍 Inicializando TextEmbedding usando el caché en: {CACHE_DIR}")
-try:
-    model = TextEmbedding(model_name=MODEL_NAME, cache_dir=CACHE_DIR)    
-    print(f"Model loaded successfully: {MODEL_NAME}")
-except Exception as e:
-    print(f"❌ Error crítico cargando el modelo: {e}")
-    raise e
+model = None
+model_error: Optional[str] = None
+load_seconds: Optional[float] = None
+_load_lock = threading.Lock()
+_thread_lock = threading.Lock()
+_load_thread: Optional[threading.Thread] = None
+
+
+def load_model():
+    """
+    Builds the ONNX session and runs one warm-up inference, so the first real
+    request does not pay for it. Importing fastembed is deferred to here: the
+    HTTP server is up (and /ready answers) while this runs.
+    """
+    global model, model_error, load_seconds
+    started = time.perf_counter()
+    try:
+        from fastembed import TextEmbedding
+
+        loaded = TextEmbedding(model_name=MODEL_NAME, cache_dir=CACHE_DIR, threads=THREADS)
+        warm_up = next(iter(loaded.embed(["warm up"])))
+        if len(warm_up) != DIMENSION:
+            raise ValueError(f"{MODEL_NAME} genera vectores de {len(warm_up)}, se esperaba {DIMENSION}")
+        model = loaded
+        load_seconds = round(time.perf_counter() - started, 3)
+        print(f"Model loaded successfully: {MODEL_NAME} ({load_seconds}s)")
+    except Exception as e:
+        model_error = str(e)
+        print(f"❌ Error crítico cargando el modelo: {e}")
+
+
+def get_model():
+    # el primero que llega carga; los demás esperan el lock
+    with _load_lock:
+        if model is None and model_error is None:
+            load_model()
+    if model is None:
+        raise RuntimeError(f"Modelo no disponible: {model_error}")
+    return model
+
+
+def start_loading() -> None:
+    global _load_thread
+    # lock propio: no debe esperar a una carga en curso (se llama desde el event loop)
+    with _thread_lock:
+        if _load_thread is None and model is None and model_error is None:
+            _load_thread = threading.Thread(target=get_model, name="model-loader", daemon=True)
+            _load_thread.start()
+
+
+# Cola de inferencia: las peticiones concurrentes se agrupan en un solo lote ONNX
+MAX_BATCH_SIZE = int(os.getenv("EMBEDDER_MAX_BATCH_SIZE", "64"))
+MAX_WAIT_MS = float(os.getenv("EMBEDDER_MAX_WAIT_MS", "5"))
+INFERENCE_WORKERS = int(os.getenv("EMBEDDER_WORKERS", str(os.cpu_count() or 1)))
+
+
+def embed_texts(texts: List[str]) -> np.ndarray:
+    # .embed() devuelve un generador de arrays de NumPy: lo apilamos en una matriz (n, dim)
+    return np.stack(list(get_model().embed(texts, batch_size=max(len(texts), 1))))
+
+
+class BatchQueue:
+    """
+    Coalesces concurrent requests into one model batch: a collector task
+    takes queued jobs until `max_batch_size` texts or `max_wait_ms` since the
+    first one, then runs the batch on a thread pool so the event loop keeps
+    accepting requests. Several batches can be in flight, one per worker.
+    A single request larger than max_batch_size is run as one batch.
+    """
+
+    def __init__(self, embed_fn, max_batch_size: int, max_wait_ms: float, workers: int):
+        self.embed_fn = embed_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="embed")
+        self.queue: Optional[asyncio.Queue] = None
+        self._collector: Optional[asyncio.Task] = None
+        self._carry = None
+        self._inflight = set()
+        self._slots: Optional[asyncio.Semaphore] = None
+        self.workers = workers
+
+        self.requests = 0
+        self.texts = 0
+        self.batches = 0
+        self.max_batch_seen = 0
+        self.inference_seconds = 0.0
+
+    async def start(self) -> None:
+        self.queue = asyncio.Queue()
+        # un lote por worker: mientras todos están ocupados la cola crece y el siguiente lote sale más grande
+        self._slots = asyncio.Semaphore(self.workers)
+        self._collector = asyncio.create_task(self._collect())
+
+    async def stop(self) -> None:
+        if self._collector is not None:
+            self._collector.cancel()
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
+        self.executor.shutdown(wait=False)
+
+    async def submit(self, texts: List[str]) -> np.ndarray:
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((texts, future))
+        return await future
+
+    async def _next_job(self, timeout: Optional[float]):
+        if self._carry is not None:
+            job, self._carry = self._carry, None
+            return job
+        if timeout is None:
+            return await self.queue.get()
+        return await asyncio.wait_for(self.queue.get(), timeout)
+
+    async def _collect(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._slots.acquire()
+            jobs = [await self._next_job(None)]
+            size = len(jobs[0][0])
+            deadline = loop.time() + self.max_wait
+
+            while size < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    job = await self._next_job(timeout)
+                except asyncio.TimeoutError:
+                    break
+                if size + len(job[0]) > self.max_batch_size:
+                    # no entra en este lote: abre el siguiente
+                    self._carry = job
+                    break
+                jobs.append(job)
+                size += len(job[0])
+
+            task = asyncio.create_task(self._run(jobs))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _run(self, jobs) -> None:
+        texts = [text for job_texts, _ in jobs for text in job_texts]
+        started = time.perf_counter()
+        try:
+            matrix = await asyncio.get_running_loop().run_in_executor(
+                self.executor, self.embed_fn, texts
+            )
+        except Exception as e:
+            for _, future in jobs:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        finally:
+            self._slots.release()
 
-app = FastAPI()
+        self.requests += len(jobs)
+        self.texts += len(texts)
+        self.batches += 1
+        self.max_batch_seen = max(self.max_batch_seen, len(texts))
+        self.inference_seconds += time.perf_counter() - started
+
+        offset = 0
+        for job_texts, future in jobs:
+            if not future.done():
+                future.set_result(matrix[offset : offset + len(job_texts)])
+            offset += len(job_texts)
+
+    def metrics(self) -> dict:
+        return {
+            "queue_depth": self.queue.qsize() if self.queue is not None else 0,
+            "inflight_batches": len(self._inflight),
+            "requests": self.requests,
+            "texts": self.texts,
+            "batches": self.batches,
+            "avg_batch_size": round(self.texts / self.batches, 2) if self.batches else 0.0,
+            "max_batch_size_seen": self.max_batch_seen,
+            "avg_batch_ms": (
+                round(self.inference_seconds / self.batches * 1000, 2) if self.batches else 0.0
+            ),
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "workers": self.workers,
+        }
+
+
+batcher = BatchQueue(embed_texts, MAX_BATCH_SIZE, MAX_WAIT_MS, INFERENCE_WORKERS)
+
+# Caché de vectores por texto normalizado; con EMBEDDER_CACHE_PATH persiste entre reinicios (memmap)
+CACHE_SIZE = int(os.getenv("EMBEDDER_CACHE_SIZE", "20000"))
+CACHE_PATH = os.getenv("EMBEDDER_CACHE_PATH") or None
+# MODEL_NAME en la clave: otro modelo con la misma dimensión no reutiliza vectores viejos
+cache = EmbeddingCache(
+    DIMENSION, capacity=CACHE_SIZE, path=CACHE_PATH, namespace=MODEL_NAME
+)
+
+
+async def embed_cached(texts: List[str]) -> np.ndarray:
+    """Only the cache misses go to the model; repeated texts in a request are embedded once."""
+    vectors, missing = cache.lookup(texts)
+    if not missing:
+        return vectors
+
+    groups = {}
+    for i in missing:
+        groups.setdefault(cache.key(texts[i]), []).append(i)
+    firsts = [indexes[0] for indexes in groups.values()]
+
+    computed = await batcher.submit([texts[i] for i in firsts])
+    for row, indexes in zip(computed, groups.values()):
+        vectors[indexes] = row
+    cache.store([texts[i] for i in firsts], computed)
+    return vectors
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await batcher.start()
+    if PRELOAD:
+        start_loading()
+    yield
+    await batcher.stop()
+    cache.flush()
+
+
+app = FastAPI(lifespan=lifespan)
+
+# dtypes aceptados para la respuesta binaria (siempre little-endian)
+BINARY_DTYPES = {"float32": "<f4", "float16": "<f2"}
 
 class TextRequest(BaseModel):
     text: str
@@ -32,44 +264,86 @@ class TextBatchRequest(BaseModel):
     texts: List[str]
 
 @app.post("/embed")
-def get_embedding(request: TextRequest):
+async def get_embedding(request: TextRequest):
+    if not request.text.strip():
+        raise HTTPException(status_code=400, detail="El texto no puede estar vacío")
+
     try:
-        if not request.text.strip():
-            raise HTTPException(status_code=400, detail="El texto no puede estar vacío")
-            
-        # .embed() espera un iterable y devuelve un generador de arrays de NumPy
-        generator = model.embed([request.text])
-        vector = list(generator)[0].tolist()
-        return {"vector": vector}
+        matrix = await embed_cached([request.text])
+        return {"vector": matrix[0].tolist()}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.post("/embed_batch")
-def get_embeddings(request: TextBatchRequest):
+async def get_embeddings(request: TextBatchRequest, http_request: Request, dtype: str = "float32"):
+    """
+    JSON by default. With `Accept: application/octet-stream` the vectors are
+    returned as one raw little-endian matrix (float32, or float16 with
+    ?dtype=float16) and its shape/dtype in the X-Vector-Shape /
+    X-Vector-Dtype headers, skipping the float -> text -> float round trip.
+    """
+    binary = "application/octet-stream" in http_request.headers.get("accept", "")
+    if binary and dtype not in BINARY_DTYPES:
+        raise HTTPException(status_code=400, detail=f"dtype no soportado: {dtype}")
+
     try:
         if not request.texts:
-            return {"vectors": []}
-            
-        # 🚀 Forzamos a fastembed a procesar la lista completa como un lote único continuo
-        # Pasamos de forma explícita todos los elementos a una lista nativa primero
-        embeddings_generator = model.embed(request.texts)
-        
-        # Convertimos cada vector individual (Numpy Array) a lista de floats nativos
-        vectors = [vector.tolist() for vector in embeddings_generator]
-        
+            matrix = np.zeros((0, DIMENSION), dtype=np.float32)
+        else:
+            # 🚀 los aciertos salen de la caché; el resto entra a la cola y puede compartir inferencia
+            matrix = await embed_cached(request.texts)
+
         # Validación de seguridad para tu tranquilidad en los logs
-        print(f"📦 Batch procesado: Recibidos {len(request.texts)} textos -> Generados {len(vectors)} vectores.")
-        
-        return {"vectors": vectors}
+        print(f"📦 Batch procesado: Recibidos {len(request.texts)} textos -> Generados {len(matrix)} vectores.")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error en procesamiento por lote: {str(e)}")
 
+    if not binary:
+        return {"vectors": matrix.tolist()}
+
+    body = np.ascontiguousarray(matrix, dtype=BINARY_DTYPES[dtype]).tobytes()
+    return Response(
+        content=body,
+        media_type="application/octet-stream",
+        headers={
+            "X-Vector-Shape": f"{matrix.shape[0]},{matrix.shape[1]}",
+            "X-Vector-Dtype": dtype,
+        },
+    )
+
+
+@app.get("/metrics")
+async def get_metrics():
+    return batcher.metrics()
+
+
+@app.get("/stats")
+async def get_stats():
+    stats = {"cache": cache.stats()}
+    if resource is not None:
+        # ru_maxrss viene en KB en Linux y en bytes en macOS
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        stats["process_max_rss_bytes"] = max_rss if sys.platform == "darwin" else max_rss * 1024
+    return stats
+
+
+@app.get("/ready")
+async def get_ready():
+    """200 once the model is loaded and warmed up, 503 while loading (starts the load if lazy)."""
+    if model is not None:
+        return {"status": "ready", "model": MODEL_NAME, "load_seconds": load_seconds}
+    if model_error is not None:
+        return JSONResponse(status_code=500, content={"status": "error", "detail": model_error})
+    start_loading()
+    return JSONResponse(status_code=503, content={"status": "loading", "model": MODEL_NAME})
+
+
 @app.get("/dimension")
 async def get_dimension():
-    # Retornamos la dimensión fija (MiniLM-L6-v2 siempre es 384)
-    # Útil para inicializar tu base de datos de vectores Qdrant
-    return {"dimension": 384}
+    # Retornamos la dimensión configurada (MiniLM-L12-v2 es 384), sin esperar al modelo
+    # Útil para inicializar tu base de datos de vectores Qdrant; para saber si ya responde, usar /ready
+    return {"dimension": DIMENSION}
 
 if __name__ == "__main__":
     import uvicorn
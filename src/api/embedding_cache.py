@@ -0,0 +1,153 @@
+import hashlib
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import List, Optional
+import numpy as np
+
+KEY_BYTES = 16
+WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """
+    NFC + collapsed whitespace. Case is kept: the model is cased, so
+    "Hola" and "hola" are different embeddings.
+    """
+    return WHITESPACE.sub(" ", unicodedata.normalize("NFC", text)).strip()
+
+
+def text_key(text: str, namespace: str = "") -> bytes:
+    """
+    blake2b of the normalized text; `namespace` (the model name) is mixed in
+    so the same text embedded by another model gets another key.
+    """
+    return hashlib.blake2b(
+        normalize_text(text).encode("utf-8"),
+        digest_size=KEY_BYTES,
+        person=hashlib.blake2b(namespace.encode("utf-8"), digest_size=16).digest(),
+    ).digest()
+
+
+class EmbeddingCache:
+    """
+    LRU cache of normalized-text hash -> vector, stored in a fixed
+    (capacity, dimension) float32 matrix whose rows are reused on eviction.
+
+    With `path`, the matrix and the row keys are np.memmap files
+    (<path>.vectors / <path>.keys), so the cache survives restarts; the LRU
+    order does not, entries come back in slot order. Keys include
+    `namespace` (the model name): after switching to another model with the
+    same dimension the old rows are never hit, they are just evicted.
+
+    usage:
+        vectors, missing = cache.lookup(texts)
+        vectors[missing] = embed([texts[i] for i in missing])
+        cache.store([texts[i] for i in missing], vectors[missing])
+    """
+
+    def __init__(
+        self,
+        dimension: int,
+        capacity: int = 20_000,
+        path: Optional[str] = None,
+        namespace: str = "",
+    ):
+        self.dimension = dimension
+        self.namespace = namespace
+        self.capacity = capacity
+        self.path = path if capacity > 0 else None
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        if path and capacity > 0:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            self.vectors = self._open_memmap(
+                f"{path}.vectors", np.float32, (capacity, dimension)
+            )
+            self.keys = self._open_memmap(
+                f"{path}.keys", np.uint8, (capacity, KEY_BYTES)
+            )
+        else:
+            self.vectors = np.zeros((capacity, dimension), dtype=np.float32)
+            self.keys = np.zeros((capacity, KEY_BYTES), dtype=np.uint8)
+
+        # una fila con clave en ceros es un slot libre
+        self.index: OrderedDict[bytes, int] = OrderedDict()
+        used = self.keys.any(axis=1)
+        for slot in np.flatnonzero(used):
+            self.index[self.keys[slot].tobytes()] = int(slot)
+        self.free = [int(slot) for slot in np.flatnonzero(~used)][::-1]
+
+    @staticmethod
+    def _open_memmap(file_path: str, dtype, shape) -> np.memmap:
+        expected = int(np.prod(shape)) * np.dtype(dtype).itemsize
+        file = Path(file_path)
+        # otro tamaño o dimensión: el archivo no sirve, se empieza de cero
+        mode = "r+" if file.exists() and file.stat().st_size == expected else "w+"
+        return np.memmap(file_path, dtype=dtype, mode=mode, shape=shape)
+
+    def key(self, text: str) -> bytes:
+        return text_key(text, self.namespace)
+
+    def lookup(self, texts: List[str]) -> tuple[np.ndarray, List[int]]:
+        """
+        Returns a (len(texts), dimension) matrix with the cached rows filled
+        and the indexes of the texts that still have to be embedded.
+        """
+        vectors = np.empty((len(texts), self.dimension), dtype=np.float32)
+        missing = []
+        with self._lock:
+            for i, text in enumerate(texts):
+                key = self.key(text)
+                slot = self.index.get(key)
+                if slot is None:
+                    missing.append(i)
+                    continue
+                self.index.move_to_end(key)
+                vectors[i] = self.vectors[slot]
+            self.hits += len(texts) - len(missing)
+            self.misses += len(missing)
+        return vectors, missing
+
+    def store(self, texts: List[str], vectors: np.ndarray) -> None:
+        if self.capacity <= 0:
+            return
+        with self._lock:
+            for text, vector in zip(texts, vectors):
+                key = self.key(text)
+                slot = self.index.get(key)
+                if slot is None:
+                    if self.free:
+                        slot = self.free.pop()
+                    else:
+                        _, slot = self.index.popitem(last=False)
+                    self.index[key] = slot
+                else:
+                    self.index.move_to_end(key)
+                # clave en ceros -> vector -> clave nueva: un corte a mitad
+                # nunca deja en disco una clave apuntando a otro vector
+                self.keys[slot] = 0
+                self.vectors[slot] = vector
+                self.keys[slot] = np.frombuffer(key, dtype=np.uint8)
+
+    def flush(self) -> None:
+        if self.path:
+            with self._lock:
+                self.vectors.flush()
+                self.keys.flush()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "entries": len(self.index),
+            "capacity": self.capacity,
+            "memory_bytes": self.vectors.nbytes + self.keys.nbytes,
+            "on_disk": bool(self.path),
+        }
@@ -0,0 +1,15 @@
+import os
+from pathlib import Path
+
+# Constantes del servicio de embeddings sin dependencias pesadas:
+# bench_startup las lee sin cargar el modelo, la caché ni el pool de hilos.
+
+# 🛠️ Apuntamos a la carpeta .data en el top-level de tu app
+DATA_DIR = Path(__file__).resolve().parent.parent.parent / ".data"
+CACHE_DIR = str(DATA_DIR / "fastembed_cache")
+
+# El modelo nativo equivalente y optimizado en fastembed.
+# EMBEDDER_MODEL permite elegir otra variante (p. ej. una cuantizada) con EMBEDDER_DIMENSION acorde
+MODEL_NAME = os.getenv(
+    "EMBEDDER_MODEL", "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
+)
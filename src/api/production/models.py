@@ -1,3 +1,4 @@
+from typing import Optional
 from pydantic import BaseModel, Field
 
 
@@ -13,8 +14,13 @@ class DownloadInput(BaseModel):
 class DiscoveryInput(BaseModel):
     input_filename: str
     output_filename: str
+    # score mínimo (similitud coseno) de un candidato; min_score lo reemplaza si viene
     sensitivity: float = 0.75
     url: str
+    limit: Optional[int] = Field(None, ge=1)
+    min_score: Optional[float] = None
+    # filtro de payload de los gold samples, p. ej. {"show": "mecausa"}
+    filter: Optional[dict] = None
 
 
 class ProductionInput(BaseModel):
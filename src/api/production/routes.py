@@ -1,6 +1,6 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Query
 from .models import ProductionInput, DownloadInput, DiscoveryInput
-#from src.infra.context.common import assets
+from src.infra.context.common import get_path
 from src.domain.common import read_json
 from src.infra.context.common import storage_service
 from src.infra.context.production import prefect_service
@@ -9,6 +9,7 @@ from src.infra.context.production import (
     download_service,
     task_service,
 )
+from src.services.production.task_service import TASK_LIST_FIELDS
 
 from fastapi import HTTPException
 from fastapi.responses import FileResponse
@@ -18,6 +19,9 @@ from pydantic import BaseModel
 
 router = APIRouter(prefix="", tags=["main"])
 
+# tipos de tarea que reservan su output_filename al crearse
+RESERVING_SERVICES = {"download": download_service, "video_build": short_producer}
+
 
 @router.get("/helloworld")
 def hello_world():
@@ -88,14 +92,39 @@ def get_last_download_params():
 
 
 @router.get("/tasks")
-def get_tasks(type: str = None):
-    result = task_service.get_all(type=type)
-    return {"status": "success", "value": result}
+def get_tasks(
+    type: str = None,
+    limit: int = Query(25, ge=1, le=200),
+    cursor: str = None,
+    full: bool = False,
+):
+    # por defecto solo los campos del listado; full=true trae el payload completo
+    fields = None if full else TASK_LIST_FIELDS
+    try:
+        page = task_service.get_page(
+            type=type, limit=limit, cursor=cursor, fields=fields
+        )
+    except ValueError as e:
+        # cursor mal formado
+        raise HTTPException(status_code=400, detail=str(e))
+    return {
+        "status": "success",
+        "value": page["items"],
+        "next_cursor": page["next_cursor"],
+    }
 
 
 @router.post("/tasks/sync")
 def sync_task_status(data: TaskSyncInput):
+    task = task_service.get_by_id(data.task_id)
     task_service.update_status(data.task_id, data.status)
+
+    # el flujo falló en el worker: libera el output_filename para poder reintentar.
+    # Si la tarea ya estaba FAILED (notificación repetida) no se toca: el nombre
+    # podría estar reservado otra vez por un reintento.
+    service = RESERVING_SERVICES.get(task.type) if task else None
+    if service and data.status == "FAILED" and task.status != "FAILED":
+        service.release_filename(task.payload.get("output_filename"))
     return {"status": "success"}
 
 
@@ -104,9 +133,16 @@ async def download_video(data: DownloadInput):
     try:
         data = data.model_dump()
         download_service.validate(data)
-
-        task_id = task_service.create_task(type="download", payload=data)
-        await prefect_service.trigger_download(task_id, data)
+        # el insert es la validación definitiva (índice único en output_filename)
+        item = download_service.project(data)
+
+        try:
+            task_id = task_service.create_task(type="download", payload=data)
+            await prefect_service.trigger_download(task_id, data)
+        except Exception:
+            # libera el output_filename: si no, el reintento chocaría con "ya existe"
+            download_service.release([item.id])
+            raise
         return {
             "message": f"Sent to download: {data.get("output_filename")}",
         }
@@ -135,9 +171,16 @@ async def process_video_async(data: ProductionInput):
     try:
         data = data.model_dump()
         short_producer.validate(data)
-        task_id = task_service.create_task(type="video_build", payload=data)
-
-        await prefect_service.trigger_video_build(task_id, data)
+        # el insert es la validación definitiva (índice único en output_filename)
+        item = short_producer.project(data)
+
+        try:
+            task_id = task_service.create_task(type="video_build", payload=data)
+            await prefect_service.trigger_video_build(task_id, data)
+        except Exception:
+            # libera el output_filename: si no, el reintento chocaría con "ya existe"
+            short_producer.release(item.id)
+            raise
         return {
             "message": f"Sent to video_build: {data.get('output_filename')}",
         }
@@ -164,20 +207,48 @@ async def ingestion(folder_name: str):
 
 @router.get("/discovery/results/{result_id}")
 def get_discovery_result(result_id: str):
-    filepath = assets.get_path("metals", result_id)
+    filepath = get_path("metals", result_id)
     result = read_json(filepath)
     return {"status": "success", "values": result}
 
 
 @router.post("/discovery/results/{result_id}/trigger-download")
 async def trigger_download_for_discovery_result(result_id: str):
-    filepath = assets.get_path("metals", result_id)
+    filepath = get_path("metals", result_id)
     result = read_json(filepath)
 
-    for data in result:
-        task_id = task_service.create_task(type="download", payload=data)
-        await prefect_service.trigger_download(task_id, data)
-    return {"status": "success"}
+    # reserva todos los output_filename en un solo bulk insert (índice único)
+    reserved = download_service.project_many(result)
+    accepted = [(item, data) for item, data in zip(reserved, result) if item]
+    payloads = [data for _, data in accepted]
+
+    try:
+        task_ids = task_service.create_tasks(type="download", payloads=payloads)
+    except Exception:
+        download_service.release([item.id for item, _ in accepted])
+        raise
+    runs = await prefect_service.trigger_downloads(list(zip(task_ids, payloads)))
+
+    # los runs que no se pudieron encolar no quedan PENDING para siempre
+    # y su output_filename queda libre para reintentar
+    failed = [
+        (run["task_id"], item.id)
+        for run, (item, _) in zip(runs, accepted)
+        if run["status"] == "error"
+    ]
+    if failed:
+        task_service.mark_many_as_failed([task_id for task_id, _ in failed])
+        download_service.release([download_id for _, download_id in failed])
+
+    sent = iter(runs)
+    values = [
+        {
+            "output_filename": data.get("output_filename"),
+            **(next(sent) if item else {"status": "error", "error": "ya existe"}),
+        }
+        for item, data in zip(reserved, result)
+    ]
+    return {"status": "success", "values": values}
 
 
 # todo: migrate
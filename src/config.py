@@ -11,6 +11,8 @@ VIDEO_DIR_DOWNLOAD = str(DATA_DIR / "videos" /"downloads" )
 AUDIO_DIR_DOWNLOAD = str(DATA_DIR / "downloads" / "audio")
 VIDEO_DIR_OUTPUT = str(DATA_DIR / "videos" /"output" )
 TEMP_DIR = str(DATA_DIR / "temp")
+# Cuota total del espacio temporal compartido por los jobs de video en paralelo
+JOB_WORKSPACE_QUOTA_MB = int(os.getenv("JOB_WORKSPACE_QUOTA_MB", "4096"))
 TEMPLATES_DIR = str(DATA_DIR / "imgs" / "templates")
 FONTS_DIR = str(DATA_DIR / "assets")
 IMGS_DIR = str(DATA_DIR / "imgs")
@@ -22,21 +24,41 @@ DOWNLOAD_DIR_AUDIO = str(DATA_DIR / "downloads" / "audio")
 OUTPUT_DIR = str(DATA_DIR / "output_videos")
 METALS_DIR = str(DATA_DIR / "metals")
 INGESTION_DIR = str(DATA_DIR / "gold_samples")
+TRANSCRIPTION_DIR = str(DATA_DIR / "downloads" / "transcriptions")
 
 IMGS_DIR = str(DATA_DIR / "imgs")
 
 PROMPTS_DIR = str(DATA_DIR / "prompts")
 
+CACHE_DIR = str(DATA_DIR / "cache")
+LLM_CACHE_PATH = str(DATA_DIR / "cache" / "llm.sqlite")
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "5000"))
+LLM_CACHE_MAX_MB = int(os.getenv("LLM_CACHE_MAX_MB", "256"))
+LLM_CACHE_TTL_DAYS = float(os.getenv("LLM_CACHE_TTL_DAYS", "30"))
+TRANSCRIPTION_CACHE_PATH = str(DATA_DIR / "cache" / "transcriptions.sqlite")
+TRANSCRIPTION_CACHE_MAX_ENTRIES = int(
+    os.getenv("TRANSCRIPTION_CACHE_MAX_ENTRIES", "20000")
+)
+
 TEST_DATA_DIR = str(PROJECT_DIR / "src" / "tests" / ".data")
 MONGO_DB_NAME = "cc_db"
 MONGODB_URI = os.getenv("MONGODB_URI")
 REDIS_URI = os.getenv("REDIS_URI")
 
 
+# Máximo de deployments de Prefect disparados en paralelo por los endpoints batch
+PREFECT_TRIGGER_CONCURRENCY = int(os.getenv("PREFECT_TRIGGER_CONCURRENCY", "8"))
+
 COOKIES_PATH = str(DATA_DIR / "cookies.txt")
 WEBHOOK_URI = os.getenv("WEBHOOK_URI")
 
 QDRANTDB_URI = os.getenv("QDRANTDB_URI")
+QDRANT_COLLECTION = os.getenv("QDRANT_COLLECTION", "moments")
+# "scalar" | "binary" | vacío; solo aplica al crear la colección
+QDRANT_QUANTIZATION = os.getenv("QDRANT_QUANTIZATION") or None
+QDRANT_ON_DISK = os.getenv("QDRANT_ON_DISK", "false").lower() == "true"
+# cuántos gold samples cercanos promedian el score de cada candidato
+DISCOVERY_TOP_K = int(os.getenv("DISCOVERY_TOP_K", "5"))
 EMBEDDER_URI = os.getenv("EMBEDDER_URI")
 
 ASSETS_DIR = str(DATA_DIR / "assets")
@@ -0,0 +1,88 @@
+import os
+import shutil
+from pathlib import Path
+from typing import Optional
+
+
+class WorkspaceQuotaExceeded(Exception):
+    """Raises when the scratch space used by jobs goes above the configured quota"""
+
+    pass
+
+
+def get_dir_size(path: Path | str) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                # el archivo pudo haber sido borrado por otro job mientras recorremos
+                pass
+    return total
+
+
+class JobWorkspace:
+    """
+    Scratch directory scoped to a single job (keyed by task id).
+
+    usage:
+        with JobWorkspace(TEMP_DIR, task_id, quota_bytes=2 * 1024**3) as ws:
+            build(..., temp_dir=ws.path)
+            ws.export("debug_frame.png", TEMP_DIR)
+
+    The directory is removed on exit, whether the job succeeded or failed.
+    The quota applies to all job workspaces under the same root, so N
+    concurrent builds cannot fill the disk between them.
+    """
+
+    def __init__(
+        self,
+        base_dir: Path | str,
+        job_id: str,
+        quota_bytes: Optional[int] = None,
+    ):
+        self.root = Path(base_dir) / "jobs"
+        self.path = self.root / str(job_id)
+        self.quota_bytes = quota_bytes
+
+    def __enter__(self) -> "JobWorkspace":
+        self.check_quota()
+        self.path.mkdir(parents=True, exist_ok=True)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.cleanup()
+
+    async def __aenter__(self) -> "JobWorkspace":
+        return self.__enter__()
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        self.__exit__(exc_type, exc, tb)
+
+    def usage(self) -> int:
+        return get_dir_size(self.root) if self.root.is_dir() else 0
+
+    def check_quota(self) -> None:
+        if self.quota_bytes is None:
+            return
+        used = self.usage()
+        if used >= self.quota_bytes:
+            raise WorkspaceQuotaExceeded(
+                f"Jobs scratch space at {used / 1024**2:.1f}MB, "
+                f"quota is {self.quota_bytes / 1024**2:.1f}MB"
+            )
+
+    def export(self, filename: str, target_dir: Path | str) -> Optional[Path]:
+        """Moves a file out of the workspace so it survives the cleanup."""
+        source = self.path / filename
+        if not source.is_file():
+            return None
+        target = Path(target_dir) / filename
+        target.parent.mkdir(parents=True, exist_ok=True)
+        # os.replace es atómico: el lector nunca ve un archivo a medio escribir
+        os.replace(source, target)
+        return target
+
+    def cleanup(self) -> None:
+        shutil.rmtree(self.path, ignore_errors=True)
@@ -10,7 +10,9 @@ def get_uuid_from_string(seed_string: str) -> uuid.UUID:
     return uuid.uuid5(namespace, seed_string)
 
 
-def add_samples_from_transcriptions(directory_path: str | Path, vector_store):
+def add_samples_from_transcriptions(
+    directory_path: str | Path, vector_store, batch_size: int = 64, max_workers: int = 4
+):
     csv_path = Path(directory_path) / "metadata.csv"
     if not csv_path.exists():
         print(f"metadata.csv not found.")
@@ -21,7 +23,7 @@ def add_samples_from_transcriptions(directory_path: str | Path, vector_store):
         print(f"transcription column not found.")
         return
 
-    added_count = 0
+    items = []
     for _, row in df.iterrows():
         text = str(row.get("transcription", "")).strip()
         if not text or text == "nan":  # covers empty rows
@@ -36,7 +38,11 @@ def add_samples_from_transcriptions(directory_path: str | Path, vector_store):
 
         # ID compatible con Qdrant (UUID v5)
         text_id = get_uuid_from_string(text)
-        vector_store.add(id=text_id, text=text, metadata=metadata)
-        added_count += 1
+        items.append({"id": str(text_id), "text": text, "metadata": metadata})
+
+    # embeddings y upserts por lotes; los textos ya indexados se omiten
+    added_count = vector_store.add_many(
+        items, batch_size=batch_size, max_workers=max_workers
+    )
 
     print(f"Procesado exitosamente: {added_count} vectores enviados a indexar.")
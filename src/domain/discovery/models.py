@@ -4,8 +4,67 @@ from enum import Enum
 from datetime import datetime, timezone
 
 
-@dataclass
+def ts_to_ms(ts: str) -> int:
+    """
+    print(ts_to_ms("00:01:56.190"))  # 116190
+    """
+    # camino rápido para el formato fijo HH:MM:SS.mmm
+    if len(ts) == 12 and ts[2] == ":" and ts[5] == ":" and ts[8] == ".":
+        return (
+            int(ts[0:2]) * 3_600_000
+            + int(ts[3:5]) * 60_000
+            + int(ts[6:8]) * 1000
+            + int(ts[9:12])
+        )
+    hms, ms = ts.split(".")
+    h, m, s = map(int, hms.split(":"))
+    return (h * 3600 + m * 60 + s) * 1000 + int(ms.ljust(3, "0")[:3])
+
+
+def ms_to_ts(ms: int) -> str:
+    """
+    print(ms_to_ts(116190))  # 00:01:56.190
+    """
+    s, ms = divmod(ms, 1000)
+    m, s = divmod(s, 60)
+    h, m = divmod(m, 60)
+    return f"{h:02}:{m:02}:{s:02}.{ms:03}"
+
+
+@dataclass(slots=True)
 class TextSegment:
+    """
+    Times are kept as integer milliseconds; the "HH:MM:SS.mmm" strings are
+    only built at the I/O boundary (`start`, `end`, `to_dict`).
+    """
+
     text: str
-    start: str
-    end: str
+    start_ms: int
+    end_ms: int
+
+    @property
+    def start(self) -> str:
+        return ms_to_ts(self.start_ms)
+
+    @property
+    def end(self) -> str:
+        return ms_to_ts(self.end_ms)
+
+    @property
+    def duration_ms(self) -> int:
+        return self.end_ms - self.start_ms
+
+    @property
+    def duration(self) -> float:
+        return round(self.duration_ms / 1000, 2)
+
+    @classmethod
+    def from_dict(cls, values: dict) -> "TextSegment":
+        return cls(
+            text=values["text"],
+            start_ms=ts_to_ms(values["start"]),
+            end_ms=ts_to_ms(values["end"]),
+        )
+
+    def to_dict(self) -> dict:
+        return {"start": self.start, "end": self.end, "text": self.text}
@@ -1,27 +1,79 @@
-import webvtt
 import re
+from functools import partial
+from typing import Iterable, Iterator
 from src.domain.common import read_json
-from datetime import datetime, timedelta
+from src.infra.clients.ratelimit import estimate_tokens
+from .models import TextSegment, ts_to_ms, ms_to_ts
 
+VTT_TIMING = re.compile(
+    r"^\s*((?:\d+:)?\d{2}:\d{2}[.,]\d{3})\s+-->\s+((?:\d+:)?\d{2}:\d{2}[.,]\d{3})"
+)
 
-def parse_raw_vtt(file_path):
-    resultado = []
+
+def _normalize_vtt_ts(ts: str) -> str:
+    """
+    print(_normalize_vtt_ts("01:56.190"))     # 00:01:56.190
+    print(_normalize_vtt_ts("0:01:56,190"))   # 00:01:56.190
+    """
+    parts = ts.replace(",", ".").split(":")
+    if len(parts) == 2:
+        parts.insert(0, "0")
+    h, m, s = parts
+    return f"{int(h):02}:{m}:{s}"
+
+
+def iter_vtt_cues(file_path) -> Iterator[tuple[str, str, str]]:
+    """
+    Incremental VTT reader: yields (start, end, text) per cue, reading one
+    line at a time. Header, NOTE/STYLE blocks and cue ids are skipped.
+    """
+    with open(file_path, "r", encoding="utf-8-sig") as file:
+        timing = None
+        lines = []
+        for raw_line in file:
+            line = raw_line.rstrip("\r\n")
+            if timing is None:
+                match = VTT_TIMING.match(line)
+                if match:
+                    timing = (
+                        _normalize_vtt_ts(match.group(1)),
+                        _normalize_vtt_ts(match.group(2)),
+                    )
+                    lines = []
+                continue
+
+            # solo una línea vacía cierra el cue: YouTube usa " " como línea de texto
+            if line:
+                lines.append(line)
+            else:
+                yield timing[0], timing[1], "\n".join(lines)
+                timing = None
+
+        if timing is not None:
+            yield timing[0], timing[1], "\n".join(lines)
+
+
+def iter_raw_vtt(file_path) -> Iterator[TextSegment]:
+    """
+    Streaming version of parse_raw_vtt. Auto-captions repeat the previous
+    cue's lines, so only the lines that are new are kept.
+    """
     bloque_anterior = set()  # Mantenemos el set para búsquedas rápidas
 
-    for caption in webvtt.read(file_path):
-        texto = re.sub(r"<\d{2}:\d{2}:\d{2}\.\d{3}>|</?c>", "", caption.text)
+    for start, end, text in iter_vtt_cues(file_path):
+        texto = re.sub(r"<\d{2}:\d{2}:\d{2}\.\d{3}>|</?c>", "", text)
         texto = texto.replace("&nbsp;", " ")
         lineas_actuales = [l.strip() for l in re.findall(r"\S.+", texto)]
         lineas_nuevas = [l for l in lineas_actuales if l not in bloque_anterior]
 
         if lineas_nuevas:
             sentence = " ".join(lineas_nuevas)
-            resultado.append(
-                {"start": caption.start, "end": caption.end, "text": sentence}
-            )
+            yield TextSegment(sentence, ts_to_ms(start), ts_to_ms(end))
         bloque_anterior = set(lineas_actuales)
 
-    return resultado
+
+def parse_raw_vtt(file_path):
+    return [seg.to_dict() for seg in iter_raw_vtt(file_path)]
 
 
 def format_seconds(secs: float) -> str:
@@ -36,18 +88,17 @@ def format_seconds(secs: float) -> str:
     return f"{int(h):02}:{int(m):02}:{s:06.3f}"
 
 
-def parse_raw_transcription(file_path):
+def iter_raw_transcription(file_path) -> Iterator[TextSegment]:
     result = read_json(file_path)
-    result = result["segments"]
-    _result = []
-    for seg in result:
-        item = {
-            "start": format_seconds(seg["start"]),
-            "end": format_seconds(seg["end"]),
-            "text": seg["text"],
-        }
-        _result.append(item)
-    return _result
+    for seg in result["segments"]:
+        # segundos (float) -> ms, sin pasar por strings
+        yield TextSegment(
+            seg["text"], round(seg["start"] * 1000), round(seg["end"] * 1000)
+        )
+
+
+def parse_raw_transcription(file_path):
+    return [seg.to_dict() for seg in iter_raw_transcription(file_path)]
 
 
 def compute_duration(start_ts: str, end_ts: str) -> float:
@@ -57,103 +108,149 @@ def compute_duration(start_ts: str, end_ts: str) -> float:
     result    = 0.01
     """
 
-    # efficient computing
-    def ts_to_seconds(ts: str) -> float:
-        hms, ms = ts.split(".")
-        h, m, s = map(int, hms.split(":"))
-        return (h * 3600) + (m * 60) + s + (int(ms) / 1000)
+    return round((ts_to_ms(end_ts) - ts_to_ms(start_ts)) / 1000, 2)
+
+
+# --- GROUP STAGES ---
+# Each stage consumes and yields one TextSegment at a time (the input is
+# never mutated), so they can be chained over iter_raw_vtt without
+# materialising lists. The list based group_* functions below are thin
+# wrappers over them: every rule lives in one place.
+
 
-    duration = ts_to_seconds(end_ts) - ts_to_seconds(start_ts)
-    return round(duration, 2)
+class _Group:
+    __slots__ = ("start_ms", "end_ms", "parts")
 
+    def __init__(self, seg: TextSegment):
+        self.start_ms = seg.start_ms
+        self.end_ms = seg.end_ms
+        self.parts = [seg.text]
 
-def group_when_starts_with_uppercase(text_segments):
-    result = []
-    result.append(text_segments[0])
-    for seg in text_segments[1:]:
-        new_topic = seg["text"][0].isupper()
-        if new_topic:
-            result.append(seg)
+    def extend(self, seg: TextSegment) -> None:
+        self.end_ms = seg.end_ms
+        self.parts.append(seg.text)
+
+    def close(self) -> TextSegment:
+        return TextSegment(" ".join(self.parts), self.start_ms, self.end_ms)
+
+
+def iter_group_when_starts_with_uppercase(
+    text_segments: Iterable[TextSegment],
+) -> Iterator[TextSegment]:
+    current = None
+    for seg in text_segments:
+        if current is None:
+            current = _Group(seg)
+        elif seg.text[:1].isupper():
+            yield current.close()
+            current = _Group(seg)
         else:
-            result[-1]["end"] = seg["end"]
-            result[-1]["text"] += " " + seg["text"]
+            current.extend(seg)
 
-    return result
+    if current is not None:
+        yield current.close()
 
 
-def group_when_ends_without_dot(text_segments):
-    result = []
-    result.append(text_segments[0])
-    for seg in text_segments[1:]:
-        the_topic_continues = not result[-1]["text"].endswith(".")
-        if the_topic_continues:
-            result[-1]["end"] = seg["end"]
-            result[-1]["text"] += " " + seg["text"]
+def iter_group_when_ends_without_dot(
+    text_segments: Iterable[TextSegment],
+) -> Iterator[TextSegment]:
+    current = None
+    for seg in text_segments:
+        if current is None:
+            current = _Group(seg)
+        elif not current.parts[-1].endswith("."):
+            current.extend(seg)
         else:
-            result.append(seg)
+            yield current.close()
+            current = _Group(seg)
 
-    return result
+    if current is not None:
+        yield current.close()
 
 
-def group_by_duration(
-    segments: list[dict], min_dur: float = 75, max_dur: float = 90
-) -> list[dict]:
-    grouped = []
-    current = {
-        "start": segments[0]["start"],
-        "end": segments[0]["end"],
-        "text": segments[0]["text"],
-    }
-    grouped.append(current)
-    # Iteramos desde el segundo elemento
-    for seg in segments[1:]:
-        curr_dur = compute_duration(current["start"], current["end"])
-        new_dur = curr_dur + compute_duration(seg["start"], seg["end"])
-
-        # Si no hemos alcanzado el mínimo y no excedemos el máximo al sumarle el segmento actual, agrupamos
-        if curr_dur < min_dur and new_dur <= max_dur:
-            current["end"] = seg["end"]
-            current["text"] += " " + seg["text"]
+def iter_group_by_duration(
+    text_segments: Iterable[TextSegment], min_dur: float = 75, max_dur: float = 90
+) -> Iterator[TextSegment]:
+    min_ms, max_ms = min_dur * 1000, max_dur * 1000
+    current = None
+    for seg in text_segments:
+        if current is None:
+            current = _Group(seg)
+            continue
+
+        curr_ms = current.end_ms - current.start_ms
+        new_ms = curr_ms + seg.end_ms - seg.start_ms
+
+        if curr_ms < min_ms and new_ms <= max_ms:
+            current.extend(seg)
         else:
-            # Creamos un nuevo grupo y avanzamos el puntero de referencia
-            current = {
-                "start": seg["start"],
-                "end": seg["end"],
-                "text": seg["text"],
-            }
-            grouped.append(current)
-
-    return grouped
-
-
-def group_when_starts_with_connector(text_segments):
-    # fmt: off
-    MONOSILABOS_CONNECTORS = {"sí", "no", "ya", "uy", "ah", "eh", "ay", "ajá", "dale",}
-    CONTINUITY_CONNECTORS = {
-        "pero", "porque", "entonces", "aunque", "y", "o", "además",
-        "también", "asimismo", "tampoco", "inclusive", "incluso", "luego", "después",
-        "mientras", "ahora", "total","aparte"
-    }
-    SUBJECT_CONNECTORS = {
-        "él", "ella", "ellos", "ellas", "este", "esta", "esto", "estos", "estas",
-        "ese", "esa", "eso", "esos", "esas", "alguien", "nadie", "todos", "todas",
-        "algunos", "algunas", "ninguno", "ambos", "ambas", "nosotros",
-    }
-    # fmt: on
-    CONNECTORS = MONOSILABOS_CONNECTORS | CONTINUITY_CONNECTORS | SUBJECT_CONNECTORS
-
-    result = []
-    result.append(text_segments[0])
-    for seg in text_segments[1:]:
-        first_word = seg["text"].split()[0].lower().strip(". , ? ! ¿ i [ ]")
+            yield current.close()
+            current = _Group(seg)
+
+    if current is not None:
+        yield current.close()
+
+
+# fmt: off
+MONOSILABOS_CONNECTORS = {"sí", "no", "ya", "uy", "ah", "eh", "ay", "ajá", "dale",}
+CONTINUITY_CONNECTORS = {
+    "pero", "porque", "entonces", "aunque", "y", "o", "además",
+    "también", "asimismo", "tampoco", "inclusive", "incluso", "luego", "después",
+    "mientras", "ahora", "total","aparte"
+}
+SUBJECT_CONNECTORS = {
+    "él", "ella", "ellos", "ellas", "este", "esta", "esto", "estos", "estas",
+    "ese", "esa", "eso", "esos", "esas", "alguien", "nadie", "todos", "todas",
+    "algunos", "algunas", "ninguno", "ambos", "ambas", "nosotros",
+}
+# fmt: on
+CONNECTORS = MONOSILABOS_CONNECTORS | CONTINUITY_CONNECTORS | SUBJECT_CONNECTORS
+
+
+def iter_group_when_starts_with_connector(
+    text_segments: Iterable[TextSegment],
+) -> Iterator[TextSegment]:
+    current = None
+    for seg in text_segments:
+        if current is None:
+            current = _Group(seg)
+            continue
+
+        words = seg.text.split()
+        first_word = words[0].lower().strip(". , ? ! ¿ i [ ]") if words else ""
         the_topic_continues = first_word in CONNECTORS
         if the_topic_continues:
-            result[-1]["end"] = seg["end"]
-            result[-1]["text"] += " " + seg["text"]
+            current.extend(seg)
         else:
-            result.append(seg)
+            yield current.close()
+            current = _Group(seg)
+
+    if current is not None:
+        yield current.close()
+
+
+def _group_dicts(text_segments: list[dict], stage) -> list[dict]:
+    segments = (TextSegment.from_dict(seg) for seg in text_segments)
+    return [seg.to_dict() for seg in stage(segments)]
+
+
+def group_when_starts_with_uppercase(text_segments: list[dict]) -> list[dict]:
+    return _group_dicts(text_segments, iter_group_when_starts_with_uppercase)
+
+
+def group_when_ends_without_dot(text_segments: list[dict]) -> list[dict]:
+    return _group_dicts(text_segments, iter_group_when_ends_without_dot)
+
+
+def group_by_duration(
+    segments: list[dict], min_dur: float = 75, max_dur: float = 90
+) -> list[dict]:
+    by_duration = partial(iter_group_by_duration, min_dur=min_dur, max_dur=max_dur)
+    return _group_dicts(segments, by_duration)
 
-    return result
+
+def group_when_starts_with_connector(text_segments: list[dict]) -> list[dict]:
+    return _group_dicts(text_segments, iter_group_when_starts_with_connector)
 
 
 def format_to_text_block(text_segments):
@@ -169,12 +266,44 @@ def format_to_text_block(text_segments):
 
     lines = []
     for i, ts in enumerate(text_segments):
-        duration = compute_duration(ts["start"], ts["end"])
         line = f"[{i}]{ts["text"]}"
         lines.append(line)
     return "\n".join(lines)
 
 
+def split_into_windows(
+    text_segments, max_tokens: int = 3000, overlap: int = 5
+) -> list[tuple[int, list]]:
+    """
+    Splits segments into consecutive windows that fit in `max_tokens` once
+    formatted with format_to_text_block. Consecutive windows share `overlap`
+    segments so a moment cut by a window border is still seen whole.
+
+    Returns [(offset, window_segments), ...] where offset is the global index
+    of window_segments[0].
+    """
+    windows = []
+    start = 0
+    total = len(text_segments)
+    while start < total:
+        end = start
+        budget = 0
+        while end < total:
+            cost = estimate_tokens(f"[{end - start}]{text_segments[end]["text"]}\n")
+            if end > start and budget + cost > max_tokens:
+                break
+            budget += cost
+            end += 1
+
+        windows.append((start, text_segments[start:end]))
+        if end >= total:
+            break
+        # el solape nunca puede impedir que avancemos
+        start = max(start + 1, end - overlap)
+
+    return windows
+
+
 def filter_by_duration(text_segments, min_sec=25.0, max_sec=70.0):
     segmentos_filtrados = []
 
@@ -189,58 +318,60 @@ def filter_by_duration(text_segments, min_sec=25.0, max_sec=70.0):
     return segmentos_filtrados
 
 
-from .models import TextSegment
+def iter_vtt(archivo_vtt) -> Iterator[TextSegment]:
+    """Lazy parse + grouping pipeline; downstream stages can start right away."""
+    result = iter_raw_vtt(archivo_vtt)
+    result = iter_group_when_starts_with_uppercase(result)
+    result = iter_group_when_ends_without_dot(result)
+    return result
 
 
-def parse_vtt(archivo_vtt):
-    result = parse_raw_vtt(archivo_vtt)
-    result = group_when_starts_with_uppercase(result)
-    result = group_when_ends_without_dot(result)
-    result = group_by_duration(result)
-    result = [TextSegment(**values) for values in result]
-    return result
+def parse_vtt(archivo_vtt) -> list[TextSegment]:
+    return list(iter_group_by_duration(iter_vtt(archivo_vtt)))
 
-def parse_vtt_(archivo_vtt):
-    result = parse_raw_vtt(archivo_vtt)
-    result = group_when_starts_with_uppercase(result)
-    result = group_when_ends_without_dot(result)
-    return result
+def parse_vtt_(archivo_vtt) -> list[dict]:
+    return [seg.to_dict() for seg in iter_vtt(archivo_vtt)]
 
 
-def parse_transcription(filepath: str):
-    result = parse_raw_transcription(filepath)
-    result = group_when_starts_with_uppercase(result)
-    result = group_when_ends_without_dot(result)
-    result = group_by_duration(result)
-    result = [TextSegment(**values) for values in result]
+def iter_transcription(filepath: str) -> Iterator[TextSegment]:
+    result = iter_raw_transcription(filepath)
+    result = iter_group_when_starts_with_uppercase(result)
+    result = iter_group_when_ends_without_dot(result)
     return result
 
 
-def parse_transcription_(filepath: str):
-    result = parse_raw_transcription(filepath)
-    result = group_when_starts_with_uppercase(result)
-    result = group_when_ends_without_dot(result)
-    return result
+def parse_transcription(filepath: str) -> list[TextSegment]:
+    return list(iter_group_by_duration(iter_transcription(filepath)))
+
+
+def parse_transcription_(filepath: str) -> list[dict]:
+    return [seg.to_dict() for seg in iter_transcription(filepath)]
 
 def round_time(s: str, mode: str = "floor") -> str:
     """
     print(round_time("00:01:56.200", "floor"))  # "00:01:56"
     print(round_time("00:01:56.200", "ceil"))   # "00:01:57"
     """
-    t = datetime.strptime(s, "%H:%M:%S.%f")
-    if mode == "ceil" and t.microsecond > 0:
-        t += timedelta(seconds=1)
-    return t.strftime("%H:%M:%S")
+    return _round_ms(ts_to_ms(s), mode)
+
+
+def _round_ms(ms: int, mode: str = "floor") -> str:
+    secs, rest = divmod(ms, 1000)
+    if mode == "ceil" and rest > 0:
+        secs += 1
+    return ms_to_ts(secs * 1000)[:8]
 
 
 def parse_discovery_results(result, prefix, url):
     mapped_data = []
     for idx, item in enumerate(result):
+        # cada timestamp se parsea una sola vez
+        start_ms, end_ms = ts_to_ms(item["start"]), ts_to_ms(item["end"])
         mapped_data.append(
             {
                 "id": idx,
-                "start_segment": round_time(item["start"], "floor"),
-                "end_segment": round_time(item["end"], "ceil"),
+                "start_segment": _round_ms(start_ms, "floor"),
+                "end_segment": _round_ms(end_ms, "ceil"),
                 "start": item["start"],
                 "end": item["end"],
                 "text": item["text"],
@@ -248,7 +379,7 @@ def parse_discovery_results(result, prefix, url):
                 "force_download": False,
                 "url": url,
                 "file_type": "video",
-                "duration": compute_duration(item["start"], item["end"]),
+                "duration": round((end_ms - start_ms) / 1000, 2),
                 "score": item["score"],
             }
         )
@@ -0,0 +1,43 @@
+from typing import Iterable, Optional
+from .models import TextSegment
+
+
+def score_candidates(
+    candidates: Iterable[TextSegment],
+    vector_store,
+    limit: int = 5,
+    filter: Optional[dict] = None,
+) -> list[dict]:
+    """
+    Scores every candidate by its similarity to the gold samples: the mean of
+    its top-`limit` matches. All candidates go in one search_batch call (one
+    embedding batch), so hundreds of clips per video cost a single pass.
+
+    Works with any store whose search_batch returns Qdrant-shaped responses
+    (QdrantVectorStore, NumpyVectorIndex). `filter` restricts the gold samples
+    compared against, e.g. {"show": "mecausa"}. Returns dicts sorted by score.
+    """
+    candidates = list(candidates)
+    if not candidates:
+        return []
+
+    responses = vector_store.search_batch(
+        [c.text for c in candidates], limit=limit, filter=filter
+    )
+
+    scored = []
+    for candidate, response in zip(candidates, responses):
+        points = response.points
+        score = sum(p.score for p in points) / len(points) if points else 0.0
+        scored.append(
+            {
+                **candidate.to_dict(),
+                "score": round(score, 4),
+                "matches": [
+                    (p.payload or {}).get("filename", str(p.id)) for p in points
+                ],
+            }
+        )
+
+    scored.sort(key=lambda item: item["score"], reverse=True)
+    return scored
@@ -1,10 +1,14 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import pandas as pd
 from typing import Callable
 
 
-def gen_video_transcriptions(directory_path: str | Path, transcriber_fn: Callable):
-    folder = Path(directory_path)
+def load_metadata(folder: Path) -> tuple[pd.DataFrame, dict]:
     csv_path = folder / "metadata.csv"
     mp4_files = {f.stem: f for f in folder.glob("*.mp4")}
 
@@ -17,20 +21,134 @@ def gen_video_transcriptions(directory_path: str | Path, transcriber_fn: Callabl
 
     if "transcription" not in df.columns:
         df["transcription"] = ""
+    # read_csv convierte las celdas vacías en NaN ("nan" no es una transcripción)
+    df["transcription"] = df["transcription"].fillna("").astype(str)
+
+    return df, mp4_files
+
+
+def save_metadata(df: pd.DataFrame, csv_path: Path) -> None:
+    """Writes to a temp file and swaps it in, so a crash never leaves half a CSV."""
+    temp_path = csv_path.with_name(csv_path.name + ".tmp")
+    df.to_csv(temp_path, index=False)
+    os.replace(temp_path, csv_path)
+
+
+def gen_video_transcriptions(
+    directory_path: str | Path, transcriber_fn: Callable, workers: int = 2
+) -> dict:
+    """Single-backend entry point, kept for existing callers."""
+    return gen_video_transcriptions_concurrent(
+        directory_path, [transcriber_fn], workers_per_transcriber=workers
+    )
+
+
+def get_audio_seconds(result: dict) -> float:
+    """Audio length covered by a transcription (end of its last segment)."""
+    segments = result.get("segments") or []
+    return max((float(seg.get("end") or 0) for seg in segments), default=0.0)
+
+
+def gen_video_transcriptions_concurrent(
+    directory_path: str | Path,
+    transcriber_fns: list[Callable],
+    workers_per_transcriber: int = 2,
+    save_every: int = 20,
+    save_interval_seconds: float = 30,
+) -> dict:
+    """
+    Same output as gen_video_transcriptions, but the pending mp4s are
+    shared by `workers_per_transcriber` threads per backend (e.g. Groq and
+    Deepgram), so faster backends naturally take more files.
+
+    metadata.csv is rewritten every `save_every` results or
+    `save_interval_seconds`, and once at the end: after a crash, running it
+    again only transcribes what is still empty (at most one checkpoint of
+    work is redone). Failed files are left empty for the next run.
 
-    # 2. Transcribir solo los registros sin texto previo
-    transcriptions = []
-    for _, row in df.iterrows():
-        text = str(row["transcription"]).strip()
+    usage:
+        gen_video_transcriptions_concurrent(
+            INGESTION_DIR, [transcriber.transcribe, deepgram_transcriber.transcribe]
+        )
+    """
+    folder = Path(directory_path)
+    csv_path = folder / "metadata.csv"
+    df, mp4_files = load_metadata(folder)
+
+    pending = queue.Queue()
+    for idx, row in df.iterrows():
+        file_path = mp4_files.get(str(row["filename"]))
+        if file_path and not row["transcription"].strip():
+            pending.put((idx, file_path))
+
+    total = pending.qsize()
+    stats = {"done": 0, "failed": 0, "audio_seconds": 0.0}
+    lock = threading.Lock()
+    # la escritura del CSV va con su propio lock: los workers no la esperan
+    save_lock = threading.Lock()
+    started = time.perf_counter()
+    checkpoint = {"unsaved": 0, "at": started, "taken": 0, "saved": 0}
+
+    def save_snapshot(snapshot: pd.DataFrame, number: int) -> None:
+        with save_lock:
+            # una copia más vieja que la ya escrita no debe pisarla
+            if number > checkpoint["saved"]:
+                save_metadata(snapshot, csv_path)
+                checkpoint["saved"] = number
+
+    def worker(transcriber_fn: Callable) -> None:
+        while True:
+            try:
+                idx, file_path = pending.get_nowait()
+            except queue.Empty:
+                return
 
-        if not text:
-            file_path = mp4_files.get(str(row["filename"]))
-            res = transcriber_fn(str(file_path)) if file_path else {}
-            text = res.get("text", "") if isinstance(res, dict) else ""
+            try:
+                res = transcriber_fn(str(file_path))
+            except Exception as e:
+                print(f"❌ [{file_path.name}] {e}")
+                with lock:
+                    stats["failed"] += 1
+                continue
 
-        transcriptions.append(text)
+            res = res if isinstance(res, dict) else {}
+            snapshot = None
+            with lock:
+                df.at[idx, "transcription"] = res.get("text", "")
+                stats["done"] += 1
+                stats["audio_seconds"] += get_audio_seconds(res)
+                now = time.perf_counter()
+                print(
+                    f"[{stats['done'] + stats['failed']}/{total}] {file_path.name} "
+                    f"({stats['audio_seconds'] / (now - started):.1f} s audio/s)"
+                )
 
-    # 3. Guardar cambios
-    df["transcription"] = transcriptions
-    df.to_csv(csv_path, index=False)
-    print(f"Procesado: {csv_path}")
+                checkpoint["unsaved"] += 1
+                if (
+                    checkpoint["unsaved"] >= save_every
+                    or now - checkpoint["at"] >= save_interval_seconds
+                ):
+                    checkpoint["unsaved"], checkpoint["at"] = 0, now
+                    checkpoint["taken"] += 1
+                    snapshot, number = df.copy(), checkpoint["taken"]
+
+            if snapshot is not None:
+                save_snapshot(snapshot, number)
+
+    workers = [fn for fn in transcriber_fns for _ in range(workers_per_transcriber)]
+    with ThreadPoolExecutor(max_workers=max(1, len(workers))) as pool:
+        for future in [pool.submit(worker, fn) for fn in workers]:
+            future.result()
+
+    save_snapshot(df, checkpoint["taken"] + 1)
+
+    elapsed = time.perf_counter() - started
+    stats["wall_seconds"] = round(elapsed, 2)
+    stats["audio_seconds_per_second"] = (
+        round(stats["audio_seconds"] / elapsed, 2) if elapsed else 0.0
+    )
+    print(
+        f"Procesado: {csv_path} — {stats['done']} ok, {stats['failed']} con error, "
+        f"{stats['audio_seconds_per_second']} s de audio por segundo"
+    )
+    return stats
@@ -11,4 +11,6 @@ class Download:
     end_segment: str
     output_filename: str
     force_download: bool = False
+    file_type: str = "vtt"
+    created_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
     id: str = field(default_factory=lambda: str(uuid4()))
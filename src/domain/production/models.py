@@ -11,6 +11,8 @@ class Download:
     end_segment: str
     output_filename: str
     force_download: bool = False
+    file_type: str = "vtt"
+    created_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
     id: str = field(default_factory=lambda: str(uuid4()))
 
 
@@ -18,11 +20,11 @@ class Download:
 class Production:
     input_filename: str
     output_filename: str
-    font_name: str
-    watermark_text: str
+    template_name: str
     frame_ts: str
     hook_text: str
     debug_frame: bool = True
+    created_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
     id: str = field(default_factory=lambda: str(uuid4()))
 
 
@@ -57,6 +57,37 @@ def get_cmd_assemble_video_and_template2(
         ]            
         return command
 
+
+def get_filter_spec_assemble(
+    debug: bool, speed: float = 1.3, pre_filter: str = ""
+) -> str:
+    """
+    Builds the filter_complex for pad + overlay (+ setpts/atempo when not debug).
+    `pre_filter` is an optional chain (e.g. scale/crop) applied to [0:v] before
+    padding, so resizing and assembling can share a single decode/encode.
+    """
+    CANVAS_W = 720
+    CANVAS_H = 1280
+    POS_Y = 180  # La posición vertical donde caerá tu video recortado
+
+    video_in = f"[0:v]{pre_filter}," if pre_filter else "[0:v]"
+
+    if debug:
+        # En modo debug no aceleramos audio ni requerimos reencodar nada pesado
+        return (
+            f"{video_in}pad={CANVAS_W}:{CANVAS_H}:(ow-iw)/2:{POS_Y}:black[padded];"
+            f"[padded][1:v]overlay=0:0"
+        )
+
+    # Acelerar video (setpts) y audio (atempo)
+    return (
+        f"{video_in}pad={CANVAS_W}:{CANVAS_H}:(ow-iw)/2:{POS_Y}:black,"
+        f"setpts=PTS/{speed}[padded_fast];"
+        f"[padded_fast][1:v]overlay=0:0[v_out];"
+        f"[0:a]atempo={speed}[a_out]"
+    )
+
+
 # todo: improve, split speeding from assembling
 def get_cmd_assemble_video_and_template(
     video_input: str,
@@ -65,19 +96,13 @@ def get_cmd_assemble_video_and_template(
     debug: bool,
     temp_dir: Path | str,
     speed: float = 1.3,
+    pre_filter: str = "",
 ) -> list[str]:
     """Generates the appropriate FFmpeg execution array."""
-    CANVAS_W = 720
-    CANVAS_H = 1280
-    POS_Y = 180  # La posición vertical donde caerá tu video recortado
+    filter_spec = get_filter_spec_assemble(debug, speed, pre_filter)
 
     # fmt: off
     if debug:
-        # En modo debug no aceleramos audio ni requerimos reencodar nada pesado
-        filter_spec = (
-            f"[0:v]pad={CANVAS_W}:{CANVAS_H}:(ow-iw)/2:{POS_Y}:black[padded];"
-            f"[padded][1:v]overlay=0:0"
-        )
         target_output = Path(temp_dir)/ "debug_frame.png"
         command = [
             "ffmpeg", "-y",
@@ -93,13 +118,6 @@ def get_cmd_assemble_video_and_template(
         ]
         return command
     else:
-        # Modificamos filter_spec para acelerar video (setpts) y audio (atempo)
-        filter_spec = (
-            f"[0:v]pad={CANVAS_W}:{CANVAS_H}:(ow-iw)/2:{POS_Y}:black,"
-            f"setpts=PTS/{speed}[padded_fast];"
-            f"[padded_fast][1:v]overlay=0:0[v_out];"
-            f"[0:a]atempo={speed}[a_out]"
-        )
         encoders = [
             "-c:v", "libx264", 
             "-crf", "18",
@@ -123,9 +141,11 @@ def get_cmd_assemble_video_and_template(
         return command
 
 
-async def assemble_video_and_template(input_path, output_path, ui_png, debug, temp_dir) -> str:
+async def assemble_video_and_template(
+    input_path, output_path, ui_png, debug, temp_dir, pre_filter: str = ""
+) -> str:
     ffmpeg_cmd = get_cmd_assemble_video_and_template(
-        input_path, output_path, ui_png, debug, temp_dir
+        input_path, output_path, ui_png, debug, temp_dir, pre_filter=pre_filter
     )
 
     print(f"{'DEBUG' if debug else 'PRODUCTION'} MODE: Assembling (Async)...")
@@ -5,8 +5,10 @@ from src.domain.common import run_subprocess
 
 class Extractor:
 
-    def __init__(self, temp_path):
+    def __init__(self, temp_path, frame_name: str = "video_frame.png"):
+        # temp_path deberia ser el workspace del job para no pisar frames ajenos
         self.temp_path = temp_path
+        self.frame_name = frame_name
 
     async def run_async(
         self,
@@ -39,7 +41,7 @@ class Extractor:
         return output
 
     def get_frame_path(self):
-        output_image_path = str(Path(self.temp_path) / "video_frame.png")
+        output_image_path = str(Path(self.temp_path) / self.frame_name)
         return output_image_path
 
     def get_comand(self, input, output, timestamp="00:00:01"):
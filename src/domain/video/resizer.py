@@ -3,17 +3,25 @@ from src.domain.common import run_async_subprocess
 from src.domain.common import run_subprocess
 
 
-def get_filter_zoomed_square(input, output):
+def get_vf_zoomed_square() -> str:
+    """Filter chain only (scale + crop), reusable inside a bigger filter_complex."""
     CANVAS_W, CANVAS_H = 720, 1280
     ZOOM_FACTOR = 1.53
     TARGET_W = int(CANVAS_W * ZOOM_FACTOR)  # 1620px
 
     # fmt: off
-    video_filter = (
+    return (
         f"scale={TARGET_W}:-1:flags=fast_bilinear,"
         f"setsar=1:1,"
-        f"crop={CANVAS_W}:ih,"
-    )        
+        f"crop={CANVAS_W}:ih"
+    )
+    # fmt: on
+
+
+def get_filter_zoomed_square(input, output):
+    video_filter = get_vf_zoomed_square()
+
+    # fmt: off
     encoders = [
         "-c:v", "libx264",
         "-crf", "14", # the lower the better fidelity quality of input, 14 is ok.
@@ -0,0 +1,341 @@
+import hashlib
+import re
+import subprocess
+from dataclasses import dataclass
+from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path
+from typing import BinaryIO, Iterator, Optional
+
+VIDEO_SUFFIXES = {".mp4", ".mkv", ".mov", ".avi"}
+
+SILENCE_START = re.compile(r"silence_start:\s*(-?\d+(?:\.\d+)?)")
+SILENCE_END = re.compile(r"silence_end:\s*(-?\d+(?:\.\d+)?)")
+
+
+@lru_cache(maxsize=None)
+def has_encoder(name: str) -> bool:
+    try:
+        result = subprocess.run(
+            ["ffmpeg", "-hide_banner", "-encoders"],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return False
+    return any(line.split()[1:2] == [name] for line in result.stdout.splitlines())
+
+
+class AudioStream:
+    """
+    Extracts the audio track of a video through an ffmpeg pipe, 16 kHz mono,
+    as Opus in Ogg (FLAC when ffmpeg has no libopus). Nothing touches disk:
+    the upload reads ffmpeg's stdout while it is still decoding.
+
+    usage:
+        with AudioStream(video_path) as audio:
+            client.audio.transcriptions.create(file=(audio.filename, audio), ...)
+            deepgram.transcribe_file(request=iter(audio), ...)
+
+    Only `read` is exposed (no fileno/seek/tell), so httpx cannot learn the
+    length and sends the body with chunked transfer encoding. The stream can
+    be consumed once: callers must not let their SDK retry the upload.
+    """
+
+    CODECS = {
+        "opus": (["-c:a", "libopus", "-b:a", "32k", "-f", "ogg"], "audio.ogg"),
+        "flac": (["-c:a", "flac", "-f", "flac"], "audio.flac"),
+    }
+
+    def __init__(
+        self,
+        input_path: str,
+        codec: Optional[str] = None,
+        sample_rate: int = 16000,
+        chunk_size: int = 64 * 1024,
+    ):
+        self.input_path = str(input_path)
+        self.codec = codec or ("opus" if has_encoder("libopus") else "flac")
+        self.sample_rate = sample_rate
+        self.chunk_size = chunk_size
+        self.filename = self.CODECS[self.codec][1]
+        self._process: Optional[subprocess.Popen] = None
+
+    def _command(self) -> list[str]:
+        codec_args, _ = self.CODECS[self.codec]
+        # fmt: off
+        return [
+            "ffmpeg", "-nostdin", "-loglevel", "error",
+            "-i", self.input_path,
+            "-vn",
+            "-ac", "1",
+            "-ar", str(self.sample_rate),
+            *codec_args,
+            "pipe:1",
+        ]
+        # fmt: on
+
+    def __enter__(self) -> "AudioStream":
+        self._process = subprocess.Popen(
+            self._command(),
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        process = self._process
+        if process is None:
+            return
+        self._process = None
+
+        # si la subida falló, ffmpeg quedaría bloqueado escribiendo en el pipe
+        if exc_type is not None:
+            process.kill()
+        process.stdout.close()
+        returncode = process.wait()
+
+        # un ffmpeg fallido entrega audio truncado: no aceptamos esa transcripción
+        if exc_type is None and returncode != 0:
+            raise subprocess.CalledProcessError(returncode, self._command())
+
+    def read(self, size: int = -1) -> bytes:
+        if self._process is None:
+            raise ValueError("AudioStream must be used inside a `with` block")
+        return self._process.stdout.read(size)
+
+    def __iter__(self) -> Iterator[bytes]:
+        return iter_chunks(self, self.chunk_size)
+
+
+@contextmanager
+def open_audio(file_path: str) -> Iterator[tuple[str, BinaryIO]]:
+    """
+    Yields (filename, readable) ready to upload: videos go through an
+    AudioStream, audio files are opened as they are.
+    """
+    path = Path(file_path)
+    if path.suffix.lower() in VIDEO_SUFFIXES:
+        with AudioStream(file_path) as audio:
+            yield audio.filename, audio
+    else:
+        with open(path, "rb") as audio_file:
+            yield path.name, audio_file
+
+
+def iter_chunks(readable: BinaryIO, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+    while True:
+        chunk = readable.read(chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+
+def hash_audio(file_path: str, sample_rate: int = 16000) -> str:
+    """
+    sha256 of the decoded 16 kHz mono PCM, streamed from ffmpeg.
+    Renaming or re-muxing a file keeps the hash; only a different sound changes it.
+    """
+    # fmt: off
+    command = [
+        "ffmpeg", "-nostdin", "-loglevel", "error",
+        "-i", str(file_path),
+        "-vn",
+        "-ac", "1",
+        "-ar", str(sample_rate),
+        "-f", "s16le",
+        "pipe:1",
+    ]
+    # fmt: on
+    digest = hashlib.sha256()
+    process = subprocess.Popen(
+        command,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+    )
+    with process.stdout:
+        for chunk in iter_chunks(process.stdout, 1024 * 1024):
+            digest.update(chunk)
+    returncode = process.wait()
+    if returncode != 0:
+        raise subprocess.CalledProcessError(returncode, command)
+    return digest.hexdigest()
+
+
+def extract_audio(input_path: str, output_path: str, sample_rate: int = 16000) -> str:
+    """Decodes the audio track to mono PCM wav, the master copy chunks are cut from."""
+    # fmt: off
+    command = [
+        "ffmpeg", "-y",
+        "-i", str(input_path),
+        "-vn",
+        "-ac", "1",
+        "-ar", str(sample_rate),
+        "-c:a", "pcm_s16le",
+        str(output_path),
+    ]
+    # fmt: on
+    subprocess.run(
+        command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True
+    )
+    return str(output_path)
+
+
+def probe_duration(path: str) -> float:
+    # fmt: off
+    command = [
+        "ffprobe", "-v", "error",
+        "-show_entries", "format=duration",
+        "-of", "csv=p=0",
+        str(path),
+    ]
+    # fmt: on
+    result = subprocess.run(command, capture_output=True, text=True, check=True)
+    return float(result.stdout.strip())
+
+
+def parse_silences(ffmpeg_log: str) -> list[tuple[float, float]]:
+    """
+    Pairs the silence_start / silence_end lines printed by ffmpeg's silencedetect.
+    A trailing silence without end (audio ends silent) is dropped.
+    """
+    silences = []
+    start = None
+    for line in ffmpeg_log.splitlines():
+        match = SILENCE_START.search(line)
+        if match:
+            start = max(0.0, float(match.group(1)))
+            continue
+        match = SILENCE_END.search(line)
+        if match and start is not None:
+            silences.append((start, float(match.group(1))))
+            start = None
+    return silences
+
+
+def detect_silences(
+    path: str, noise_db: float = -30, min_silence: float = 0.5
+) -> list[tuple[float, float]]:
+    # fmt: off
+    command = [
+        "ffmpeg", "-hide_banner", "-nostats",
+        "-i", str(path),
+        "-af", f"silencedetect=noise={noise_db}dB:d={min_silence}",
+        "-f", "null", "-",
+    ]
+    # fmt: on
+    result = subprocess.run(command, capture_output=True, text=True, check=True)
+    return parse_silences(result.stderr)
+
+
+@dataclass
+class AudioChunk:
+    """
+    [start, end] is the audio sent to the transcriber (with overlap);
+    [keep_from, keep_to) is the part of the timeline this chunk owns when stitching.
+    """
+
+    start: float
+    end: float
+    keep_from: float
+    keep_to: float
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+
+def plan_chunks(
+    duration: float,
+    silences: list[tuple[float, float]],
+    chunk_seconds: float = 600,
+    overlap_seconds: float = 5,
+    search_seconds: float = 60,
+) -> list[AudioChunk]:
+    """
+    Cuts the timeline every ~chunk_seconds, moving each cut back to the middle
+    of the latest silence found in the previous `search_seconds`, so words are
+    not split. Every chunk is padded with `overlap_seconds` on both sides.
+    """
+    midpoints = [(start + end) / 2 for start, end in silences]
+
+    cuts = []
+    position = 0.0
+    while duration - position > chunk_seconds:
+        target = position + chunk_seconds
+        window_start = max(position, target - search_seconds)
+        candidates = [m for m in midpoints if window_start < m <= target]
+        cut = max(candidates) if candidates else target
+        cuts.append(cut)
+        position = cut
+
+    bounds = [0.0] + cuts + [duration]
+    return [
+        AudioChunk(
+            start=max(0.0, keep_from - overlap_seconds),
+            end=min(duration, keep_to + overlap_seconds),
+            keep_from=keep_from,
+            keep_to=keep_to,
+        )
+        for keep_from, keep_to in zip(bounds, bounds[1:])
+    ]
+
+
+def cut_chunk(source_path: str, chunk: AudioChunk, output_path: str) -> str:
+    """Re-encodes [chunk.start, chunk.end] to a light AAC file for upload."""
+    # fmt: off
+    command = [
+        "ffmpeg", "-y",
+        "-ss", f"{chunk.start:.3f}",
+        "-t", f"{chunk.duration:.3f}",
+        "-i", str(source_path),
+        "-c:a", "aac",
+        "-b:a", "64k",
+        str(output_path),
+    ]
+    # fmt: on
+    subprocess.run(
+        command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True
+    )
+    return str(output_path)
+
+
+def stitch_chunks(chunks: list[AudioChunk], results: list[dict]) -> dict:
+    """
+    Shifts each chunk's segments back to the global timeline and keeps a
+    segment only in the chunk that owns its midpoint, so the overlap is
+    transcribed twice but appears once. A chunk that came back with text but
+    no segments (e.g. Deepgram without paragraphs) contributes its whole
+    text; its overlap cannot be trimmed.
+    """
+    segments = []
+    texts = []
+    last = len(chunks) - 1
+    for i, (chunk, result) in enumerate(zip(chunks, results)):
+        if not result.get("segments"):
+            if result.get("text"):
+                texts.append(result["text"])
+            continue
+
+        for seg in result["segments"]:
+            start = seg["start"] + chunk.start
+            end = seg["end"] + chunk.start
+            middle = (start + end) / 2
+            owned = chunk.keep_from <= middle < chunk.keep_to or (
+                i == last and middle >= chunk.keep_to
+            )
+            if owned:
+                segments.append(
+                    {
+                        "start": round(start, 3),
+                        "end": round(end, 3),
+                        "text": seg["text"],
+                    }
+                )
+                if seg["text"]:
+                    texts.append(seg["text"])
+
+    return {"text": " ".join(texts), "segments": segments}
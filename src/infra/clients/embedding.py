@@ -1,30 +1,83 @@
+import asyncio
 import requests
 import time
+from typing import Mapping, Optional
+import httpx
+import numpy as np
+from requests.adapters import HTTPAdapter
 
+BINARY_DTYPES = {"float32": "<f4", "float16": "<f2"}
+
+
+def decode_vectors(
+    content: bytes, headers: Mapping[str, str], json_fn=None
+) -> np.ndarray:
+    """
+    Builds the (n, dim) matrix from an /embed_batch response.
+    Binary bodies are wrapped with np.frombuffer (no copy, read-only array);
+    JSON bodies from older services are still accepted.
+    """
+    if headers.get("content-type", "").startswith("application/octet-stream"):
+        rows, dim = (int(v) for v in headers["x-vector-shape"].split(","))
+        dtype = BINARY_DTYPES[headers.get("x-vector-dtype", "float32")]
+        return np.frombuffer(content, dtype=dtype).reshape(rows, dim)
+    return np.asarray(json_fn()["vectors"], dtype=np.float32)
 
 
 class Embedder:
 
-    def __init__(self, embedder_uri):
+    def __init__(
+        self,
+        embedder_uri,
+        pool_size: int = 16,
+        timeout: float = 60,
+        dtype: str = "float32",
+    ):
         self.url = embedder_uri
+        self.timeout = timeout
+        self.dtype = dtype
+        self._dimension: Optional[int] = None
+
+        # una sola sesión: las conexiones keep-alive se reutilizan entre llamadas
+        # (y entre los hilos de add_many, hasta pool_size conexiones)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
 
     @property
     def vector_size(self):
-        return self.get_dimension()
+        # la dimensión del modelo no cambia: una sola llamada a /dimension
+        if self._dimension is None:
+            self._dimension = self.get_dimension()
+        return self._dimension
 
     def get_vector(self, text):
         # better use batch to process list of texts to avoid network overhead
-        response = requests.post(f"{self.url}/embed", json={"text": text})
+        response = self.session.post(
+            f"{self.url}/embed", json={"text": text}, timeout=self.timeout
+        )
         return response.json()["vector"]
 
-    def get_vectors(self, texts: list[str]):
-        response = requests.post(f"{self.url}/embed_batch", json={"texts": texts})
-        return response.json()["vectors"]
+    def get_vectors(self, texts: list[str]) -> np.ndarray:
+        """(len(texts), dim) matrix, transferred as raw floats instead of JSON."""
+        response = self.session.post(
+            f"{self.url}/embed_batch",
+            params={"dtype": self.dtype},
+            json={"texts": texts},
+            headers={"Accept": "application/octet-stream"},
+            timeout=self.timeout,
+        )
+        response.raise_for_status()
+        return decode_vectors(response.content, response.headers, response.json)
 
     def get_dimension(self):
-        response = requests.get(f"{self.url}/dimension")
+        response = self.session.get(f"{self.url}/dimension", timeout=self.timeout)
         return response.json()["dimension"]
 
+    def close(self):
+        self.session.close()
+
     def wait_until_ready(self, timeout_seconds=30, interval=2):
         """
         Bloquea la ejecución y espera a que la API de embeddings esté 100% lista.
@@ -35,11 +88,15 @@ class Embedder:
 
         while time.time() - start_time < timeout_seconds:
             try:
-                # Intentamos llamar al endpoint más ligero para verificar la salud del servicio
-                response = requests.get(f"{self.url}/dimension", timeout=3)
+                # /ready responde 200 solo cuando el modelo ya está cargado y calentado
+                response = self.session.get(f"{self.url}/ready", timeout=3)
                 if response.status_code == 200:
                     print("✅ Embedding service ready")
                     return True
+                if response.status_code == 500:
+                    raise RuntimeError(
+                        f"❌ El servicio de embeddings no pudo cargar el modelo: {response.text}"
+                    )
             except requests.RequestException:
                 # Si da error de conexión o timeout, ignoramos y seguimos esperando
                 pass
@@ -50,3 +107,117 @@ class Embedder:
         raise TimeoutError(
             f"❌ El servicio de embeddings no estuvo listo tras {timeout_seconds} segundos."
         )
+
+
+class AsyncEmbedder:
+    """
+    Async client over a pooled httpx.AsyncClient.
+
+    With batch_window_ms > 0, get_vector calls that arrive within that window
+    (e.g. from asyncio.gather) are sent together in one /embed_batch request,
+    up to max_batch_size texts per request.
+
+    usage:
+        async with AsyncEmbedder(EMBEDDER_URI, batch_window_ms=5) as embedder:
+            vectors = await asyncio.gather(*(embedder.get_vector(t) for t in texts))
+    """
+
+    def __init__(
+        self,
+        embedder_uri,
+        batch_window_ms: float = 0,
+        max_batch_size: int = 64,
+        pool_size: int = 16,
+        timeout: float = 60,
+        dtype: str = "float32",
+    ):
+        self.url = embedder_uri
+        self.dtype = dtype
+        self.batch_window = batch_window_ms / 1000
+        self.max_batch_size = max_batch_size
+        self.client = httpx.AsyncClient(
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=pool_size, max_keepalive_connections=pool_size
+            ),
+        )
+        self._dimension: Optional[int] = None
+        self._pending: list[tuple[str, asyncio.Future]] = []
+        self._flush_task: Optional[asyncio.Task] = None
+        self._inflight: set[asyncio.Task] = set()
+
+    async def __aenter__(self) -> "AsyncEmbedder":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        if self._flush_task is not None:
+            await self._flush_task
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
+        await self.client.aclose()
+
+    async def vector_size(self) -> int:
+        if self._dimension is None:
+            self._dimension = await self.get_dimension()
+        return self._dimension
+
+    async def get_dimension(self) -> int:
+        response = await self.client.get(f"{self.url}/dimension")
+        return response.json()["dimension"]
+
+    async def get_vectors(self, texts: list[str]) -> np.ndarray:
+        response = await self.client.post(
+            f"{self.url}/embed_batch",
+            params={"dtype": self.dtype},
+            json={"texts": texts},
+            headers={"Accept": "application/octet-stream"},
+        )
+        response.raise_for_status()
+        return decode_vectors(response.content, response.headers, response.json)
+
+    async def get_vector(self, text: str):
+        if self.batch_window <= 0:
+            response = await self.client.post(f"{self.url}/embed", json={"text": text})
+            return response.json()["vector"]
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((text, future))
+        if len(self._pending) >= self.max_batch_size:
+            self._flush_now()
+        elif self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_after_window())
+        return await future
+
+    async def _flush_after_window(self) -> None:
+        await asyncio.sleep(self.batch_window)
+        self._flush_task = None
+        self._flush_now()
+
+    def _flush_now(self) -> None:
+        # el lote se va ya: el temporizador de su ventana no debe adelantar el siguiente
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.create_task(self._send(batch))
+            # referencia fuerte hasta que termine (el loop solo guarda una débil)
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _send(self, batch: list[tuple[str, asyncio.Future]]) -> None:
+        try:
+            vectors = await self.get_vectors([text for text, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), vector in zip(batch, vectors):
+            if not future.done():
+                # mismo formato que get_vector sin ventana
+                future.set_result(vector.tolist())
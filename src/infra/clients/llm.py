@@ -1,9 +1,9 @@
-import os
-import time
+import asyncio
 from abc import ABC, abstractmethod
-from typing import Optional, Type
+from typing import Any, Dict, List, Optional, Type
 from pydantic import BaseModel
-from groq import Groq
+from groq import Groq, AsyncGroq, RateLimitError
+from src.infra.clients.ratelimit import RateLimiter, get_rate_limiter, estimate_tokens
 
 
 # =====================================================================
@@ -34,12 +34,59 @@ class BaseLLMClient(ABC):
         """
         pass
 
+    async def agenerate(
+        self,
+        system_prompt: str,
+        user_content: str,
+        response_model: Optional[Type[BaseModel]] = None,
+        temperature: float = 0.2,
+    ) -> BaseModel | str:
+        """
+        Versión async de `generate`, mismo contrato.
+        Por defecto corre `generate` en un hilo para no bloquear el event loop;
+        los clientes con SDK async lo sobreescriben con su cliente HTTP pooled.
+        """
+        return await asyncio.to_thread(
+            self.generate,
+            system_prompt,
+            user_content,
+            response_model=response_model,
+            temperature=temperature,
+        )
+
+
+async def agenerate_many(
+    llm_client: BaseLLMClient,
+    requests: List[Dict[str, Any]],
+    max_concurrency: int = 4,
+) -> List[BaseModel | str]:
+    """
+    Ejecuta varias llamadas `agenerate` en paralelo, como máximo `max_concurrency`
+    a la vez. Cada request es un dict con los argumentos de `agenerate`.
+    Los resultados mantienen el orden de `requests`.
+
+    usage:
+        agenerate_many(client, [{"system_prompt": s, "user_content": c}, ...])
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def run_one(kwargs: Dict[str, Any]):
+        async with semaphore:
+            return await llm_client.agenerate(**kwargs)
+
+    return await asyncio.gather(*(run_one(kwargs) for kwargs in requests))
+
 
 # =====================================================================
 # IMPLEMENTACIÓN CONCRETA PARA GROQ
 # =====================================================================
 class GroqClient(BaseLLMClient):
-    def __init__(self, api_key: str, model: str = "llama-3.1-8b-instant"):
+    def __init__(
+        self,
+        api_key: str,
+        model: str = "llama-3.1-8b-instant",
+        rate_limiter: Optional[RateLimiter] = None,
+    ):
         """
         Inicializa el cliente de Groq.
         Modelos recomendados:
@@ -47,19 +94,28 @@ class GroqClient(BaseLLMClient):
         - 'llama3-8b-8192' (Ultra rápido para micro-tareas o pruebas rápidas)
         """
         self.client = Groq(api_key=api_key)
+        # cliente async con su propio pool de conexiones, se crea al primer uso
+        self.api_key = api_key
+        self._aclient: Optional[AsyncGroq] = None
         self.model = model
-        self.SAFE_PAUSE = 10.0
+        # Cuotas del free tier; se corrigen con los headers x-ratelimit-* de cada respuesta
+        self.rate_limiter = rate_limiter or get_rate_limiter(
+            f"groq:{model}", requests_per_minute=30, tokens_per_minute=6000
+        )
 
-    def generate(
+    @property
+    def aclient(self) -> AsyncGroq:
+        if self._aclient is None:
+            self._aclient = AsyncGroq(api_key=self.api_key)
+        return self._aclient
+
+    def _build_kwargs(
         self,
         system_prompt: str,
         user_content: str,
-        response_model: Optional[Type[BaseModel]] = None,
-        temperature: float = 0.2,
-    ) -> BaseModel | str:
-
-        print(f"🚀 [Groq] Enviando petición usando el modelo: {self.model}...")
-
+        response_model: Optional[Type[BaseModel]],
+        temperature: float,
+    ) -> dict:
         # 1. Configuración base de argumentos para el ChatCompletion
         kwargs = {
             "model": self.model,
@@ -82,33 +138,88 @@ class GroqClient(BaseLLMClient):
             """
             kwargs["messages"][0]["content"] = system_prompt
 
+        return kwargs
+
+    def _parse_raw(
+        self, raw, prompt_tokens: int, response_model: Optional[Type[BaseModel]]
+    ) -> BaseModel | str:
+        self.rate_limiter.update_from_headers(raw.headers)
+        completion = raw.parse()
+        raw_response = completion.choices[0].message.content.strip()
+
+        if completion.usage is not None:
+            # ajustamos lo reservado con el consumo real de la llamada
+            self.rate_limiter.consume(
+                tokens=completion.usage.total_tokens - prompt_tokens
+            )
+
+        # 4. Retorno adaptativo basado en la presencia del modelo
+        if response_model is not None:
+            # El SDK o el API garantizan el JSON, lo parseamos directo al modelo de Pydantic
+            return response_model.model_validate_json(raw_response)
+
+        return raw_response
+
+    def _handle_error(
+        self, e: Exception, response_model: Optional[Type[BaseModel]]
+    ) -> str:
+        if isinstance(e, RateLimitError):
+            self.rate_limiter.update_from_headers(e.response.headers)
+            print(f"❌ Cuota de Groq excedida: {e}")
+        else:
+            print(f"❌ Error crítico en la ejecución del LLM: {e}")
+        if response_model is not None:
+            raise e  # En pipelines estructurados (Prefect) es mejor fallar rápido para activar fallbacks
+        return "¡ERROR DE EJECUCIÓN EN EL BACKEND! 😱"
+
+    def generate(
+        self,
+        system_prompt: str,
+        user_content: str,
+        response_model: Optional[Type[BaseModel]] = None,
+        temperature: float = 0.2,
+    ) -> BaseModel | str:
+
+        print(f"🚀 [Groq] Enviando petición usando el modelo: {self.model}...")
+        kwargs = self._build_kwargs(
+            system_prompt, user_content, response_model, temperature
+        )
+
+        # 3. Solo esperamos si la cuota de requests/tokens está agotada
+        prompt_tokens = estimate_tokens(system_prompt + user_content)
+        self.rate_limiter.acquire(tokens=prompt_tokens)
+
         try:
-            completion = self.client.chat.completions.create(**kwargs)
-            raw_response = completion.choices[0].message.content.strip()
+            raw = self.client.chat.completions.with_raw_response.create(**kwargs)
+            return self._parse_raw(raw, prompt_tokens, response_model)
+        except Exception as e:
+            return self._handle_error(e, response_model)
 
-            # 3. Pausa de seguridad para el control de cuotas (Rate Limits)
-            if self.SAFE_PAUSE > 0:
-                print(
-                    f"⏱️ Respetando cuotas de Groq. Pausa de seguridad de {self.SAFE_PAUSE}s..."
-                )
-                time.sleep(self.SAFE_PAUSE)
+    async def agenerate(
+        self,
+        system_prompt: str,
+        user_content: str,
+        response_model: Optional[Type[BaseModel]] = None,
+        temperature: float = 0.2,
+    ) -> BaseModel | str:
 
-            # 4. Retorno adaptativo basado en la presencia del modelo
-            if response_model is not None:
-                # El SDK o el API garantizan el JSON, lo parseamos directo al modelo de Pydantic
-                return response_model.model_validate_json(raw_response)
+        print(f"🚀 [Groq] Enviando petición async usando el modelo: {self.model}...")
+        kwargs = self._build_kwargs(
+            system_prompt, user_content, response_model, temperature
+        )
 
-            return raw_response
+        prompt_tokens = estimate_tokens(system_prompt + user_content)
+        await self.rate_limiter.aacquire(tokens=prompt_tokens)
 
+        try:
+            raw = await self.aclient.chat.completions.with_raw_response.create(
+                **kwargs
+            )
+            return self._parse_raw(raw, prompt_tokens, response_model)
         except Exception as e:
-            print(f"❌ Error crítico en la ejecución del LLM: {e}")
-            if response_model is not None:
-                raise e  # En pipelines estructurados (Prefect) es mejor fallar rápido para activar fallbacks
-            return "¡ERROR DE EJECUCIÓN EN EL BACKEND! 😱"
+            return self._handle_error(e, response_model)
 
 
-import os
-from abc import ABC, abstractmethod
 from typing import Optional, Type, Union
 from pydantic import BaseModel
 from google import genai
@@ -116,27 +227,18 @@ from google.genai import types
 from google.genai.errors import APIError
 
 
-# Aseguramos que la interfaz abstracta esté importada
-# (Asumiendo que heredas de la que definiste)
-class BaseLLMClient(ABC):
-    @abstractmethod
-    def generate(
-        self,
-        system_prompt: str,
-        user_content: str,
-        response_model: Optional[Type[BaseModel]] = None,
-        temperature: float = 0.2,
-    ) -> Union[BaseModel, str]:
-        pass
-
-
 class GeminiClient(BaseLLMClient):
     """
     Cliente de Gemini adaptado para la interfaz BaseLLMClient.
     Soporta salidas estructuradas nativas utilizando esquemas de Pydantic.
     """
 
-    def __init__(self, api_key: Optional[str] = None, model: str = "gemini-3.5-flash-lite"):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        model: str = "gemini-3.5-flash-lite",
+        rate_limiter: Optional[RateLimiter] = None,
+    ):
         """
         Inicializa el cliente de Gemini.
         Busca 'GEMINI_API_KEY' en las variables de entorno si no se provee explícitamente.
@@ -150,19 +252,17 @@ class GeminiClient(BaseLLMClient):
         # Inicializamos el cliente oficial de Google GenAI
         self.client = genai.Client(api_key=api_key)
         self.model = model
-        self.safe_pause = 5.0
+        # El SDK de Google no expone headers de cuota, nos guiamos por el free tier
+        self.rate_limiter = rate_limiter or get_rate_limiter(
+            f"gemini:{model}", requests_per_minute=15, tokens_per_minute=250000
+        )
 
-    def generate(
+    def _build_config(
         self,
         system_prompt: str,
-        user_content: str,
-        response_model: Optional[Type[BaseModel]] = None,
-        temperature: float = 0.2,
-    ) -> Union[BaseModel, str]:
-        """
-        Ejecuta la llamada a Gemini y devuelve texto plano o una instancia del modelo Pydantic.
-        """
-
+        response_model: Optional[Type[BaseModel]],
+        temperature: float,
+    ) -> types.GenerateContentConfig:
         # 1. Configuración base del request
         config_params = {
             "system_instruction": system_prompt,
@@ -174,7 +274,41 @@ class GeminiClient(BaseLLMClient):
             config_params["response_mime_type"] = "application/json"
             config_params["response_schema"] = response_model
 
-        config = types.GenerateContentConfig(**config_params)
+        return types.GenerateContentConfig(**config_params)
+
+    def _parse_response(
+        self, response, response_model: Optional[Type[BaseModel]]
+    ) -> Union[BaseModel, str]:
+        # 4. Procesar la respuesta
+        if response_model is not None:
+            # El SDK de Google ya garantiza que el string cumple con el esquema.
+            # Lo parseamos de vuelta a la instancia de Pydantic para devolver un objeto tipado.
+            return response_model.model_validate_json(response.text)
+
+        return response.text
+
+    def _handle_error(self, e: Exception):
+        if isinstance(e, APIError):
+            print(f"❌ Error en la API de Gemini: {e}")
+            if e.code == 429:
+                # sin retry-after explícito: frenamos a todos los callers un minuto
+                self.rate_limiter.backoff(60)
+        else:
+            print(f"❌ Error inesperado procesando la llamada al LLM: {e}")
+        raise e
+
+    def generate(
+        self,
+        system_prompt: str,
+        user_content: str,
+        response_model: Optional[Type[BaseModel]] = None,
+        temperature: float = 0.2,
+    ) -> Union[BaseModel, str]:
+        """
+        Ejecuta la llamada a Gemini y devuelve texto plano o una instancia del modelo Pydantic.
+        """
+        config = self._build_config(system_prompt, response_model, temperature)
+        self.rate_limiter.acquire(tokens=estimate_tokens(system_prompt + user_content))
 
         try:
             # 3. Llamar a la API de Google
@@ -183,25 +317,32 @@ class GeminiClient(BaseLLMClient):
                 contents=user_content,
                 config=config,
             )
+            return self._parse_response(response, response_model)
+        except Exception as e:
+            self._handle_error(e)
 
-            if self.safe_pause > 0:
-                print(f"⏱️ Pausa de seguridad de {self.safe_pause}s...")
-                time.sleep(self.safe_pause)
-
-            # 4. Procesar la respuesta
-            if response_model is not None:
-                # El SDK de Google ya garantiza que el string cumple con el esquema.
-                # Lo parseamos de vuelta a la instancia de Pydantic para devolver un objeto tipado.
-                return response_model.model_validate_json(response.text)
-
-            return response.text
+    async def agenerate(
+        self,
+        system_prompt: str,
+        user_content: str,
+        response_model: Optional[Type[BaseModel]] = None,
+        temperature: float = 0.2,
+    ) -> Union[BaseModel, str]:
+        """Igual que generate, usando el cliente async del SDK (client.aio)."""
+        config = self._build_config(system_prompt, response_model, temperature)
+        await self.rate_limiter.aacquire(
+            tokens=estimate_tokens(system_prompt + user_content)
+        )
 
-        except APIError as api_err:
-            print(f"❌ Error en la API de Gemini: {api_err}")
-            raise api_err
+        try:
+            response = await self.client.aio.models.generate_content(
+                model=self.model,
+                contents=user_content,
+                config=config,
+            )
+            return self._parse_response(response, response_model)
         except Exception as e:
-            print(f"❌ Error inesperado procesando la llamada al LLM: {e}")
-            raise e
+            self._handle_error(e)
 
 
 import json
@@ -219,6 +360,7 @@ class OllamaLocalClient(BaseLLMClient):
     def __init__(self, model: str = "llama3.2:3b", host: Optional[str] = None):
         self.model = model
         self.client = ollama.Client(host=host) if host else ollama
+        self.aclient = ollama.AsyncClient(host=host)
 
         try:
             self.client.ps()
@@ -240,6 +382,48 @@ class OllamaLocalClient(BaseLLMClient):
         Genera una respuesta. Si se pasa `response_model`, fuerza salida JSON
         basada en su esquema y retorna la instancia de Pydantic parseada.
         """
+        kwargs = self._build_kwargs(
+            system_prompt, user_content, response_model, temperature, num_predict, num_ctx
+        )
+        raw_text = ""
+        try:
+            print(f"🚀 [Ollama] Enviando petición a {self.model}...")
+            response = self.client.generate(**kwargs)
+            raw_text = response.get("response", "").strip()
+            return self._parse_text(raw_text, response_model)
+        except Exception as e:
+            self._handle_error(e, raw_text)
+
+    async def agenerate(
+        self,
+        system_prompt: str,
+        user_content: str,
+        response_model: Optional[Type[BaseModel]] = None,
+        temperature: float = 0.1,
+        num_predict: int = 300,
+        num_ctx: int = 17000,
+    ) -> Union[BaseModel, str]:
+        kwargs = self._build_kwargs(
+            system_prompt, user_content, response_model, temperature, num_predict, num_ctx
+        )
+        raw_text = ""
+        try:
+            print(f"🚀 [Ollama] Enviando petición async a {self.model}...")
+            response = await self.aclient.generate(**kwargs)
+            raw_text = response.get("response", "").strip()
+            return self._parse_text(raw_text, response_model)
+        except Exception as e:
+            self._handle_error(e, raw_text)
+
+    def _build_kwargs(
+        self,
+        system_prompt: str,
+        user_content: str,
+        response_model: Optional[Type[BaseModel]],
+        temperature: float,
+        num_predict: int,
+        num_ctx: int,
+    ) -> Dict[str, Any]:
         # 1. Extraer el esquema JSON del modelo Pydantic (V1 y V2 compatible)
         format_param = None
         if response_model is not None:
@@ -255,43 +439,46 @@ class OllamaLocalClient(BaseLLMClient):
             "num_ctx": num_ctx,
         }
 
-        try:
-            print(f"🚀 [Ollama] Enviando petición a {self.model}...")
-
-            response = self.client.generate(
-                model=self.model,
-                system=system_prompt,
-                prompt=user_content,
-                format=format_param,  # Acepta el Dict del schema directamente
-                options=options,
-            )
-
-            raw_text = response.get("response", "").strip()
+        return {
+            "model": self.model,
+            "system": system_prompt,
+            "prompt": user_content,
+            "format": format_param,  # Acepta el Dict del schema directamente
+            "options": options,
+        }
 
-            # 3. Mapeo a Pydantic o retorno de string
-            if response_model is not None:
-                if hasattr(response_model, "model_validate_json"):
-                    return response_model.model_validate_json(raw_text)  # Pydantic V2
-                return response_model.parse_raw(raw_text)  # Pydantic V1
+    def _parse_text(
+        self, raw_text: str, response_model: Optional[Type[BaseModel]]
+    ) -> Union[BaseModel, str]:
+        # 3. Mapeo a Pydantic o retorno de string
+        if response_model is not None:
+            if hasattr(response_model, "model_validate_json"):
+                return response_model.model_validate_json(raw_text)  # Pydantic V2
+            return response_model.parse_raw(raw_text)  # Pydantic V1
 
-            return raw_text
+        return raw_text
 
-        except (ValidationError, json.JSONDecodeError) as e:
+    def _handle_error(self, e: Exception, raw_text: str):
+        if isinstance(e, (ValidationError, json.JSONDecodeError)):
             print(f"⚠️ Error estructurando respuesta de Ollama: {e}\nRaw: {raw_text}")
-            raise e
-        except Exception as e:
+        else:
             print(f"❌ Error en ejecución de Ollama: {e}")
-            raise e
+        raise e
 
 
-import time
 from typing import Optional, Type, Union
 from pydantic import BaseModel
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI
+from openai import RateLimitError as OpenAIRateLimitError
 
 
 class CerebrasClient(BaseLLMClient):
-    def __init__(self, api_key: str, model: str = "llama3.1-8b"):
+    def __init__(
+        self,
+        api_key: str,
+        model: str = "llama3.1-8b",
+        rate_limiter: Optional[RateLimiter] = None,
+    ):
         """
         Inicializa el cliente de Cerebras Cloud.
 
@@ -300,22 +487,29 @@ class CerebrasClient(BaseLLMClient):
         - 'llama3.1-70b' / 'llama-3.3-70b' (Mayor razonamiento manteniendo alta velocidad)
         """
         # Cerebras expone una API 100% compatible con OpenAI
-        self.client = OpenAI(api_key=api_key, base_url="https://api.cerebras.ai/v1")
+        self.base_url = "https://api.cerebras.ai/v1"
+        self.api_key = api_key
+        self.client = OpenAI(api_key=api_key, base_url=self.base_url)
+        self._aclient: Optional[AsyncOpenAI] = None
         self.model = model
-        # Dado que Cerebras tolera alto rendimiento (30 RPM en Free Tier),
-        # la pausa de seguridad puede ser de solo 1 segundo o 0.
-        self.SAFE_PAUSE = 1.0
+        # Cerebras tolera alto rendimiento (30 RPM en Free Tier)
+        self.rate_limiter = rate_limiter or get_rate_limiter(
+            f"cerebras:{model}", requests_per_minute=30, tokens_per_minute=60000
+        )
 
-    def generate(
+    @property
+    def aclient(self) -> AsyncOpenAI:
+        if self._aclient is None:
+            self._aclient = AsyncOpenAI(api_key=self.api_key, base_url=self.base_url)
+        return self._aclient
+
+    def _build_kwargs(
         self,
         system_prompt: str,
         user_content: str,
-        response_model: Optional[Type[BaseModel]] = None,
-        temperature: float = 0.2,
-    ) -> Union[BaseModel, str]:
-
-        print(f"🚀 [Cerebras] Enviando petición usando el modelo: {self.model}...")
-
+        response_model: Optional[Type[BaseModel]],
+        temperature: float,
+    ) -> dict:
         # 1. Configuración base de argumentos para el ChatCompletion
         kwargs = {
             "model": self.model,
@@ -336,34 +530,85 @@ class CerebrasClient(BaseLLMClient):
             """
             kwargs["messages"][0]["content"] = system_prompt
 
-        try:
-            completion = self.client.chat.completions.create(**kwargs)
-            raw_response = completion.choices[0].message.content.strip()
+        return kwargs
 
-            # 3. Pausa de seguridad para el control de cuotas
-            if self.SAFE_PAUSE > 0:
-                print(
-                    f"⏱️ Respetando cuotas de Cerebras. Pausa de seguridad de {self.SAFE_PAUSE}s..."
-                )
-                time.sleep(self.SAFE_PAUSE)
+    def _parse_raw(
+        self, raw, prompt_tokens: int, response_model: Optional[Type[BaseModel]]
+    ) -> Union[BaseModel, str]:
+        self.rate_limiter.update_from_headers(raw.headers)
+        completion = raw.parse()
+        raw_response = completion.choices[0].message.content.strip()
+
+        if completion.usage is not None:
+            # ajustamos lo reservado con el consumo real de la llamada
+            self.rate_limiter.consume(
+                tokens=completion.usage.total_tokens - prompt_tokens
+            )
 
-            # 4. Retorno adaptativo basado en la presencia del modelo
-            if response_model is not None:
-                return response_model.model_validate_json(raw_response)
+        # 4. Retorno adaptativo basado en la presencia del modelo
+        if response_model is not None:
+            return response_model.model_validate_json(raw_response)
 
-            return raw_response
+        return raw_response
 
-        except Exception as e:
+    def _handle_error(
+        self, e: Exception, response_model: Optional[Type[BaseModel]]
+    ) -> str:
+        if isinstance(e, OpenAIRateLimitError):
+            self.rate_limiter.update_from_headers(e.response.headers)
+            print(f"❌ Cuota de Cerebras excedida: {e}")
+        else:
             print(f"❌ Error crítico en la ejecución del LLM (Cerebras): {e}")
-            if response_model is not None:
-                raise e  # Falla rápido para que Prefect capture la excepción y reintente
-            return "¡ERROR DE EJECUCIÓN EN EL BACKEND! 😱"
+        if response_model is not None:
+            raise e  # Falla rápido para que Prefect capture la excepción y reintente
+        return "¡ERROR DE EJECUCIÓN EN EL BACKEND! 😱"
 
-import time
-from typing import Optional, Type, Union
-from pydantic import BaseModel
-from openai import OpenAI
+    def generate(
+        self,
+        system_prompt: str,
+        user_content: str,
+        response_model: Optional[Type[BaseModel]] = None,
+        temperature: float = 0.2,
+    ) -> Union[BaseModel, str]:
+
+        print(f"🚀 [Cerebras] Enviando petición usando el modelo: {self.model}...")
+        kwargs = self._build_kwargs(
+            system_prompt, user_content, response_model, temperature
+        )
 
+        # 3. Control de cuotas: solo esperamos si el presupuesto está agotado
+        prompt_tokens = estimate_tokens(system_prompt + user_content)
+        self.rate_limiter.acquire(tokens=prompt_tokens)
+
+        try:
+            raw = self.client.chat.completions.with_raw_response.create(**kwargs)
+            return self._parse_raw(raw, prompt_tokens, response_model)
+        except Exception as e:
+            return self._handle_error(e, response_model)
+
+    async def agenerate(
+        self,
+        system_prompt: str,
+        user_content: str,
+        response_model: Optional[Type[BaseModel]] = None,
+        temperature: float = 0.2,
+    ) -> Union[BaseModel, str]:
+
+        print(f"🚀 [Cerebras] Enviando petición async usando el modelo: {self.model}...")
+        kwargs = self._build_kwargs(
+            system_prompt, user_content, response_model, temperature
+        )
+
+        prompt_tokens = estimate_tokens(system_prompt + user_content)
+        await self.rate_limiter.aacquire(tokens=prompt_tokens)
+
+        try:
+            raw = await self.aclient.chat.completions.with_raw_response.create(
+                **kwargs
+            )
+            return self._parse_raw(raw, prompt_tokens, response_model)
+        except Exception as e:
+            return self._handle_error(e, response_model)
 
 class SambaNovaClient(BaseLLMClient):
     """
@@ -372,9 +617,10 @@ class SambaNovaClient(BaseLLMClient):
     """
 
     def __init__(
-        self, 
-        api_key: str, 
-        model: str = "Meta-Llama-3.3-70B-Instruct"
+        self,
+        api_key: str,
+        model: str = "Meta-Llama-3.3-70B-Instruct",
+        rate_limiter: Optional[RateLimiter] = None,
     ):
         """
         Modelos recomendados activos en SambaNova Free Tier:
@@ -382,23 +628,32 @@ class SambaNovaClient(BaseLLMClient):
         - 'Meta-Llama-3.1-8B-Instruct' (Velocidad pura en sub-segundos)
         - 'Meta-Llama-3.3-70B-Instruct' (En despliegue progresivo)
         """
+        self.base_url = "https://api.sambanova.ai/v1"
+        self.api_key = api_key
         self.client = OpenAI(
             api_key=api_key,
-            base_url="https://api.sambanova.ai/v1"
+            base_url=self.base_url
         )
+        self._aclient: Optional[AsyncOpenAI] = None
         self.model = model
-        self.SAFE_PAUSE = 1.0  # Pausa breve para respetar las cuotas gratuitas de RPM
+        # Cuotas gratuitas de RPM
+        self.rate_limiter = rate_limiter or get_rate_limiter(
+            f"sambanova:{model}", requests_per_minute=20
+        )
 
-    def generate(
+    @property
+    def aclient(self) -> AsyncOpenAI:
+        if self._aclient is None:
+            self._aclient = AsyncOpenAI(api_key=self.api_key, base_url=self.base_url)
+        return self._aclient
+
+    def _build_kwargs(
         self,
         system_prompt: str,
         user_content: str,
-        response_model: Optional[Type[BaseModel]] = None,
-        temperature: float = 0.2,
-    ) -> Union[BaseModel, str]:
-
-        print(f"🚀 [SambaNova] Enviando petición usando el modelo: {self.model}...")
-
+        response_model: Optional[Type[BaseModel]],
+        temperature: float,
+    ) -> dict:
         # 1. Configuración base para la llamada a la API
         kwargs = {
             "model": self.model,
@@ -419,22 +674,82 @@ class SambaNovaClient(BaseLLMClient):
             """
             kwargs["messages"][0]["content"] = system_prompt
 
+        return kwargs
+
+    def _parse_raw(
+        self, raw, prompt_tokens: int, response_model: Optional[Type[BaseModel]]
+    ) -> Union[BaseModel, str]:
+        self.rate_limiter.update_from_headers(raw.headers)
+        completion = raw.parse()
+        raw_response = completion.choices[0].message.content.strip()
+
+        if completion.usage is not None:
+            # ajustamos lo reservado con el consumo real de la llamada
+            self.rate_limiter.consume(
+                tokens=completion.usage.total_tokens - prompt_tokens
+            )
+
+        # 4. Parseo automático a Pydantic o retorno de string crudo
+        if response_model is not None:
+            return response_model.model_validate_json(raw_response)
+
+        return raw_response
+
+    def _handle_error(
+        self, e: Exception, response_model: Optional[Type[BaseModel]]
+    ) -> str:
+        if isinstance(e, OpenAIRateLimitError):
+            self.rate_limiter.update_from_headers(e.response.headers)
+            print(f"❌ Cuota de SambaNova excedida: {e}")
+        else:
+            print(f"❌ Error crítico en la ejecución de SambaNova: {e}")
+        if response_model is not None:
+            raise e  # Eleva el error para que Prefect capture el fallo y active retries
+        return "¡ERROR DE EJECUCIÓN EN EL BACKEND!"
+
+    def generate(
+        self,
+        system_prompt: str,
+        user_content: str,
+        response_model: Optional[Type[BaseModel]] = None,
+        temperature: float = 0.2,
+    ) -> Union[BaseModel, str]:
+
+        print(f"🚀 [SambaNova] Enviando petición usando el modelo: {self.model}...")
+        kwargs = self._build_kwargs(
+            system_prompt, user_content, response_model, temperature
+        )
+
+        # 3. Control de tasa de solicitudes (RPM, y tokens si el limitador los tiene)
+        prompt_tokens = estimate_tokens(system_prompt + user_content)
+        self.rate_limiter.acquire(tokens=prompt_tokens)
+
         try:
-            completion = self.client.chat.completions.create(**kwargs)
-            raw_response = completion.choices[0].message.content.strip()
+            raw = self.client.chat.completions.with_raw_response.create(**kwargs)
+            return self._parse_raw(raw, prompt_tokens, response_model)
+        except Exception as e:
+            return self._handle_error(e, response_model)
 
-            # 3. Control de tasa de solicitudes (RPM)
-            if self.SAFE_PAUSE > 0:
-                time.sleep(self.SAFE_PAUSE)
+    async def agenerate(
+        self,
+        system_prompt: str,
+        user_content: str,
+        response_model: Optional[Type[BaseModel]] = None,
+        temperature: float = 0.2,
+    ) -> Union[BaseModel, str]:
 
-            # 4. Parseo automático a Pydantic o retorno de string crudo
-            if response_model is not None:
-                return response_model.model_validate_json(raw_response)
+        print(f"🚀 [SambaNova] Enviando petición async usando el modelo: {self.model}...")
+        kwargs = self._build_kwargs(
+            system_prompt, user_content, response_model, temperature
+        )
 
-            return raw_response
+        prompt_tokens = estimate_tokens(system_prompt + user_content)
+        await self.rate_limiter.aacquire(tokens=prompt_tokens)
 
+        try:
+            raw = await self.aclient.chat.completions.with_raw_response.create(
+                **kwargs
+            )
+            return self._parse_raw(raw, prompt_tokens, response_model)
         except Exception as e:
-            print(f"❌ Error crítico en la ejecución de SambaNova: {e}")
-            if response_model is not None:
-                raise e  # Eleva el error para que Prefect capture el fallo y active retries
-            return "¡ERROR DE EJECUCIÓN EN EL BACKEND!"
\ No newline at end of file
+            return self._handle_error(e, response_model)
@@ -0,0 +1,177 @@
+import asyncio
+import re
+import threading
+import time
+from typing import Dict, Mapping, Optional
+
+
+def estimate_tokens(text: str) -> int:
+    """Aproximación barata (~4 caracteres por token) para reservar cuota antes de llamar."""
+    return len(text) // 4 + 1
+
+
+def parse_reset_seconds(value: Optional[str]) -> Optional[float]:
+    """
+    print(parse_reset_seconds("7.66s"))     # 7.66
+    print(parse_reset_seconds("2m59.56s"))  # 179.56
+    print(parse_reset_seconds("120ms"))     # 0.12
+    print(parse_reset_seconds("30"))        # 30.0
+    """
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+
+    units = {"h": 3600.0, "m": 60.0, "s": 1.0, "ms": 0.001}
+    parts = re.findall(r"(\d+(?:\.\d+)?)(ms|h|m|s)", value)
+    if not parts:
+        return None
+    return sum(float(amount) * units[unit] for amount, unit in parts)
+
+
+class TokenBucket:
+    """
+    Bucket that refills `capacity` units every `period_seconds`.
+    The level may go negative: a reservation always succeeds and returns
+    how long the caller must wait for the debt to be paid back.
+    """
+
+    def __init__(self, capacity: float, period_seconds: float):
+        self.capacity = float(capacity)
+        self.rate = self.capacity / period_seconds
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        elapsed = max(0.0, now - self.updated)
+        self.level = min(self.capacity, self.level + elapsed * self.rate)
+        self.updated = now
+
+    def reserve(self, amount: float, now: float) -> float:
+        self._refill(now)
+        self.level -= amount
+        return 0.0 if self.level >= 0 else -self.level / self.rate
+
+    def sync(self, remaining: float, now: float) -> None:
+        """Never trust the local estimate above what the provider reports."""
+        self._refill(now)
+        self.level = min(self.level, remaining)
+
+
+class RateLimiter:
+    """
+    Per-provider limiter with one bucket per quota kind:
+    - requests        (requests_per_minute)
+    - tokens          (tokens_per_minute)
+    - audio_seconds   (audio_seconds_per_hour)
+
+    Calls only wait when a budget is exhausted. The budgets are corrected with
+    the provider's x-ratelimit-* / retry-after headers when they are available.
+    """
+
+    # nombre del header (sin prefijo) -> bucket local
+    HEADER_BUCKETS = {"requests": "requests", "tokens": "tokens"}
+
+    def __init__(
+        self,
+        name: str,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        audio_seconds_per_hour: Optional[float] = None,
+    ):
+        self.name = name
+        self.buckets: Dict[str, TokenBucket] = {}
+        if requests_per_minute:
+            self.buckets["requests"] = TokenBucket(requests_per_minute, 60)
+        if tokens_per_minute:
+            self.buckets["tokens"] = TokenBucket(tokens_per_minute, 60)
+        if audio_seconds_per_hour:
+            self.buckets["audio_seconds"] = TokenBucket(audio_seconds_per_hour, 3600)
+
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _reserve(self, costs: Dict[str, float]) -> float:
+        with self._lock:
+            now = time.monotonic()
+            wait = self._blocked_until - now
+            for bucket_name, amount in costs.items():
+                bucket = self.buckets.get(bucket_name)
+                if bucket is not None and amount:
+                    wait = max(wait, bucket.reserve(amount, now))
+            return max(0.0, wait)
+
+    def acquire(self, requests: float = 1, **costs: float) -> float:
+        """
+        Blocks the thread until the budget allows the call.
+        usage: limiter.acquire(tokens=1200)
+        """
+        wait = self._reserve({"requests": requests, **costs})
+        if wait > 0:
+            print(f"⏱️ [{self.name}] Cuota agotada, esperando {wait:.1f}s...")
+            time.sleep(wait)
+        return wait
+
+    async def aacquire(self, requests: float = 1, **costs: float) -> float:
+        """Same as acquire but yields to the event loop while waiting."""
+        wait = self._reserve({"requests": requests, **costs})
+        if wait > 0:
+            print(f"⏱️ [{self.name}] Cuota agotada, esperando {wait:.1f}s...")
+            await asyncio.sleep(wait)
+        return wait
+
+    def consume(self, **costs: float) -> None:
+        """Debits usage known only after the call (e.g. real tokens, audio duration)."""
+        self._reserve(costs)
+
+    def backoff(self, seconds: float) -> None:
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+
+    def update_from_headers(self, headers: Optional[Mapping[str, str]]) -> None:
+        if not headers:
+            return
+
+        retry_after = parse_reset_seconds(headers.get("retry-after"))
+        if retry_after:
+            self.backoff(retry_after)
+
+        with self._lock:
+            now = time.monotonic()
+            for header_key, bucket_name in self.HEADER_BUCKETS.items():
+                remaining = headers.get(f"x-ratelimit-remaining-{header_key}")
+                if remaining is None:
+                    continue
+                try:
+                    remaining = float(remaining)
+                except ValueError:
+                    continue
+
+                bucket = self.buckets.get(bucket_name)
+                if bucket is not None:
+                    bucket.sync(remaining, now)
+
+                if remaining <= 0:
+                    reset = parse_reset_seconds(
+                        headers.get(f"x-ratelimit-reset-{header_key}")
+                    )
+                    if reset:
+                        self._blocked_until = max(self._blocked_until, now + reset)
+
+
+_limiters: Dict[str, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(name: str, **limits) -> RateLimiter:
+    """
+    Shared limiter per provider/model: every client created with the same
+    name draws from the same budget, whichever thread or coroutine calls it.
+    """
+    with _limiters_lock:
+        if name not in _limiters:
+            _limiters[name] = RateLimiter(name, **limits)
+        return _limiters[name]
@@ -1,81 +1,65 @@
 from abc import ABC, abstractmethod
-import os
-from pathlib import Path
-import os
-import time
-import subprocess
 import tempfile
 from pathlib import Path
-from groq import Groq
+from typing import Optional
+from groq import Groq, RateLimitError
+from deepgram import DeepgramClient
+from src.infra.clients.audio import hash_audio, iter_chunks, open_audio
+from src.infra.clients.ratelimit import RateLimiter, get_rate_limiter
+from src.infra.dbs.cache import SqliteCache, make_cache_key
 
 
 class ITranscriber(ABC):
     @abstractmethod
-    def transcribe(self, video_path: str) -> str:
+    def transcribe(self, video_path: str) -> dict:
+        """{"text": str, "segments": [{"start": s, "end": s, "text": str}, ...]}"""
         pass
 
 
 class GroqAudioTranscriber(ITranscriber):
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, rate_limiter: Optional[RateLimiter] = None):
         # API Key desde las variables de entorno de Windows
         self.client = Groq(api_key=api_key)
         self.name = "groq"
         self.model = "whisper-large-v3-turbo"
 
-        # El Transcriber ahora es el dueño y protector de su propio ritmo
-        self.SAFE_PAUSE = 20.0
-
-    def _extract_audio_native(self, video_path: str) -> str:
-        """
-        Extrae la pista de audio a un contenedor .m4a (AAC)
-        usando FFmpeg nativo de forma silenciosa.
-        """
-        temp_audio = tempfile.NamedTemporaryFile(delete=False, suffix=".m4a")
-        temp_audio.close()
-
-        # fmt: off
-        command = [
-            "ffmpeg", "-y",
-            "-i", video_path,
-            "-vn",  # Deshabilitar flujo de video
-            "-c:a", "aac",  # Códec AAC nativo para .m4a
-            "-ac", "1",  # Convertir a Mono (óptimo para IA)
-            "-ar", "16000",  # Frecuencia nativa de Whisper (16Khz)
-            "-b:a", "64k",  # Bitrate ligero pero nítido para voces
-            temp_audio.name,
-        ]
-        # fmt: on
-
-        subprocess.run(
-            command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True
+        # Cuotas de whisper en el free tier (RPM y segundos de audio por hora),
+        # compartidas por todas las instancias que usen el mismo modelo
+        self.rate_limiter = rate_limiter or get_rate_limiter(
+            f"groq:{self.model}", requests_per_minute=20, audio_seconds_per_hour=7200
         )
-        return temp_audio.name
 
     def transcribe(self, file_path: str) -> dict:
         """
         Acepta videos (.mp4) o audios directos (.m4a).
-        Aplica la pausa de seguridad interna antes de retornar.
+        El audio de los videos se sube mientras ffmpeg lo extrae (ver AudioStream).
+        Solo espera si la cuota de Groq está agotada.
         """
         path = Path(file_path)
         if not path.exists():
             raise FileNotFoundError(f"No se encontró el archivo: {file_path}")
 
-        is_video = path.suffix.lower() in [".mp4", ".mkv", ".mov", ".avi"]
-        active_audio_path = (
-            self._extract_audio_native(file_path) if is_video else file_path
-        )
-
         print(f"[{path.name}] Enviando audio a Groq Cloud...")
 
+        self.rate_limiter.acquire()
+
         try:
-            with open(active_audio_path, "rb") as audio_file:
-                transcription = self.client.audio.transcriptions.create(
-                    file=audio_file,
+            # el stream no se puede rebobinar: sin reintentos automáticos del SDK
+            client = self.client.with_options(max_retries=0)
+            with open_audio(file_path) as (filename, audio):
+                raw = client.audio.transcriptions.with_raw_response.create(
+                    file=(filename, audio),
                     model=self.model,
                     language="es",
                     temperature=0.0,
                     response_format="verbose_json",
                 )
+            self.rate_limiter.update_from_headers(raw.headers)
+            transcription = raw.parse()
+            # los segundos de audio solo se conocen con la respuesta
+            self.rate_limiter.consume(
+                audio_seconds=float(getattr(transcription, "duration", 0) or 0)
+            )
 
             segments_list = []
             if hasattr(transcription, "segments"):
@@ -88,22 +72,11 @@ class GroqAudioTranscriber(ITranscriber):
                         }
                     )
 
-            # El Transcriber duerme el hilo aquí para proteger la API Key
-            print(f"⏱️ Respetando cuotas de Groq. Esperando {self.SAFE_PAUSE}s...")
-            time.sleep(self.SAFE_PAUSE)
-
             return {"text": transcription.text.strip(), "segments": segments_list}
 
-        finally:
-            if is_video and os.path.exists(active_audio_path):
-                os.remove(active_audio_path)
-
-
-import os
-import subprocess
-import tempfile
-from pathlib import Path
-from deepgram import DeepgramClient
+        except RateLimitError as e:
+            self.rate_limiter.update_from_headers(e.response.headers)
+            raise e
 
 
 class DeepgramAudioTranscriber(ITranscriber):
@@ -112,90 +85,172 @@ class DeepgramAudioTranscriber(ITranscriber):
         self.name = "deepgram"
         self.model = "nova-3"
 
-    def _extract_audio_native(self, video_path: str) -> str:
-        """
-        Extrae la pista de audio a un contenedor .m4a (AAC)
-        usando FFmpeg nativo de forma silenciosa.
-        """
-        temp_audio = tempfile.NamedTemporaryFile(delete=False, suffix=".m4a")
-        temp_audio.close()
-
-        command = [
-            "ffmpeg",
-            "-y",
-            "-i",
-            video_path,
-            "-vn",
-            "-c:a",
-            "aac",
-            "-ac",
-            "1",
-            "-ar",
-            "16000",
-            "-b:a",
-            "64k",
-            temp_audio.name,
-        ]
-
-        subprocess.run(
-            command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True
-        )
-        return temp_audio.name
-
     def transcribe(self, file_path: str) -> dict:
         """
         Acepta videos (.mp4) o audios directos (.m4a).
-        Lee el archivo en memoria y lo envía directo a Deepgram Nova-3.
+        El audio se envía a Deepgram Nova-3 por partes, sin copiarlo entero en memoria.
         """
         path = Path(file_path)
         if not path.exists():
             raise FileNotFoundError(f"No se encontró el archivo: {file_path}")
 
-        is_video = path.suffix.lower() in [".mp4", ".mkv", ".mov", ".avi"]
-        active_audio_path = (
-            self._extract_audio_native(file_path) if is_video else file_path
-        )
-
-        print(f"[{path.name}] Enviando audio en memoria a Deepgram (Nova-3)...")
-
-        try:
-            with open(active_audio_path, "rb") as audio_file:
-                buffer_data = audio_file.read()
+        print(f"[{path.name}] Enviando audio en streaming a Deepgram (Nova-3)...")
 
+        with open_audio(file_path) as (_, audio):
             # Petición a Deepgram Nova-3
             response = self.client.listen.v1.media.transcribe_file(
-                request=buffer_data,
+                request=iter_chunks(audio),
                 model=self.model,
                 language="es",
                 smart_format=True,
                 punctuate=True,
                 paragraphs=True,
-                request_options={"timeout": 300.0},  # <--- Agrega esto
+                # el stream no se puede rebobinar: sin reintentos automáticos
+                request_options={"timeout": 300.0, "max_retries": 0},
             )
 
-            # Mapeo de palabras o párrafos a la lista de segmentos con timestamps
-            channel = response.results.channels[0].alternatives[0]
-            full_text = channel.transcript.strip()
+        # Mapeo de palabras o párrafos a la lista de segmentos con timestamps
+        channel = response.results.channels[0].alternatives[0]
+        full_text = channel.transcript.strip()
 
-            segments_list = []
+        segments_list = []
+
+        # Extraer frases con puntuación y mayúsculas intactas
+        if hasattr(channel, "paragraphs") and channel.paragraphs:
+            for paragraph in channel.paragraphs.paragraphs:
+                for sentence in paragraph.sentences:
+                    segments_list.append(
+                        {
+                            "start": round(sentence.start, 2),
+                            "end": round(sentence.end, 2),
+                            "text": sentence.text.strip(),  # Mantiene mayúsculas y puntos
+                        }
+                    )
+
+        return {
+            "text": full_text,
+            "segments": segments_list,
+        }
+
+
+from concurrent.futures import ThreadPoolExecutor
+from src.infra.clients.audio import (
+    AudioChunk,
+    cut_chunk,
+    detect_silences,
+    extract_audio,
+    plan_chunks,
+    probe_duration,
+    stitch_chunks,
+)
+
+
+class ChunkedTranscriber(ITranscriber):
+    """
+    Wraps another transcriber to handle long episodes:
+    the 16 kHz mono audio is cut at silences into ~chunk_seconds windows
+    (padded with overlap_seconds), the chunks are transcribed concurrently
+    and their segments are shifted and stitched back into one
+    {"text", "segments"} result.
+
+    The wrapped transcriber keeps applying its own rate limiter on every
+    chunk; `rate_limiter` is an extra, optional budget for providers that
+    have none.
+    """
+
+    def __init__(
+        self,
+        transcriber: ITranscriber,
+        chunk_seconds: float = 600,
+        overlap_seconds: float = 5,
+        max_workers: int = 4,
+        rate_limiter: Optional[RateLimiter] = None,
+    ):
+        self.transcriber = transcriber
+        self.name = transcriber.name
+        self.model = transcriber.model
+        self.chunk_seconds = chunk_seconds
+        self.overlap_seconds = overlap_seconds
+        self.max_workers = max_workers
+        self.rate_limiter = rate_limiter
+
+    def _transcribe_chunk(
+        self, audio_path: str, chunk: AudioChunk, chunk_path: str
+    ) -> dict:
+        cut_chunk(audio_path, chunk, chunk_path)
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire(audio_seconds=chunk.duration)
+        return self.transcriber.transcribe(chunk_path)
+
+    def transcribe(self, file_path: str) -> dict:
+        path = Path(file_path)
+        if not path.exists():
+            raise FileNotFoundError(f"No se encontró el archivo: {file_path}")
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            audio_path = extract_audio(file_path, str(Path(temp_dir) / "audio.wav"))
+            duration = probe_duration(audio_path)
+
+            # solo buscamos silencios si realmente hay que cortar
+            silences = (
+                detect_silences(audio_path) if duration > self.chunk_seconds else []
+            )
+            chunks = plan_chunks(
+                duration, silences, self.chunk_seconds, self.overlap_seconds
+            )
+            print(
+                f"[{path.name}] {duration:.0f}s de audio en {len(chunks)} partes "
+                f"({self.name})..."
+            )
+
+            chunk_paths = [
+                str(Path(temp_dir) / f"chunk_{i:03d}.m4a") for i in range(len(chunks))
+            ]
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                results = list(
+                    pool.map(
+                        self._transcribe_chunk,
+                        [audio_path] * len(chunks),
+                        chunks,
+                        chunk_paths,
+                    )
+                )
+
+        return stitch_chunks(chunks, results)
+
+
+class CachedTranscriber(ITranscriber):
+    """
+    Content-addressed cache in front of another transcriber.
+    The key is the hash of the decoded audio plus provider and model, so a
+    renamed or re-downloaded clip is never uploaded twice.
+
+    usage:
+        transcriber = CachedTranscriber(GroqAudioTranscriber(api_key), cache)
+    """
+
+    def __init__(self, transcriber: ITranscriber, cache: SqliteCache):
+        self.transcriber = transcriber
+        self.cache = cache
+        self.name = transcriber.name
+        self.model = transcriber.model
+
+    def cache_key(self, file_path: str) -> str:
+        return make_cache_key(
+            "transcription", self.name, self.model, hash_audio(file_path)
+        )
+
+    def transcribe(self, file_path: str) -> dict:
+        path = Path(file_path)
+        if not path.exists():
+            raise FileNotFoundError(f"No se encontró el archivo: {file_path}")
+
+        key = self.cache_key(file_path)
+        cached = self.cache.get(key)
+        if cached is not None:
+            print(f"[{path.name}] Transcripción en caché ({self.name})")
+            return cached
 
-            # Extraer frases con puntuación y mayúsculas intactas
-            if hasattr(channel, "paragraphs") and channel.paragraphs:
-                for paragraph in channel.paragraphs.paragraphs:
-                    for sentence in paragraph.sentences:
-                        segments_list.append(
-                            {
-                                "start": round(sentence.start, 2),
-                                "end": round(sentence.end, 2),
-                                "text": sentence.text.strip(),  # Mantiene mayúsculas y puntos
-                            }
-                        )
-
-            return {
-                "text": full_text,
-                "segments": segments_list,
-            }
-
-        finally:
-            if is_video and os.path.exists(active_audio_path):
-                os.remove(active_audio_path)
+        result = self.transcriber.transcribe(file_path)
+        self.cache.set(key, result)
+        return result
@@ -7,11 +7,16 @@ from src.config import (
     METALS_DIR,
     IMGS_DIR,
     TEMPLATES_DIR,
+    TRANSCRIPTION_DIR,
 )
 
 from src.domain.common_.path import DirMap, get_path as get_path_
 from functools import partial
-dir_map: DirMap = {"vtt": {"base_dir": VTT_DIR, "ext": ".vtt"}}
+dir_map: DirMap = {
+    "vtt": {"base_dir": VTT_DIR, "ext": ".vtt"},
+    "metals": {"base_dir": METALS_DIR, "ext": ".json"},
+    "transcriptions": {"base_dir": TRANSCRIPTION_DIR, "ext": ".json"},
+}
 
 get_path = partial(get_path_, registry=dir_map)
 # assets = (
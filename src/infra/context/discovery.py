@@ -0,0 +1,76 @@
+from src.config import (
+    QDRANTDB_URI,
+    QDRANT_COLLECTION,
+    QDRANT_QUANTIZATION,
+    QDRANT_ON_DISK,
+    EMBEDDER_URI,
+    INGESTION_DIR,
+    DISCOVERY_TOP_K,
+)
+from src.domain.common import save_json
+from src.infra.clients.embedding import Embedder
+from src.infra.context.common import get_path
+from src.services.discovery import discover_moments
+
+embedder = Embedder(EMBEDDER_URI)
+_vector_store = None
+
+
+def get_vector_store():
+    """
+    Qdrant when QDRANTDB_URI is set; otherwise an in-process exact index
+    built from the gold samples (embedded once per worker process).
+    """
+    global _vector_store
+    if _vector_store is not None:
+        return _vector_store
+
+    if QDRANTDB_URI:
+        from src.infra.dbs.qdrant import get_client, QdrantVectorStore
+
+        _vector_store = QdrantVectorStore(
+            get_client(QDRANTDB_URI),
+            embedder,
+            QDRANT_COLLECTION,
+            quantization=QDRANT_QUANTIZATION,
+            on_disk=QDRANT_ON_DISK,
+        )
+        # crea la colección si falta y asegura los índices de payload
+        _vector_store.create_collection()
+    else:
+        from src.domain.discovery.ingestion import add_samples_from_transcriptions
+        from src.infra.dbs.numpy_index import NumpyVectorIndex
+
+        print("QDRANTDB_URI not defined. Using in-process gold-sample index")
+        index = NumpyVectorIndex(embedder)
+        add_samples_from_transcriptions(INGESTION_DIR, index)
+        _vector_store = index
+
+    return _vector_store
+
+
+def get_min_score(data: dict) -> float:
+    # el formulario manda "sensitivity"; min_score explícito tiene prioridad
+    if data.get("min_score") is not None:
+        return data["min_score"]
+    return data.get("sensitivity") or 0.0
+
+
+def run_discovery(data: dict) -> str:
+    embedder.wait_until_ready()
+    output_filename = data["output_filename"]
+    result = discover_moments(
+        get_path("transcriptions", data["input_filename"]),
+        get_vector_store(),
+        output_filename=output_filename,
+        url=data["url"],
+        limit=data.get("limit") or DISCOVERY_TOP_K,
+        min_score=get_min_score(data),
+        # p. ej. {"show": "mecausa"} para comparar solo con gold samples del mismo show
+        filter=data.get("filter"),
+    )
+
+    output_path = get_path("metals", output_filename)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    save_json(result, str(output_path))
+    return str(output_path)
@@ -8,14 +8,32 @@ from src.infra.clients.embedding import Embedder
 from src.infra.clients.transcription import (
     GroqAudioTranscriber,
     DeepgramAudioTranscriber,
+    ChunkedTranscriber,
+    CachedTranscriber,
 )
 from src.infra.dbs.md import PromptRepository
+from src.infra.dbs.cache import SqliteCache
+from src.config import (
+    LLM_CACHE_PATH,
+    LLM_CACHE_MAX_ENTRIES,
+    LLM_CACHE_MAX_MB,
+    LLM_CACHE_TTL_DAYS,
+    TRANSCRIPTION_CACHE_PATH,
+    TRANSCRIPTION_CACHE_MAX_ENTRIES,
+)
 from src.config import GROQ_API_KEY, GEMINI_API_KEY
 from src.infra.clients.llm import GroqClient, GeminiClient
 from src.services.gen import gen_imgs as gen_imgs_
+from src.domain.discovery.transcription import gen_video_transcriptions_concurrent
 
 gemini_client = GeminiClient(GEMINI_API_KEY)
 prompts_repo = PromptRepository(PROMPTS_DIR)
+llm_cache = SqliteCache(
+    LLM_CACHE_PATH,
+    max_entries=LLM_CACHE_MAX_ENTRIES,
+    max_bytes=LLM_CACHE_MAX_MB * 1024**2,
+    ttl_seconds=LLM_CACHE_TTL_DAYS * 86400,
+)
 
 #qdrant_client = get_client(QDRANTDB_URI)
 #embedder = Embedder(EMBEDDER_URI)
@@ -24,11 +42,41 @@ prompts_repo = PromptRepository(PROMPTS_DIR)
 #qvs = QdrantVectorStore(qdrant_client, embedder, collection_name)
 #qvs.create_collection()
 
-transcriber = GroqAudioTranscriber(GROQ_API_KEY)
-deepgram_transcriber = DeepgramAudioTranscriber(DEEPGRAM_API_KEY)
+transcription_cache = SqliteCache(
+    TRANSCRIPTION_CACHE_PATH, max_entries=TRANSCRIPTION_CACHE_MAX_ENTRIES
+)
+groq_transcriber = GroqAudioTranscriber(GROQ_API_KEY)
+nova_transcriber = DeepgramAudioTranscriber(DEEPGRAM_API_KEY)
+# se revisa la caché (hash del audio) antes de cualquier subida
+transcriber = CachedTranscriber(groq_transcriber, transcription_cache)
+deepgram_transcriber = CachedTranscriber(nova_transcriber, transcription_cache)
+# episodios largos: partes de ~10 min transcritas en paralelo
+chunked_transcriber = CachedTranscriber(
+    ChunkedTranscriber(groq_transcriber, chunk_seconds=600), transcription_cache
+)
+chunked_deepgram_transcriber = CachedTranscriber(
+    ChunkedTranscriber(nova_transcriber, chunk_seconds=600),
+    transcription_cache,
+)
+
+
+def transcribe_ingestion_folder(directory_path=INGESTION_DIR) -> dict:
+    """Transcribes the pending mp4s of the folder with Groq and Deepgram at once."""
+    return gen_video_transcriptions_concurrent(
+        directory_path, [transcriber.transcribe, deepgram_transcriber.transcribe]
+    )
+
 
 async def gen_imgs(url, output_filename, debug=False, force=False):
     return await gen_imgs_(
-        url, output_filename, VTT_DIR, COOKIES_PATH, gemini_client, prompts_repo, debug
+        url,
+        output_filename,
+        VTT_DIR,
+        COOKIES_PATH,
+        gemini_client,
+        prompts_repo,
+        debug,
+        force,
+        cache=llm_cache,
     )
 
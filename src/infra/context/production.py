@@ -2,31 +2,47 @@ from src.services.production.production_service import ProductionService
 from src.services.production.download_service import DownloadService
 from src.services.production.task_service import TaskService
 from src.services.production.prefect_service import PrefectService
+from pymongo import ASCENDING, IndexModel
 from src.infra.dbs.mongo import MongoRepository
 from src.infra.dbs.mongo import get_mongo_client
+from src.infra.dbs.mongo import KEYSET_SORT
 from src.domain.download.models import Download
 from src.domain.production.models import Production
 from src.domain.production.models import Task
 from src.config import (
     MONGODB_URI,
     MONGO_DB_NAME,
+    PREFECT_TRIGGER_CONCURRENCY,
 )
 
 client = get_mongo_client(MONGODB_URI)
-prefect_service = PrefectService()
+prefect_service = PrefectService(max_concurrency=PREFECT_TRIGGER_CONCURRENCY)
+
+
+# mismo orden que KEYSET_SORT: paginar y find_latest son un seek sobre el índice
+LATEST_FIRST = IndexModel(KEYSET_SORT)
+# un output_filename por documento: el índice único resuelve dos requests simultáneos
+UNIQUE_FILENAME = IndexModel([("output_filename", ASCENDING)], unique=True)
+
+TASK_INDEXES = [
+    IndexModel([("status", ASCENDING), ("type", ASCENDING)]),
+    IndexModel([("type", ASCENDING), *KEYSET_SORT]),
+    LATEST_FIRST,
+]
 
 
 class RepositoryHub:
     def __init__(self):
         client = get_mongo_client(MONGODB_URI)
         # fmt: off
-        self.download_repo   = MongoRepository(client, MONGO_DB_NAME, "downloads", Download)
-        self.production_repo = MongoRepository(client, MONGO_DB_NAME, "short_productions", Production)
-        self.task_repo       = MongoRepository(client, MONGO_DB_NAME, "tasks", Task)
-        
-        self.task_repo._collection.create_index([("type",1),("created_at", -1)])
+        self.download_repo   = MongoRepository(client, MONGO_DB_NAME, "downloads", Download, indexes=[UNIQUE_FILENAME, LATEST_FIRST])
+        self.production_repo = MongoRepository(client, MONGO_DB_NAME, "short_productions", Production, indexes=[UNIQUE_FILENAME, LATEST_FIRST])
+        self.task_repo       = MongoRepository(client, MONGO_DB_NAME, "tasks", Task, indexes=TASK_INDEXES)
         # fmt: on
 
+        for repo in (self.download_repo, self.production_repo, self.task_repo):
+            repo.ensure_indexes()
+
 
 class ServiceHub:
     def __init__(self, r: RepositoryHub):
@@ -1,14 +1,25 @@
+from uuid import uuid4
 from src.services.video import build_v1 as build_v1_
+from src.domain.common_.workspace import JobWorkspace
 from src.config import (
     VIDEO_DIR_DOWNLOAD,
     VIDEO_DIR_OUTPUT,
     TEMP_DIR,
     TEMPLATES_DIR,
     FONTS_DIR,
+    JOB_WORKSPACE_QUOTA_MB,
 )
 
 
-async def build_v1(params: dict):
-    return await build_v1_(
-        params, VIDEO_DIR_DOWNLOAD, VIDEO_DIR_OUTPUT, TEMP_DIR, TEMPLATES_DIR, FONTS_DIR
-    )
+async def build_v1(params: dict, task_id: str | None = None):
+    job_id = task_id or str(uuid4())
+    quota = JOB_WORKSPACE_QUOTA_MB * 1024**2
+    # Cada build trabaja en su propio directorio, así N builds pueden correr en paralelo
+    with JobWorkspace(TEMP_DIR, job_id, quota_bytes=quota) as ws:
+        result = await build_v1_(
+            params, VIDEO_DIR_DOWNLOAD, VIDEO_DIR_OUTPUT, ws.path, TEMPLATES_DIR, FONTS_DIR
+        )
+        if params.get("debug_frame"):
+            # el frame de debug se sirve desde TEMP_DIR, lo sacamos antes del cleanup
+            ws.export("debug_frame.png", TEMP_DIR)
+        return result
@@ -1,6 +1,25 @@
 from typing import List, Optional, Any, Dict
 from abc import ABC, abstractmethod
 
+
+class DuplicateEntityError(Exception):
+    """
+    Raises when an insert breaks a unique constraint of the repository.
+    From add_many, `positions` are the indexes of the entities that were not
+    inserted; the others were.
+    """
+
+    def __init__(
+        self,
+        message: str,
+        key: Optional[Dict[str, Any]] = None,
+        positions: Optional[List[int]] = None,
+    ):
+        super().__init__(message)
+        self.key = key or {}
+        self.positions = positions or []
+
+
 class IRepository(ABC):
     @abstractmethod
     def get_all(self) -> List[Any]:
@@ -10,6 +29,26 @@ class IRepository(ABC):
     def add(self, entity: Any) -> None:
         pass
 
+    def add_many(self, entities: List[Any]) -> List[Any]:
+        positions = []
+        for i, entity in enumerate(entities):
+            try:
+                self.add(entity)
+            except DuplicateEntityError:
+                positions.append(i)
+        if positions:
+            raise DuplicateEntityError(
+                f"{len(positions)} duplicate keys", positions=positions
+            )
+        return entities
+
     @abstractmethod
     def get_by_id(self, entity_id: str) -> Optional[Any]:
         pass
+
+    @abstractmethod
+    def delete(self, entity_id: str) -> bool:
+        pass
+
+    def delete_many(self, entity_ids: List[str]) -> int:
+        return sum(self.delete(entity_id) for entity_id in entity_ids)
@@ -1,7 +1,19 @@
-from pymongo import MongoClient
-from pymongo.errors import ConnectionFailure
-from .interfaces import IRepository
-from typing import Any, List, Optional, Dict
+import base64
+import binascii
+from datetime import datetime
+from pymongo import DESCENDING, IndexModel, InsertOne, MongoClient, UpdateOne
+from pymongo.errors import (
+    BulkWriteError,
+    ConnectionFailure,
+    DuplicateKeyError,
+    OperationFailure,
+)
+from .interfaces import DuplicateEntityError, IRepository
+from typing import Any, Iterable, Iterator, List, Optional, Dict, Tuple
+
+# orden de listados y paginación: más recientes primero, _id desempata
+KEYSET_SORT = [("created_at", DESCENDING), ("_id", DESCENDING)]
+DUPLICATE_KEY = 11000
 
 def get_mongo_client(connection_string: str) -> MongoClient:
     """
@@ -20,13 +32,72 @@ def get_mongo_client(connection_string: str) -> MongoClient:
         )
 
 
+def encode_cursor(doc: dict) -> str:
+    """Opaque page cursor: the (created_at, _id) key of the last document sent."""
+    raw = f"{doc['created_at'].isoformat()}|{doc['_id']}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Raises ValueError when the cursor was not built by encode_cursor."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        created_at, entity_id = raw.split("|", 1)
+        return datetime.fromisoformat(created_at), entity_id
+    except (binascii.Error, UnicodeError, ValueError):
+        raise ValueError(f"Cursor inválido: {cursor!r}")
+
+
+def keyset_filter(created_at: datetime, entity_id: str) -> dict:
+    """Everything after (created_at, _id) in KEYSET_SORT order."""
+    return {
+        "$or": [
+            {"created_at": {"$lt": created_at}},
+            {"created_at": created_at, "_id": {"$lt": entity_id}},
+        ]
+    }
+
+
+def build_projection(fields: Optional[Iterable[str]]) -> Optional[dict]:
+    """
+    print(build_projection(["status", "payload.output_filename"]))
+    # {'status': 1, 'payload.output_filename': 1, 'created_at': 1}
+    """
+    if fields is None:
+        return None
+    projection = {field: 1 for field in fields if field not in ("id", "_id")}
+    # created_at siempre viaja: el cursor de la página siguiente se arma con él
+    projection["created_at"] = 1
+    return projection
+
+
 class MongoRepository(IRepository):
     def __init__(
-        self, client: MongoClient, db_name: str, collection_name: str, domain_class
+        self,
+        client: MongoClient,
+        db_name: str,
+        collection_name: str,
+        domain_class,
+        indexes: Optional[List[IndexModel]] = None,
     ):
         self._db = client[db_name]
         self._collection = self._db[collection_name]
         self._domain_class = domain_class
+        self._indexes = indexes or []
+
+    def ensure_indexes(self) -> None:
+        """
+        Creates the declared indexes. Idempotent: indexes that already exist
+        with the same spec are left as they are, so it runs on every startup.
+        """
+        if not self._indexes:
+            return
+        try:
+            self._collection.create_indexes(self._indexes)
+        except OperationFailure as e:
+            # p.ej. un índice único sobre datos que ya tienen duplicados:
+            # la app arranca igual, con las validaciones previas como respaldo
+            print(f"⚠️ Couldnt create indexes on {self._collection.name}: {e}")
 
     # --- Métodos Privados de Mapeo ---
 
@@ -43,28 +114,133 @@ class MongoRepository(IRepository):
         doc["id"] = doc.pop("_id")
         return self._domain_class(**doc)
 
-    # --- Implementación de la Interfaz ---
+    def _map_projected(self, doc: dict) -> dict:
+        # un documento parcial no alcanza para construir la clase de dominio
+        doc["id"] = doc.pop("_id")
+        return doc
 
-    def get_all(self) -> List[Any]:
-        documents = self._collection.find()
-        return [self._map_to_object(doc) for doc in documents]
+    def _map(self, doc: dict, fields: Optional[Iterable[str]]) -> Any:
+        return self._map_to_object(doc) if fields is None else self._map_projected(doc)
 
-    def get_all(self, filters: Optional[dict] = None) -> List[Any]:
+    def _to_query(self, filters: Optional[dict]) -> dict:
         # Si no se pasan filtros, usamos un diccionario vacío para traer todo
-        query = filters if filters is not None else {}
-        
+        query = dict(filters) if filters else {}
+
         # Si tu filtro busca por "id", recuerda mapearlo a "_id" para Mongo
         if "id" in query:
             query["_id"] = query.pop("id")
-            
-        documents = self._collection.find(query).sort("created_at", -1).limit(25)
-        return [self._map_to_object(doc) for doc in documents]
+        return query
+
+    # --- Implementación de la Interfaz ---
+
+    def get_all(self, filters: Optional[dict] = None) -> List[Any]:
+        items, _ = self.find_page(filters)
+        return items
+
+    def find_page(
+        self,
+        filters: Optional[dict] = None,
+        limit: int = 25,
+        cursor: Optional[str] = None,
+        fields: Optional[Iterable[str]] = None,
+    ) -> Tuple[List[Any], Optional[str]]:
+        """
+        One page in KEYSET_SORT order and the cursor of the next one (None on
+        the last page). Each page starts with an index seek after the previous
+        page's last key instead of skipping the documents before it.
+
+        With `fields` only those fields are transferred and the items are
+        dicts with "id" and "created_at" instead of domain objects.
+
+        example usage:
+            items, cursor = repo.find_page({"type": "download"}, fields=["status"])
+            more, cursor = repo.find_page({"type": "download"}, cursor=cursor, fields=["status"])
+        """
+        if limit < 1:
+            # limit(0) en pymongo es "sin límite": traería la colección completa
+            raise ValueError(f"limit debe ser >= 1, se recibió {limit}")
+        fields = list(fields) if fields is not None else None
+        query = self._to_query(filters)
+        if cursor:
+            query = {"$and": [query, keyset_filter(*decode_cursor(cursor))]}
+
+        # un documento de más para saber si hay página siguiente
+        documents = list(
+            self._collection.find(query, build_projection(fields))
+            .sort(KEYSET_SORT)
+            .limit(limit + 1)
+        )
+        has_more = len(documents) > limit
+        next_cursor = encode_cursor(documents[limit - 1]) if has_more else None
+        return [self._map(doc, fields) for doc in documents[:limit]], next_cursor
+
+    def find_latest(
+        self,
+        filters: Optional[dict] = None,
+        fields: Optional[Iterable[str]] = None,
+    ) -> Optional[Any]:
+        """
+        Newest matching document (KEYSET_SORT order) or None. With an index on
+        (created_at, _id) it is a single index seek, whatever the collection size.
+        example usage: repo.find_latest(fields=["url", "start_segment"])
+        """
+        fields = list(fields) if fields is not None else None
+        doc = self._collection.find_one(
+            self._to_query(filters), build_projection(fields), sort=KEYSET_SORT
+        )
+        if doc is None:
+            return None
+        return self._map(doc, fields)
+
+    def iter_all(
+        self,
+        filters: Optional[dict] = None,
+        fields: Optional[Iterable[str]] = None,
+        batch_size: int = 500,
+    ) -> Iterator[Any]:
+        """
+        Streams every matching document in KEYSET_SORT order over a single
+        server cursor, `batch_size` documents per round trip.
+        """
+        fields = list(fields) if fields is not None else None
+        documents = (
+            self._collection.find(self._to_query(filters), build_projection(fields))
+            .sort(KEYSET_SORT)
+            .batch_size(batch_size)
+        )
+        with documents:
+            for doc in documents:
+                yield self._map(doc, fields)
 
     def add(self, entity: Any) -> None:
         doc = self._map_to_dict(entity)
-        result = self._collection.insert_one(doc)
+        try:
+            self._collection.insert_one(doc)
+        except DuplicateKeyError as e:
+            key = (e.details or {}).get("keyValue")
+            raise DuplicateEntityError(f"Duplicate key {key}", key) from e
         return entity
 
+    def add_many(self, entities: List[Any]) -> List[Any]:
+        if not entities:
+            return entities
+        requests = [InsertOne(self._map_to_dict(entity)) for entity in entities]
+        # ordered=False: Mongo no se detiene en el primer error y paraleliza el insert
+        try:
+            self._collection.bulk_write(requests, ordered=False)
+        except BulkWriteError as e:
+            errors = e.details.get("writeErrors", [])
+            if not errors or any(err.get("code") != DUPLICATE_KEY for err in errors):
+                raise
+            # el resto de los documentos sí quedó insertado
+            key = errors[0].get("keyValue")
+            raise DuplicateEntityError(
+                f"{len(errors)} duplicate keys, first {key}",
+                key,
+                positions=sorted(err["index"] for err in errors),
+            ) from e
+        return entities
+
     def get_by_id(self, entity_id: str) -> Optional[Any]:
         try:
             doc = self._collection.find_one({"_id": entity_id})
@@ -73,6 +249,16 @@ class MongoRepository(IRepository):
             # Manejo de IDs inválidos de MongoDB
             return None
 
+    def delete(self, entity_id: str) -> bool:
+        result = self._collection.delete_one({"_id": entity_id})
+        return result.deleted_count > 0
+
+    def delete_many(self, entity_ids: List[str]) -> int:
+        if not entity_ids:
+            return 0
+        result = self._collection.delete_many({"_id": {"$in": list(entity_ids)}})
+        return result.deleted_count
+
     # ---- Extra methods ---
     def update_fields(self, entity_id: str, fields: Dict[str, Any]) -> bool:
         """
@@ -81,9 +267,29 @@ class MongoRepository(IRepository):
         result = self._collection.update_one({"_id": entity_id}, {"$set": fields})
         return result.matched_count > 0
 
+    def update_many(self, updates: Dict[str, Dict[str, Any]]) -> int:
+        """
+        Same as update_fields for many entities in one unordered bulk_write.
+        Returns how many entities were found.
+        example usage: self.update_many({"id_1": {"status": "FAILED"}, "id_2": {"status": "FAILED"}})
+        """
+        if not updates:
+            return 0
+        requests = [
+            UpdateOne({"_id": entity_id}, {"$set": fields})
+            for entity_id, fields in updates.items()
+        ]
+        result = self._collection.bulk_write(requests, ordered=False)
+        return result.matched_count
+
     def exists_by_filename(self, filename: str) -> bool:
+        # con el índice único sobre output_filename es una sola búsqueda en el índice
         document = self._collection.find_one(
             {"output_filename": filename},
             projection={"_id": 1},  # <--- Eficiencia pura: solo trae el ID
         )
         return document is not None
+
+    def delete_by_filename(self, filename: str) -> bool:
+        result = self._collection.delete_one({"output_filename": filename})
+        return result.deleted_count > 0
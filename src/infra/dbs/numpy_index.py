@@ -0,0 +1,150 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+import numpy as np
+from src.infra.dbs.vector_store import IVectorStore
+
+
+@dataclass
+class ScoredPoint:
+    id: str
+    score: float
+    payload: Dict = field(default_factory=dict)
+
+
+@dataclass
+class QueryResponse:
+    points: List[ScoredPoint]
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-12)
+
+
+RANGE_OPS = {
+    "gt": lambda value, limit: value > limit,
+    "gte": lambda value, limit: value >= limit,
+    "lt": lambda value, limit: value < limit,
+    "lte": lambda value, limit: value <= limit,
+}
+
+
+def matches_filter(payload: Dict, conditions: Optional[Dict]) -> bool:
+    """Same dict filters as qdrant.build_filter: exact value, any of a list, or range."""
+    for key, expected in (conditions or {}).items():
+        value = payload.get(key)
+        if isinstance(expected, dict):
+            if value is None or not all(
+                RANGE_OPS[op](value, limit) for op, limit in expected.items()
+            ):
+                return False
+        elif isinstance(expected, (list, tuple, set)):
+            if value not in expected:
+                return False
+        elif value != expected:
+            return False
+    return True
+
+
+class NumpyVectorIndex(IVectorStore):
+    """
+    In-process exact cosine index with the same interface as QdrantVectorStore,
+    for runs without a Qdrant server (local, tests, small gold-sample sets).
+    search/search_batch return objects shaped like Qdrant's responses
+    (`.points[i].score`, `.points[i].payload`), so callers work with both.
+
+    usage:
+        index = NumpyVectorIndex(embedder)
+        add_samples_from_transcriptions(INGESTION_DIR, index)
+        index.search_batch(texts, limit=5)
+    """
+
+    def __init__(self, embedder, dimension: int | None = None):
+        self.embedder = embedder
+        self.dimension = dimension or embedder.vector_size
+        self.ids: List[str] = []
+        self.payloads: List[Dict] = []
+        self.vectors = np.zeros((0, self.dimension), dtype=np.float32)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def create_collection(self):
+        pass
+
+    def _append(self, ids: List[str], vectors: np.ndarray, payloads: List[Dict]):
+        self.ids.extend(ids)
+        self.payloads.extend(payloads)
+        self.vectors = np.vstack([self.vectors, normalize_rows(vectors)])
+
+    def add(self, id: str, text: str, metadata: Dict) -> None:
+        self.add_many([{"id": id, "text": text, "metadata": metadata}])
+
+    def add_many(self, items: List[Dict], batch_size: int = 64, **_: Any) -> int:
+        known = set(self.ids)
+        pending = []
+        for item in items:
+            point_id = str(item["id"])
+            if point_id not in known:
+                known.add(point_id)
+                pending.append({**item, "id": point_id})
+
+        for i in range(0, len(pending), batch_size):
+            batch = pending[i : i + batch_size]
+            vectors = self.embedder.get_vectors([item["text"] for item in batch])
+            self._append(
+                [item["id"] for item in batch],
+                vectors,
+                [item["metadata"] for item in batch],
+            )
+        return len(pending)
+
+    def query_vectors(
+        self, vectors: np.ndarray, limit: int, filter: Optional[Dict] = None
+    ) -> List[QueryResponse]:
+        # el filtro se aplica antes de puntuar, igual que en Qdrant
+        if filter:
+            allowed = np.array(
+                [j for j, p in enumerate(self.payloads) if matches_filter(p, filter)],
+                dtype=np.int64,
+            )
+            matrix = self.vectors[allowed]
+        else:
+            allowed = np.arange(len(self.ids))
+            matrix = self.vectors
+
+        if not len(allowed):
+            return [QueryResponse(points=[]) for _ in range(len(vectors))]
+
+        # similitud coseno exacta: (n_queries, dim) @ (dim, n_allowed)
+        scores = normalize_rows(vectors) @ matrix.T
+        k = min(limit, scores.shape[1])
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+
+        responses = []
+        for row, candidates in zip(scores, top):
+            ordered = candidates[np.argsort(-row[candidates])]
+            responses.append(
+                QueryResponse(
+                    points=[
+                        ScoredPoint(
+                            self.ids[point], float(row[j]), self.payloads[point]
+                        )
+                        for j, point in zip(ordered, allowed[ordered])
+                    ]
+                )
+            )
+        return responses
+
+    def search(
+        self, text: str, top_k: int = 5, filter: Optional[Dict] = None
+    ) -> QueryResponse:
+        return self.search_batch([text], limit=top_k, filter=filter)[0]
+
+    def search_batch(
+        self, texts: List[str], limit: int = 1, filter: Optional[Dict] = None
+    ) -> List[QueryResponse]:
+        if not texts:
+            return []
+        return self.query_vectors(self.embedder.get_vectors(texts), limit, filter)
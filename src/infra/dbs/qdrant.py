@@ -1,8 +1,31 @@
+from concurrent.futures import ThreadPoolExecutor
 from qdrant_client import QdrantClient
-from abc import ABC, abstractmethod
-from typing import List, Optional, Any
-from qdrant_client.models import VectorParams, Distance, QueryRequest
-from typing import List, Dict
+from typing import Dict, List, Optional
+from qdrant_client.models import VectorParams, Distance, QueryRequest, PointStruct
+from qdrant_client.models import (
+    BinaryQuantization,
+    BinaryQuantizationConfig,
+    FieldCondition,
+    Filter,
+    HnswConfigDiff,
+    MatchAny,
+    MatchValue,
+    PayloadSchemaType,
+    QuantizationSearchParams,
+    Range,
+    ScalarQuantization,
+    ScalarQuantizationConfig,
+    ScalarType,
+    SearchParams,
+)
+from src.infra.dbs.vector_store import IVectorStore
+
+# campos que guarda la ingesta (ver add_samples_from_transcriptions)
+DEFAULT_PAYLOAD_INDEXES = {
+    "show": PayloadSchemaType.KEYWORD,
+    "filename": PayloadSchemaType.KEYWORD,
+    "duration": PayloadSchemaType.FLOAT,
+}
 
 
 def get_client(uri: str):
@@ -15,35 +38,108 @@ def get_client(uri: str):
         raise ConnectionError(f"No se pudo conectar a Qdrant: {e}")
 
 
-class IVectorStore(ABC):
-
-    @abstractmethod
-    def add(self) -> None:
-        pass
+def build_filter(conditions: Optional[Dict | Filter]) -> Optional[Filter]:
+    """
+    Simple dict -> Qdrant Filter (all conditions must match):
+        {"show": "mecausa"}                 -> exact match
+        {"show": ["mecausa", "otro"]}       -> any of
+        {"duration": {"gte": 20, "lte": 70}} -> range
+    A Filter instance is passed through as is.
+    """
+    if conditions is None or isinstance(conditions, Filter):
+        return conditions
 
-    @abstractmethod
-    def search(self):
-        pass
-
-    @abstractmethod
-    def search_batch(self):
-        pass
+    must = []
+    for key, value in conditions.items():
+        if isinstance(value, dict):
+            must.append(FieldCondition(key=key, range=Range(**value)))
+        elif isinstance(value, (list, tuple, set)):
+            must.append(FieldCondition(key=key, match=MatchAny(any=list(value))))
+        else:
+            must.append(FieldCondition(key=key, match=MatchValue(value=value)))
+    return Filter(must=must)
 
 
 class QdrantVectorStore(IVectorStore):
-    def __init__(self, client, embedder, collection_name):
+    """
+    Collection options (only applied when the collection is created):
+    - quantization: None | "scalar" (int8) | "binary"; the quantized vectors
+      stay in RAM and searches rescore the top candidates with the originals
+      (`oversampling` x limit)
+    - on_disk: original vectors on disk (memmap) instead of RAM
+    - hnsw_m / hnsw_ef_construct: graph parameters (Qdrant defaults if None)
+    - payload_indexes: {field: PayloadSchemaType} created so filters on
+      show/filename/duration do not scan the payloads
+    """
+
+    def __init__(
+        self,
+        client,
+        embedder,
+        collection_name,
+        quantization: Optional[str] = None,
+        on_disk: bool = False,
+        hnsw_m: Optional[int] = None,
+        hnsw_ef_construct: Optional[int] = None,
+        hnsw_ef: Optional[int] = None,
+        oversampling: float = 2.0,
+        payload_indexes: Optional[Dict] = None,
+    ):
         self.client = client
         self.embedder = embedder
         self.collection_name = collection_name
+        self.quantization = quantization
+        self.on_disk = on_disk
+        self.hnsw_m = hnsw_m
+        self.hnsw_ef_construct = hnsw_ef_construct
+        self.hnsw_ef = hnsw_ef
+        self.oversampling = oversampling
+        self.payload_indexes = (
+            DEFAULT_PAYLOAD_INDEXES if payload_indexes is None else payload_indexes
+        )
+
+    def _quantization_config(self):
+        if self.quantization is None:
+            return None
+        if self.quantization == "scalar":
+            return ScalarQuantization(
+                scalar=ScalarQuantizationConfig(
+                    type=ScalarType.INT8, quantile=0.99, always_ram=True
+                )
+            )
+        if self.quantization == "binary":
+            return BinaryQuantization(
+                binary=BinaryQuantizationConfig(always_ram=True)
+            )
+        raise ValueError(f"Unknown quantization: {self.quantization}")
+
+    def _search_params(self) -> Optional[SearchParams]:
+        if self.quantization is None and self.hnsw_ef is None:
+            return None
+        quantization = (
+            QuantizationSearchParams(
+                ignore=False, rescore=True, oversampling=self.oversampling
+            )
+            if self.quantization
+            else None
+        )
+        return SearchParams(hnsw_ef=self.hnsw_ef, quantization=quantization)
 
     def create_collection(self):
         vector_size = self.embedder.vector_size
         if not self.client.collection_exists(collection_name=self.collection_name):
+            hnsw_config = None
+            if self.hnsw_m is not None or self.hnsw_ef_construct is not None:
+                hnsw_config = HnswConfigDiff(
+                    m=self.hnsw_m, ef_construct=self.hnsw_ef_construct
+                )
             self.client.create_collection(
                 collection_name=self.collection_name,
                 vectors_config=VectorParams(
-                    size=vector_size, distance=Distance.COSINE
+                    size=vector_size, distance=Distance.COSINE, on_disk=self.on_disk
                 ),
+                quantization_config=self._quantization_config(),
+                hnsw_config=hnsw_config,
             )
             print(
                 f"Colección '{self.collection_name}' creada con dimensión {vector_size}"
@@ -53,6 +149,14 @@ class QdrantVectorStore(IVectorStore):
                 f"Collection '{self.collection_name}' exists with dimension {vector_size}"
             )
 
+        # idempotente: también agrega índices faltantes a colecciones existentes
+        for field_name, field_schema in self.payload_indexes.items():
+            self.client.create_payload_index(
+                collection_name=self.collection_name,
+                field_name=field_name,
+                field_schema=field_schema,
+            )
+
     def add(self, id: str, text: str, metadata: Dict) -> None:
         vector = self.embedder.get_vector(text)
         self.client.upsert(
@@ -60,17 +164,104 @@ class QdrantVectorStore(IVectorStore):
             points=[{"id": id, "vector": vector, "payload": metadata}],
         )
 
-    def search(self, text: str, top_k: int = 5) -> List:
+    def existing_ids(self, ids: List[str], batch_size: int = 256) -> set[str]:
+        existing = set()
+        for i in range(0, len(ids), batch_size):
+            records = self.client.retrieve(
+                collection_name=self.collection_name,
+                ids=ids[i : i + batch_size],
+                with_payload=False,
+                with_vectors=False,
+            )
+            existing.update(str(record.id) for record in records)
+        return existing
+
+    def _add_batch(self, items: List[Dict], wait: bool) -> int:
+        vectors = self.embedder.get_vectors([item["text"] for item in items])
+        points = [
+            PointStruct(
+                id=item["id"], vector=vector.tolist(), payload=item["metadata"]
+            )
+            for item, vector in zip(items, vectors)
+        ]
+        self.client.upsert(
+            collection_name=self.collection_name, points=points, wait=wait
+        )
+        return len(points)
+
+    def add_many(
+        self,
+        items: List[Dict],
+        batch_size: int = 64,
+        max_workers: int = 4,
+        skip_existing: bool = True,
+        wait: bool = False,
+    ) -> int:
+        """
+        Bulk version of add: items are {"id", "text", "metadata"} dicts.
+        Texts are embedded through /embed_batch and upserted `batch_size`
+        points at a time, with up to `max_workers` batches in flight.
+        Ids already stored in the collection are skipped (no embedding cost).
+
+        With wait=False Qdrant acknowledges before indexing; points become
+        searchable shortly after the call returns.
+        """
+        # ids repetidos dentro del mismo lote: nos quedamos con el primero
+        unique = {}
+        for item in items:
+            unique.setdefault(str(item["id"]), {**item, "id": str(item["id"])})
+        repeated = len(items) - len(unique)
+
+        existing = 0
+        if skip_existing and unique:
+            for point_id in self.existing_ids(list(unique)):
+                existing += unique.pop(point_id, None) is not None
+
+        pending = list(unique.values())
+        batches = [
+            pending[i : i + batch_size] for i in range(0, len(pending), batch_size)
+        ]
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            added = sum(pool.map(lambda batch: self._add_batch(batch, wait), batches))
+
+        print(
+            f"{added} puntos nuevos en '{self.collection_name}' "
+            f"({existing} ya existían, {repeated} ids repetidos en la entrada)"
+        )
+        return added
+
+    def search(
+        self, text: str, top_k: int = 5, filter: Optional[Dict | Filter] = None
+    ) -> List:
         query_vector: List[float] = self.embedder.get_vector(text)
         results = self.client.query_points(
-            collection_name=self.collection_name, query=query_vector, limit=top_k
+            collection_name=self.collection_name,
+            query=query_vector,
+            limit=top_k,
+            query_filter=build_filter(filter),
+            search_params=self._search_params(),
         )
         return results
 
-    def search_batch(self, texts: List[str]) -> List:
-        query_vectors: List[List[float]] = self.embedder.get_vectors(texts)
+    def search_batch(
+        self,
+        texts: List[str],
+        limit: int = 1,
+        filter: Optional[Dict | Filter] = None,
+    ) -> List:
+        # todos los textos se embeben en una sola llamada a /embed_batch
+        query_vectors = self.embedder.get_vectors(texts)
+        query_filter = build_filter(filter)
+        params = self._search_params()
         requests = [
-            QueryRequest(query=vec, limit=1, with_payload=True) for vec in query_vectors
+            QueryRequest(
+                query=vec.tolist(),
+                limit=limit,
+                with_payload=True,
+                filter=query_filter,
+                params=params,
+            )
+            for vec in query_vectors
         ]
 
         results = self.client.query_batch_points(
@@ -0,0 +1,20 @@
+from abc import ABC, abstractmethod
+
+
+class IVectorStore(ABC):
+
+    @abstractmethod
+    def add(self) -> None:
+        pass
+
+    @abstractmethod
+    def add_many(self) -> int:
+        pass
+
+    @abstractmethod
+    def search(self):
+        pass
+
+    @abstractmethod
+    def search_batch(self):
+        pass
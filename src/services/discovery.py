@@ -0,0 +1,31 @@
+from pathlib import Path
+from src.domain.discovery.parser import parse_transcription, parse_discovery_results
+from src.domain.discovery.scoring import score_candidates
+
+
+def discover_moments(
+    transcription_path: str | Path,
+    vector_store,
+    output_filename: str,
+    url: str,
+    limit: int = 5,
+    min_score: float = 0.0,
+    filter: dict | None = None,
+) -> list[dict]:
+    """
+    transcription (.json) -> candidate clips -> scored against the gold
+    samples in `vector_store` -> download-ready results, best first.
+    """
+    transcription_path = Path(transcription_path)
+    if not transcription_path.exists():
+        raise FileNotFoundError(f"Transcription not found: {transcription_path}")
+
+    candidates = parse_transcription(str(transcription_path))
+    scored = score_candidates(candidates, vector_store, limit=limit, filter=filter)
+    scored = [item for item in scored if item["score"] >= min_score]
+    print(
+        f"{len(scored)}/{len(candidates)} candidatos puntuados "
+        f"({transcription_path.name})"
+    )
+
+    return parse_discovery_results(scored, prefix=output_filename, url=url)
@@ -1,9 +1,11 @@
+import asyncio
 from pathlib import Path
 from typing import List
 from src.domain.download.services import download_vtt
 from src.domain.discovery.parser import parse_vtt_
-from src.domain.discovery.parser import format_to_text_block
+from src.domain.discovery.parser import format_to_text_block, split_into_windows
 from src.domain.common import read_json, save_json
+from src.infra.dbs.cache import make_cache_key
 from pydantic import BaseModel
 
 
@@ -27,6 +29,24 @@ class VignettesAnalysis(BaseModel):
     items: List[Vignette]
 
 
+def llm_cache_key(
+    llm_client,
+    system_prompt: str,
+    user_content: str,
+    response_model: BaseModel,
+    temperature: float,
+) -> str:
+    """Same provider, model, prompts, schema and temperature -> same key."""
+    return make_cache_key(
+        llm_client.__class__.__name__,
+        getattr(llm_client, "model", None),
+        system_prompt,
+        user_content,
+        response_model.model_json_schema(),
+        temperature,
+    )
+
+
 def run_structured_llm(
     llm_client,
     prompts_repo,
@@ -35,9 +55,20 @@ def run_structured_llm(
     response_model: BaseModel,
     temperature: float = 0.1,
     debug: bool = False,
+    cache=None,
 ) -> BaseModel:
     _, system_prompt = prompts_repo.get(prompt_key)
 
+    key = None
+    if cache is not None:
+        key = llm_cache_key(
+            llm_client, system_prompt, user_content, response_model, temperature
+        )
+        cached = cache.get(key)
+        if cached is not None:
+            print(f"[{prompt_key}] LLM cache hit, skipping call...")
+            return response_model.model_validate(cached)
+
     print(f"[{prompt_key}] Sending text to LLM...")
     result = llm_client.generate(
         system_prompt,
@@ -52,6 +83,52 @@ def run_structured_llm(
         print("User:", user_content)
         print("Output:", result)
 
+    if key is not None:
+        cache.set(key, result.model_dump(mode="json"))
+
+    return result
+
+
+async def arun_structured_llm(
+    llm_client,
+    prompts_repo,
+    prompt_key: str,
+    user_content: str,
+    response_model: BaseModel,
+    temperature: float = 0.1,
+    debug: bool = False,
+    cache=None,
+) -> BaseModel:
+    """Async version of run_structured_llm, does not block the event loop."""
+    _, system_prompt = prompts_repo.get(prompt_key)
+
+    key = None
+    if cache is not None:
+        key = llm_cache_key(
+            llm_client, system_prompt, user_content, response_model, temperature
+        )
+        cached = cache.get(key)
+        if cached is not None:
+            print(f"[{prompt_key}] LLM cache hit, skipping call...")
+            return response_model.model_validate(cached)
+
+    print(f"[{prompt_key}] Sending text to LLM (Async)...")
+    result = await llm_client.agenerate(
+        system_prompt,
+        user_content,
+        response_model=response_model,
+        temperature=temperature,
+    )
+
+    if debug:
+        print(f"--- DEBUG [{prompt_key}] ---")
+        print("System:", system_prompt)
+        print("User:", user_content)
+        print("Output:", result)
+
+    if key is not None:
+        cache.set(key, result.model_dump(mode="json"))
+
     return result
 
 
@@ -94,26 +171,125 @@ class SegmentsProvider:
         return await self.gen(url, output_filename, vtt_dir, cookies_path)
 
 
-class MomentsDetector:
+def rebase_limits(llm_output: list[dict], offset: int, size: int) -> list[dict]:
+    """Maps window-local `limits` to global segment ids, clamped to the window."""
+    result = []
+    for item in llm_output:
+        start, end = sorted((int(item["limits"][0]), int(item["limits"][1])))
+        start, end = max(0, start), min(size - 1, end)
+        if start > end:
+            continue  # el LLM devolvió ids fuera de la ventana
+        result.append(
+            {**item, "limits": [str(start + offset), str(end + offset)]}
+        )
+    return result
+
+
+def merge_overlapping_moments(
+    llm_output: list[dict], min_overlap: float = 0.5
+) -> list[dict]:
+    """
+    Windows overlap, so the same moment can be detected twice with slightly
+    different limits. Moments whose overlap (intersection over the shorter
+    one) reaches `min_overlap` are merged into their union, keeping the
+    summary of the longer one.
+    """
+    items = sorted(llm_output, key=lambda x: (int(x["limits"][0]), int(x["limits"][1])))
+    merged = []
+    for item in items:
+        start, end = int(item["limits"][0]), int(item["limits"][1])
+        if merged:
+            last = merged[-1]
+            last_start, last_end = int(last["limits"][0]), int(last["limits"][1])
+            inter = min(end, last_end) - max(start, last_start) + 1
+            shorter = min(end - start, last_end - last_start) + 1
+            if inter > 0 and inter / shorter >= min_overlap:
+                longer = item if end - start > last_end - last_start else last
+                merged[-1] = {
+                    **longer,
+                    "limits": [str(min(start, last_start)), str(max(end, last_end))],
+                }
+                continue
+        merged.append(item)
+    return merged
 
-    def __init__(self, prompts_repo, llm_client):
+
+class MomentsDetector:
+    """
+    Long transcripts are split into overlapping windows of `window_tokens`
+    (map), each window is analysed on its own and the moments are re-based
+    to global ids and deduplicated (reduce). Short transcripts fit in a
+    single window and behave as one request.
+    """
+
+    def __init__(
+        self,
+        prompts_repo,
+        llm_client,
+        cache=None,
+        window_tokens: int = 3000,
+        window_overlap: int = 5,
+        max_concurrency: int = 4,
+    ):
         self.prompts_repo = prompts_repo
         self.llm_client = llm_client
+        self.cache = cache
+        self.window_tokens = window_tokens
+        self.window_overlap = window_overlap
+        self.max_concurrency = max_concurrency
+
+    def _windows(self, text_segments) -> list[tuple[int, list]]:
+        windows = split_into_windows(
+            text_segments, self.window_tokens, self.window_overlap
+        )
+        if len(windows) > 1:
+            print(f"[MomentsDetector] Transcript split into {len(windows)} windows")
+        return windows
+
+    def _reduce(self, windows, window_outputs, text_segments) -> list[dict]:
+        llm_output = []
+        for (offset, window), output in zip(windows, window_outputs):
+            llm_output += rebase_limits(output, offset, len(window))
+        if len(windows) > 1:
+            llm_output = merge_overlapping_moments(llm_output)
+        return self.map_delimited_segments(llm_output, json_base=text_segments)
 
     def gen(self, text_segments, debug: bool):
-        text_for_llm = format_to_text_block(text_segments)
-
-        llm_result = run_structured_llm(
-            self.llm_client,
-            self.prompts_repo,
-            prompt_key="textanalizer",
-            user_content=text_for_llm,
-            response_model=SegmentsAnalysis,
-            debug=debug,
-        )
-        llm_output = llm_result.model_dump(mode="json")["items"]
-        result = self.map_delimited_segments(llm_output, json_base=text_segments)
-        return result
+        windows = self._windows(text_segments)
+        window_outputs = []
+        for _, window in windows:
+            llm_result = run_structured_llm(
+                self.llm_client,
+                self.prompts_repo,
+                prompt_key="textanalizer",
+                user_content=format_to_text_block(window),
+                response_model=SegmentsAnalysis,
+                debug=debug,
+                cache=self.cache,
+            )
+            window_outputs.append(llm_result.model_dump(mode="json")["items"])
+
+        return self._reduce(windows, window_outputs, text_segments)
+
+    async def agen(self, text_segments, debug: bool):
+        windows = self._windows(text_segments)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def analyse(window) -> list[dict]:
+            async with semaphore:
+                llm_result = await arun_structured_llm(
+                    self.llm_client,
+                    self.prompts_repo,
+                    prompt_key="textanalizer",
+                    user_content=format_to_text_block(window),
+                    response_model=SegmentsAnalysis,
+                    debug=debug,
+                    cache=self.cache,
+                )
+            return llm_result.model_dump(mode="json")["items"]
+
+        window_outputs = await asyncio.gather(*(analyse(w) for _, w in windows))
+        return self._reduce(windows, window_outputs, text_segments)
 
     def fetch_or_gen(
         self,
@@ -134,6 +310,25 @@ class MomentsDetector:
         save_json(result, path)
         return result
 
+    async def afetch_or_gen(
+        self,
+        filepath: Path | str,
+        text_segments: list[dict],
+        debug: bool = False,
+        force: bool = False,
+    ) -> list[dict]:
+        path = Path(filepath)
+        class_name = self.__class__.__name__
+
+        if path.exists() and not force:
+            print(f"[{class_name}] File exists {path.name}, skipping generation...")
+            return read_json(path)
+
+        print(f"[{class_name}] File missing {path.name}, generating...")
+        result = await self.agen(text_segments, debug=debug)
+        save_json(result, path)
+        return result
+
     def map_delimited_segments(
         self, llm_output: list[dict], json_base: list[dict]
     ) -> list[dict]:
@@ -155,9 +350,10 @@ class MomentsDetector:
 
 class VignettesEditor:
 
-    def __init__(self, prompts_repo, llm_client):
+    def __init__(self, prompts_repo, llm_client, cache=None):
         self.prompts_repo = prompts_repo
         self.llm_client = llm_client
+        self.cache = cache
 
     def gen(self, moments: list[dict], debug: bool = False) -> list[dict]:
 
@@ -168,6 +364,21 @@ class VignettesEditor:
             user_content=str(moments),
             response_model=VignettesAnalysis,
             debug=debug,
+            cache=self.cache,
+        )
+
+        return llm_result.model_dump(mode="json")["items"]
+
+    async def agen(self, moments: list[dict], debug: bool = False) -> list[dict]:
+
+        llm_result = await arun_structured_llm(
+            self.llm_client,
+            self.prompts_repo,
+            prompt_key="texteditor",
+            user_content=str(moments),
+            response_model=VignettesAnalysis,
+            debug=debug,
+            cache=self.cache,
         )
 
         return llm_result.model_dump(mode="json")["items"]
@@ -191,6 +402,25 @@ class VignettesEditor:
         save_json(result, path)
         return result
 
+    async def afetch_or_gen(
+        self,
+        filepath: Path | str,
+        moments: list[dict],
+        debug: bool = False,
+        force: bool = False,
+    ) -> list[dict]:
+        path = Path(filepath)
+        class_name = self.__class__.__name__
+
+        if path.exists() and not force:
+            print(f"[{class_name}] File exists {path.name}, skipping generation...")
+            return read_json(path)
+
+        print(f"[{class_name}] File missing {path.name}, generating...")
+        result = await self.agen(moments, debug=debug)
+        save_json(result, path)
+        return result
+
 
 async def gen_imgs(
     url: str,
@@ -201,6 +431,7 @@ async def gen_imgs(
     prompts_repo,
     debug: bool = False,
     force: bool = False,
+    cache=None,
 ):
 
     video_id = Path(output_filename).stem
@@ -211,8 +442,8 @@ async def gen_imgs(
         "vignettes": out_dir / f"{video_id}_vignettes.json",
     }
     ts_provider = SegmentsProvider()
-    m_detector = MomentsDetector(prompts_repo, llm_client)
-    v_editor = VignettesEditor(prompts_repo, llm_client)
+    m_detector = MomentsDetector(prompts_repo, llm_client, cache=cache)
+    v_editor = VignettesEditor(prompts_repo, llm_client, cache=cache)
 
     text_segments = await ts_provider.fetch_or_gen(
         filepath=paths["vtt"],
@@ -223,11 +454,11 @@ async def gen_imgs(
         force=force,
     )
 
-    moments = m_detector.fetch_or_gen(
+    moments = await m_detector.afetch_or_gen(
         filepath=paths["moments"], text_segments=text_segments, debug=debug, force=force
     )
 
-    vignettes = v_editor.fetch_or_gen(
+    vignettes = await v_editor.afetch_or_gen(
         filepath=paths["vignettes"], moments=moments, debug=debug, force=force
     )
 
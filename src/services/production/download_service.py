@@ -1,9 +1,15 @@
-from typing import Dict
-from src.infra.dbs.interfaces import IRepository
+from dataclasses import fields
+from typing import Dict, List, Optional
+from src.infra.dbs.interfaces import DuplicateEntityError, IRepository
 from uuid import uuid4
 from src.domain.production.models import Download
 import requests
 
+# lo que el formulario de descarga precarga desde la última descarga
+LAST_DOWNLOAD_FIELDS = ["url", "start_segment", "end_segment", "output_filename"]
+# campos de un payload que se guardan en la descarga (los resultados de discovery traen más)
+DOWNLOAD_PARAMS = {f.name for f in fields(Download)} - {"id", "created_at"}
+
 
 class DownloadValidationError(Exception):
     """Raises when a condition is not me to start a download"""
@@ -19,14 +25,52 @@ class DownloadService:
         self.download_repo = download_repo
 
     def get_last_download(self):
-        params = self.download_repo.get_all()
-        if len(params) > 0:
-            return params[-1]
-        return {}
+        params = self.download_repo.find_latest(fields=LAST_DOWNLOAD_FIELDS)
+        return params or {}
 
     def project(self, params: Dict):
-        item = Download(**params)
-        self.download_repo.add(item)
+        """
+        Persists the download. The unique index on output_filename makes this
+        insert the final check: of two requests that both passed `validate`,
+        the second one fails here.
+        """
+        item = self._to_download(params)
+        try:
+            self.download_repo.add(item)
+        except DuplicateEntityError:
+            raise self._filename_exists_error(item.output_filename)
+        return item
+
+    def project_many(self, payloads: List[Dict]) -> List[Optional[Download]]:
+        """
+        Same as project for many payloads in a single bulk insert. Returns one
+        item per payload, in order: the reserved Download, or None when its
+        output_filename already exists.
+        """
+        items = [self._to_download(params) for params in payloads]
+        try:
+            self.download_repo.add_many(items)
+        except DuplicateEntityError as e:
+            for i in e.positions:
+                items[i] = None
+        return items
+
+    def release(self, download_ids: List[str]) -> None:
+        """
+        Removes downloads whose task could not be created or sent, so their
+        output_filename can be used again.
+        """
+        self.download_repo.delete_many(download_ids)
+
+    def release_filename(self, filename: str) -> None:
+        """
+        Removes the download reserved under `filename` once its task failed
+        in the worker, so the download can be retried.
+        """
+        self.download_repo.delete_by_filename(filename)
+
+    def _to_download(self, params: Dict) -> Download:
+        return Download(**{k: v for k, v in params.items() if k in DOWNLOAD_PARAMS})
 
     def get_new_uuid(self):
         return str(uuid4())
@@ -42,6 +86,9 @@ class DownloadService:
         filename = params.get("output_filename")
         exists = self.download_repo.exists_by_filename(filename)
         if exists:
-            raise DownloadValidationError(
-                f"El archivo '{filename}' ya existe en la base de datos."
-            )
+            raise self._filename_exists_error(filename)
+
+    def _filename_exists_error(self, filename: str) -> DownloadValidationError:
+        return DownloadValidationError(
+            f"El archivo '{filename}' ya existe en la base de datos."
+        )
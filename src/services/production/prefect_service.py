@@ -1,37 +1,61 @@
+import asyncio
 from prefect.deployments import run_deployment
-from typing import Dict
+from typing import Dict, List, Tuple
 
 
 class PrefectService:
 
-    async def trigger_download(self, task_id: str, data: Dict):
-        print(f"Sending to download worker: {data.get('output_filename')} ")
-        flow_run = await run_deployment(
-            name="download/main",
+    def __init__(self, max_concurrency: int = 8):
+        # Límite de llamadas simultáneas a la API de Prefect en trigger_many
+        self.max_concurrency = max_concurrency
+
+    async def _trigger(self, name: str, task_id: str, data: Dict):
+        return await run_deployment(
+            name=name,
             parameters={"task_id": task_id, "data": data},
             timeout=0,  # IMPORTANTÍSIMO: 0 significa "encola y no te quedes esperando a que termine"
         )
 
+    async def trigger_many(
+        self,
+        name: str,
+        items: List[Tuple[str, Dict]],
+        max_concurrency: int | None = None,
+    ) -> List[Dict]:
+        """
+        Fans out one deployment run per (task_id, data) item, bounded by a semaphore.
+        Returns one result per item, in order: {"task_id", "status", "error"?}.
+        A failing run does not cancel the others.
+        """
+        semaphore = asyncio.Semaphore(max_concurrency or self.max_concurrency)
+
+        async def run_one(task_id: str, data: Dict) -> Dict:
+            async with semaphore:
+                try:
+                    await self._trigger(name, task_id, data)
+                    return {"task_id": task_id, "status": "sent"}
+                except Exception as e:
+                    print(f"Couldnt trigger {name} for task={task_id[:5]}: {e}")
+                    return {"task_id": task_id, "status": "error", "error": str(e)}
+
+        print(f"Sending {len(items)} runs to {name} ")
+        return await asyncio.gather(*(run_one(t, d) for t, d in items))
+
+    async def trigger_download(self, task_id: str, data: Dict):
+        print(f"Sending to download worker: {data.get('output_filename')} ")
+        flow_run = await self._trigger("download/main", task_id, data)
+
+    async def trigger_downloads(self, items: List[Tuple[str, Dict]]) -> List[Dict]:
+        return await self.trigger_many("download/main", items)
+
     async def trigger_discovery(self, task_id: str, data: Dict):
         print(f"Sending to discovery worker: {data.get('output_filename')} ")
-        flow_run = await run_deployment(
-            name="discovery/main",
-            parameters={"task_id": task_id, "data": data},
-            timeout=0,  # IMPORTANTÍSIMO: 0 significa "encola y no te quedes esperando a que termine"
-        )
-    
+        flow_run = await self._trigger("discovery/main", task_id, data)
+
     async def trigger_video_build(self, task_id: str, data: Dict):
         print(f"Sending to videobuild worker: {data.get('output_filename')} ")
-        flow_run = await run_deployment(
-            name="video-build/main",
-            parameters={"task_id": task_id, "data": data},
-            timeout=0,  # IMPORTANTÍSIMO: 0 significa "encola y no te quedes esperando a que termine"
-        )
+        flow_run = await self._trigger("video-build/main", task_id, data)
 
     async def trigger_ingestion(self, task_id: str, data: Dict):
         print(f"Sending to ingestion worker: {data.get('output_filename')} ")
-        flow_run = await run_deployment(
-            name="ingestion/main",
-            parameters={"task_id": task_id, "data": data},
-            timeout=0,  # IMPORTANTÍSIMO: 0 significa "encola y no te quedes esperando a que termine"
-        )
\ No newline at end of file
+        flow_run = await self._trigger("ingestion/main", task_id, data)
@@ -2,6 +2,7 @@ from uuid import uuid4
 from typing import Dict
 import requests
 from src.domain.production.models import Production
+from src.infra.dbs.interfaces import DuplicateEntityError
 
 
 class ProductionValidationError(Exception):
@@ -18,8 +19,31 @@ class ProductionService:
         self.production_repo = production_repo
 
     def project(self, params: Dict):
+        """
+        Persists the production. The unique index on output_filename makes
+        this insert the final check: of two requests that both passed
+        `validate`, the second one fails here.
+        """
         item = Production(**params)
-        self.production_repo.add(item)
+        try:
+            self.production_repo.add(item)
+        except DuplicateEntityError:
+            raise self._filename_exists_error(item.output_filename)
+        return item
+
+    def release(self, production_id: str) -> None:
+        """
+        Removes a production whose task could not be created or sent, so its
+        output_filename can be used again.
+        """
+        self.production_repo.delete(production_id)
+
+    def release_filename(self, filename: str) -> None:
+        """
+        Removes the production reserved under `filename` once its task failed
+        in the worker, so the production can be retried.
+        """
+        self.production_repo.delete_by_filename(filename)
 
     def get_new_uuid(self):
         return str(uuid4())
@@ -35,6 +59,9 @@ class ProductionService:
         filename = params.get("output_filename")
         exists = self.production_repo.exists_by_filename(filename)
         if exists:
-            raise ProductionValidationError(
-                f"El archivo '{filename}' ya existe en la base de datos."
-            )
+            raise self._filename_exists_error(filename)
+
+    def _filename_exists_error(self, filename: str) -> ProductionValidationError:
+        return ProductionValidationError(
+            f"El archivo '{filename}' ya existe en la base de datos."
+        )
@@ -1,7 +1,16 @@
 from src.infra.dbs.interfaces import IRepository
 from src.domain.production.models import Task, TaskStatus
 from uuid import uuid4
-from typing import List, Dict
+from typing import Dict, Iterator, List, Optional
+
+# lo que usan los listados de tareas de la UI; el resto del payload no viaja
+TASK_LIST_FIELDS = [
+    "type",
+    "status",
+    "created_at",
+    "payload.output_filename",
+    "payload.file_type",
+]
 
 
 class TaskService:
@@ -21,11 +30,37 @@ class TaskService:
         else:
             print("Unknown state for ", task_id)
 
+    def get_by_id(self, task_id: str) -> Optional[Task]:
+        return self.task_repo.get_by_id(task_id)
+
     def get_all(self, type: str = None) -> List[Task]:
         filters = {"type": type} if type else {}
         result = self.task_repo.get_all(filters)
         return result
 
+    def get_page(
+        self,
+        type: str = None,
+        limit: int = 25,
+        cursor: Optional[str] = None,
+        fields: Optional[List[str]] = TASK_LIST_FIELDS,
+    ) -> Dict:
+        """
+        Newest tasks first, `limit` per page. Pass back `next_cursor` to get
+        the following page; fields=None returns whole tasks.
+        """
+        filters = {"type": type} if type else {}
+        items, next_cursor = self.task_repo.find_page(
+            filters, limit=limit, cursor=cursor, fields=fields
+        )
+        return {"items": items, "next_cursor": next_cursor}
+
+    def iter_tasks(
+        self, type: str = None, fields: Optional[List[str]] = TASK_LIST_FIELDS
+    ) -> Iterator:
+        filters = {"type": type} if type else {}
+        return self.task_repo.iter_all(filters, fields=fields)
+
     def create_task(self, type, payload=None):
         payload["id"] = self.get_new_uuid()
         task = Task(
@@ -35,6 +70,15 @@ class TaskService:
         self.task_repo.add(task)
         return task.id
 
+    def create_tasks(self, type, payloads: List[Dict]) -> List[str]:
+        """Same as create_task but persists all tasks in a single round trip."""
+        tasks = []
+        for payload in payloads:
+            payload["id"] = self.get_new_uuid()
+            tasks.append(Task(type=type, payload=payload))
+        self.task_repo.add_many(tasks)
+        return [task.id for task in tasks]
+
     def _update_status(self, task_id: str, status: TaskStatus) -> None:
         """Método privado que centraliza la actualización."""
         self.task_repo.update_fields(task_id, {"status": status})
@@ -48,5 +92,10 @@ class TaskService:
     def mark_as_failed(self, task_id: str) -> None:
         self._update_status(task_id, TaskStatus.FAILED)
 
+    def mark_many_as_failed(self, task_ids: List[str]) -> int:
+        """Same as mark_as_failed for many tasks in a single round trip."""
+        updates = {task_id: {"status": TaskStatus.FAILED} for task_id in task_ids}
+        return self.task_repo.update_many(updates)
+
     def get_new_uuid(self):
         return str(uuid4())
@@ -1,4 +1,4 @@
-from src.domain.video.resizer import resize_zoomed_square
+from src.domain.video.resizer import resize_zoomed_square, get_vf_zoomed_square
 from src.domain.video.layer import add_text_to_template
 from src.domain.video.assembler import assemble_video_and_template
 from pathlib import Path
@@ -14,10 +14,17 @@ async def build_v1(
 ):
     input_filename = params.get("input_filename")
     force_resize = params.get("force_resize", True)
+    # fused: resize + assemble in a single ffmpeg pass (one decode, one encode,
+    # no intermediate file). Set to False to keep the two-pass pipeline.
+    fused = params.get("fused", True)
     input_fp = Path(input_dir) / f"{input_filename}.mp4"
-    resized_fp = Path(temp_dir) / "temp_resized.mp4"
 
-    resized_fp = await resize_zoomed_square(input_fp, resized_fp, force_resize)
+    if fused:
+        video_fp, pre_filter = input_fp, get_vf_zoomed_square()
+    else:
+        resized_fp = Path(temp_dir) / "temp_resized.mp4"
+        video_fp = await resize_zoomed_square(input_fp, resized_fp, force_resize)
+        pre_filter = ""
 
     template_name = params.get("template_name", "fp")
     template_path = Path(template_dir) / f"{template_name}.png"
@@ -36,7 +43,7 @@ async def build_v1(
     output_fp = Path(output_dir) / f"{output_filename}.mp4"
     debug_frame = params.get("debug_frame")
     result = await assemble_video_and_template(
-        resized_fp, output_fp, layer_fp, debug_frame, temp_dir
+        video_fp, output_fp, layer_fp, debug_frame, temp_dir, pre_filter=pre_filter
     )
     if debug_frame:
         print(f"Debug frame built at {Path(temp_dir) / "debug_frame.png"}")
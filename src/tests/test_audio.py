@@ -0,0 +1,52 @@
+from src.infra.clients.audio import parse_silences, plan_chunks, stitch_chunks
+
+silencedetect_log = """
+[silencedetect @ 0x1] silence_start: 595.2
+[silencedetect @ 0x1] silence_end: 596.8 | silence_duration: 1.6
+[silencedetect @ 0x1] silence_start: 1190
+[silencedetect @ 0x1] silence_end: 1191 | silence_duration: 1
+[silencedetect @ 0x1] silence_start: 1499.5
+"""
+
+
+def test_plan_chunks_cuts_at_silences_with_overlap():
+    silences = parse_silences(silencedetect_log)
+    assert silences == [(595.2, 596.8), (1190.0, 1191.0)]
+
+    chunks = plan_chunks(1500, silences, chunk_seconds=600, overlap_seconds=5)
+    assert [(c.keep_from, c.keep_to) for c in chunks] == [
+        (0.0, 596.0),
+        (596.0, 1190.5),
+        (1190.5, 1500),
+    ]
+    assert (chunks[1].start, chunks[1].end) == (591.0, 1195.5)
+
+
+def test_stitch_chunks_shifts_and_deduplicates_overlap():
+    chunks = plan_chunks(1000, [], chunk_seconds=600, overlap_seconds=5)
+    results = [
+        {
+            "segments": [
+                {"start": 0.0, "end": 4.0, "text": "Hola."},
+                {"start": 597.0, "end": 602.0, "text": "Corte."},
+            ]
+        },
+        # la segunda parte arranca en 595s: "Corte." se repite en el solape
+        {
+            "segments": [
+                {"start": 2.0, "end": 7.0, "text": "Corte."},
+                {"start": 10.0, "end": 12.0, "text": "Fin."},
+            ]
+        },
+    ]
+
+    result = stitch_chunks(chunks, results)
+    assert result["text"] == "Hola. Corte. Fin."
+    assert [seg["start"] for seg in result["segments"]] == [0.0, 597.0, 605.0]
+
+
+def test_stitch_chunks_keeps_text_of_chunks_without_segments():
+    chunks = plan_chunks(30, [], chunk_seconds=600)
+    result = stitch_chunks(chunks, [{"text": "hola mundo", "segments": []}])
+
+    assert result == {"text": "hola mundo", "segments": []}
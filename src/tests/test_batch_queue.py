@@ -0,0 +1,72 @@
+import asyncio
+import threading
+import time
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("fastapi")
+
+from src.api.embedding import BatchQueue
+
+
+def embed_numbers(texts):
+    # cada texto es un número: su fila lo repite, así se ve a quién le tocó cada una
+    return np.array([[float(text)] for text in texts], dtype=np.float32)
+
+
+async def submit_all(queue: BatchQueue, requests):
+    await queue.start()
+    try:
+        return await asyncio.gather(
+            *(queue.submit(texts) for texts in requests), return_exceptions=True
+        )
+    finally:
+        await queue.stop()
+
+
+def test_batch_queue_coalesces_requests_and_carries_overflow():
+    calls = []
+
+    def embed(texts):
+        calls.append(list(texts))
+        return embed_numbers(texts)
+
+    # 10 peticiones de 3 textos con lotes de 8: la tercera de cada par no entra y pasa al siguiente
+    requests = [[str(3 * i + k) for k in range(3)] for i in range(10)]
+    queue = BatchQueue(embed, max_batch_size=8, max_wait_ms=50, workers=1)
+    results = asyncio.run(submit_all(queue, requests))
+
+    assert [len(batch) for batch in calls] == [6, 6, 6, 6, 6]
+    for texts, result in zip(requests, results):
+        assert result[:, 0].tolist() == [float(text) for text in texts]
+    assert queue.metrics()["batches"] == 5
+    assert queue.metrics()["requests"] == 10
+
+
+def test_batch_queue_failure_only_reaches_its_own_batch():
+    lock = threading.Lock()
+    running = {"now": 0, "max": 0}
+
+    def embed(texts):
+        with lock:
+            running["now"] += 1
+            running["max"] = max(running["max"], running["now"])
+        try:
+            time.sleep(0.02)
+            if "-1" in texts:
+                raise ValueError("boom")
+            return embed_numbers(texts)
+        finally:
+            with lock:
+                running["now"] -= 1
+
+    requests = [["1", "2"], ["3", "4"], ["5", "6"], ["-1", "7"], ["8", "9"]]
+    queue = BatchQueue(embed, max_batch_size=4, max_wait_ms=50, workers=2)
+    ok_1, ok_2, failed_1, failed_2, ok_3 = asyncio.run(submit_all(queue, requests))
+
+    assert ok_1[:, 0].tolist() == [1.0, 2.0]
+    assert ok_2[:, 0].tolist() == [3.0, 4.0]
+    assert isinstance(failed_1, ValueError) and isinstance(failed_2, ValueError)
+    assert ok_3[:, 0].tolist() == [8.0, 9.0]
+    # un lote en vuelo por worker
+    assert running["max"] <= 2
@@ -0,0 +1,50 @@
+from src.infra.dbs.cache import SqliteCache, make_cache_key
+
+
+def test_cache_roundtrip_and_counters(tmp_path):
+    cache = SqliteCache(tmp_path / "cache.sqlite")
+    key = make_cache_key("groq", "model", "system", "user", 0.1)
+
+    assert cache.get(key) is None
+    cache.set(key, {"items": [{"limits": ["0", "3"], "summary": "ok"}]})
+    assert cache.get(key) == {"items": [{"limits": ["0", "3"], "summary": "ok"}]}
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["entries"] == 1
+
+
+def test_cache_evicts_least_recently_used(tmp_path, monkeypatch):
+    # reloj congelado: el orden LRU no puede depender de la resolución de time.time
+    monkeypatch.setattr("src.infra.dbs.cache.time.time", lambda: 1_700_000_000.0)
+    cache = SqliteCache(tmp_path / "cache.sqlite", max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")  # "b" pasa a ser el menos usado
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_cache_byte_limit_uses_the_size_left_after_count_eviction(tmp_path, monkeypatch):
+    monkeypatch.setattr("src.infra.dbs.cache.time.time", lambda: 1_700_000_000.0)
+    # cada valor "xxxxxxxx" ocupa 10 bytes en JSON
+    cache = SqliteCache(tmp_path / "cache.sqlite", max_entries=2, max_bytes=60)
+    cache.set("a", "x" * 48)  # 50 bytes
+    cache.set("b", "x" * 8)
+    cache.set("c", "x" * 8)
+
+    # el límite por cantidad saca "a"; con eso "b" y "c" (20 bytes) ya entran
+    # y el límite por bytes no debe sacar nada más
+    assert cache.get("a") is None
+    assert cache.get("b") == "x" * 8
+    assert cache.get("c") == "x" * 8
+
+
+def test_cache_ttl(tmp_path):
+    cache = SqliteCache(tmp_path / "cache.sqlite", ttl_seconds=-1)
+    cache.set("a", 1)
+    assert cache.get("a") is None
@@ -0,0 +1,67 @@
+import asyncio
+import pytest
+
+pytest.importorskip("httpx")
+pytest.importorskip("requests")
+np = pytest.importorskip("numpy")
+
+from src.infra.clients.embedding import AsyncEmbedder, decode_vectors
+
+
+def test_async_embedder_groups_calls_within_window():
+    batches = []
+
+    async def fake_get_vectors(texts):
+        batches.append(list(texts))
+        return np.array([[float(len(text))] for text in texts], dtype=np.float32)
+
+    async def run():
+        async with AsyncEmbedder("http://embedder", batch_window_ms=5) as embedder:
+            embedder.get_vectors = fake_get_vectors
+            return await asyncio.gather(
+                *(embedder.get_vector(text) for text in ["a", "bb", "ccc"])
+            )
+
+    assert asyncio.run(run()) == [[1.0], [2.0], [3.0]]
+    assert batches == [["a", "bb", "ccc"]]
+
+
+def test_async_embedder_full_batch_restarts_the_window():
+    batches = []
+
+    async def fake_get_vectors(texts):
+        batches.append((list(texts), asyncio.get_running_loop().time()))
+        return np.array([[float(len(text))] for text in texts], dtype=np.float32)
+
+    async def run():
+        async with AsyncEmbedder(
+            "http://embedder", batch_window_ms=50, max_batch_size=2
+        ) as embedder:
+            embedder.get_vectors = fake_get_vectors
+            first = [asyncio.create_task(embedder.get_vector(t)) for t in ["a", "bb"]]
+            await asyncio.sleep(0.03)
+            # llega después del lote lleno: su ventana arranca recién ahora
+            late = asyncio.create_task(embedder.get_vector("ccc"))
+            await asyncio.sleep(0.03)
+            pending_at_60ms = not late.done()
+            return await asyncio.gather(*first, late), pending_at_60ms
+
+    results, pending_at_60ms = asyncio.run(run())
+    assert results == [[1.0], [2.0], [3.0]]
+    assert [texts for texts, _ in batches] == [["a", "bb"], ["ccc"]]
+    assert pending_at_60ms
+    # ventana completa de "ccc" (llegó a los ~30 ms): no sale a los 50 ms del temporizador viejo
+    assert batches[1][1] - batches[0][1] >= 0.065
+
+
+def test_decode_vectors_reads_binary_body():
+    matrix = np.arange(6, dtype="<f2").reshape(2, 3)
+    headers = {
+        "content-type": "application/octet-stream",
+        "x-vector-shape": "2,3",
+        "x-vector-dtype": "float16",
+    }
+
+    decoded = decode_vectors(matrix.tobytes(), headers)
+    assert decoded.shape == (2, 3)
+    assert decoded.tolist() == matrix.tolist()
@@ -0,0 +1,43 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from src.api.embedding_cache import EmbeddingCache, normalize_text
+
+
+def test_normalize_text_keeps_case():
+    assert normalize_text("  Hola\n  mundo ") == "Hola mundo"
+    assert normalize_text("Hola") != normalize_text("hola")
+
+
+def test_cache_lru_and_persistence(tmp_path):
+    path = str(tmp_path / "embeddings")
+    cache = EmbeddingCache(dimension=2, capacity=2, path=path)
+    cache.store(["a", "b"], np.array([[1, 1], [2, 2]], dtype=np.float32))
+    cache.lookup(["a"])  # "b" pasa a ser el menos usado
+    cache.store(["c"], np.array([[3, 3]], dtype=np.float32))
+
+    vectors, missing = cache.lookup(["a  ", "b", "c"])
+    assert missing == [1]
+    assert vectors[[0, 2]].tolist() == [[1, 1], [3, 3]]
+    cache.flush()
+
+    reopened = EmbeddingCache(dimension=2, capacity=2, path=path)
+    vectors, missing = reopened.lookup(["a", "c"])
+    assert missing == []
+    assert vectors.tolist() == [[1, 1], [3, 3]]
+
+
+def test_persisted_vectors_are_not_shared_across_models(tmp_path):
+    path = str(tmp_path / "embeddings")
+    cache = EmbeddingCache(dimension=2, capacity=2, path=path, namespace="model-a")
+    cache.store(["a"], np.array([[1, 1]], dtype=np.float32))
+    cache.flush()
+
+    other_model = EmbeddingCache(dimension=2, capacity=2, path=path, namespace="model-b")
+    _, missing = other_model.lookup(["a"])
+    assert missing == [0]
+
+    same_model = EmbeddingCache(dimension=2, capacity=2, path=path, namespace="model-a")
+    _, missing = same_model.lookup(["a"])
+    assert missing == []
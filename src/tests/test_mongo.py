@@ -0,0 +1,121 @@
+from dataclasses import dataclass
+from datetime import datetime
+import pytest
+
+pytest.importorskip("pymongo")
+
+from pymongo import IndexModel
+from pymongo.errors import BulkWriteError, OperationFailure
+from src.infra.dbs.interfaces import DuplicateEntityError
+from src.infra.dbs.mongo import (
+    MongoRepository,
+    build_projection,
+    decode_cursor,
+    encode_cursor,
+    keyset_filter,
+)
+
+
+def test_cursor_round_trips_the_last_key():
+    created_at = datetime(2026, 3, 1, 12, 30, 15, 123000)
+    cursor = encode_cursor({"_id": "a1|b2", "created_at": created_at})
+
+    assert decode_cursor(cursor) == (created_at, "a1|b2")
+    assert keyset_filter(created_at, "a1|b2") == {
+        "$or": [
+            {"created_at": {"$lt": created_at}},
+            {"created_at": created_at, "_id": {"$lt": "a1|b2"}},
+        ]
+    }
+
+
+@pytest.mark.parametrize("cursor", ["not base64!", "bm8tc2VwYXJhdG9y", "eHx5"])
+def test_malformed_cursor_is_a_value_error(cursor):
+    with pytest.raises(ValueError, match="Cursor"):
+        decode_cursor(cursor)
+
+
+@pytest.mark.parametrize("limit", [0, -1, -5])
+def test_find_page_rejects_non_positive_limits(limit):
+    # se rechaza antes de tocar la colección (limit(0) sería "sin límite")
+    repo = MongoRepository({"db": {"tasks": None}}, "db", "tasks", dict)
+    with pytest.raises(ValueError, match="limit"):
+        repo.find_page(limit=limit)
+
+
+def test_projection_always_keeps_the_cursor_key():
+    assert build_projection(None) is None
+    assert build_projection(["id", "status", "payload.output_filename"]) == {
+        "status": 1,
+        "payload.output_filename": 1,
+        "created_at": 1,
+    }
+
+
+@dataclass
+class Item:
+    output_filename: str
+    id: str
+
+
+class FailingCollection:
+    """Collection whose writes fail with the given pymongo error."""
+
+    name = "items"
+
+    def __init__(self, error):
+        self.error = error
+        self.calls = []
+
+    def bulk_write(self, requests, ordered=True):
+        self.calls.append(("bulk_write", len(requests), ordered))
+        raise self.error
+
+    def create_indexes(self, indexes):
+        self.calls.append(("create_indexes", [index.document for index in indexes]))
+        raise self.error
+
+
+def make_repo(collection, indexes=None):
+    return MongoRepository(
+        {"db": {"items": collection}}, "db", "items", Item, indexes=indexes
+    )
+
+
+def bulk_write_error(*codes):
+    errors = [
+        {"index": index, "code": code, "keyValue": {"output_filename": f"f{index}"}}
+        for index, code in codes
+    ]
+    return BulkWriteError({"writeErrors": errors, "nInserted": 3 - len(errors)})
+
+
+def test_add_many_maps_duplicate_keys_to_positions():
+    collection = FailingCollection(bulk_write_error((2, 11000), (0, 11000)))
+    items = [Item(f"f{i}", f"id-{i}") for i in range(3)]
+
+    with pytest.raises(DuplicateEntityError) as error:
+        make_repo(collection).add_many(items)
+
+    assert error.value.positions == [0, 2]
+    assert error.value.key == {"output_filename": "f2"}
+    assert collection.calls == [("bulk_write", 3, False)]
+
+
+def test_add_many_keeps_other_write_errors():
+    # un error que no es de clave duplicada no se disfraza de validación
+    collection = FailingCollection(bulk_write_error((0, 11000), (1, 121)))
+    items = [Item(f"f{i}", f"id-{i}") for i in range(3)]
+
+    with pytest.raises(BulkWriteError):
+        make_repo(collection).add_many(items)
+
+
+def test_ensure_indexes_creates_declared_indexes_and_survives_failures():
+    unique = IndexModel([("output_filename", 1)], unique=True)
+    collection = FailingCollection(OperationFailure("E11000 duplicate key", 11000))
+
+    make_repo(collection, indexes=[unique]).ensure_indexes()
+    make_repo(collection).ensure_indexes()  # sin índices declarados no llama a Mongo
+
+    assert collection.calls == [("create_indexes", [unique.document])]
@@ -1,4 +1,10 @@
 from src.domain.discovery.parser import parse_vtt, format_to_text_block
+from src.domain.discovery.parser import split_into_windows, parse_raw_vtt, parse_vtt_
+from src.domain.discovery.parser import parse_discovery_results
+from src.domain.discovery.parser import group_when_starts_with_uppercase
+from src.domain.discovery.parser import group_by_duration
+from src.domain.discovery.parser import group_when_starts_with_connector
+from src.domain.discovery.models import TextSegment
 from src.config import TEST_DATA_DIR
 from pathlib import Path
 
@@ -28,7 +34,7 @@ expected_result = [
 
 
 def test_parse_vtt():
-    result = parse_vtt(test_vtts[0])
+    result = [seg.to_dict() for seg in parse_vtt(test_vtts[0])]
     # result = format_to_text_block(result)
     # test mapped structured
     assert "start" in result[0].keys()
@@ -37,3 +43,97 @@ def test_parse_vtt():
 
     # test expected output
     assert result == expected_result
+
+
+def test_split_into_windows_overlaps_and_covers_all():
+    segments = [{"start": "", "end": "", "text": "x" * 40} for _ in range(30)]
+    windows = split_into_windows(segments, max_tokens=60, overlap=2)
+
+    assert windows[0][0] == 0
+    assert windows[-1][0] + len(windows[-1][1]) == len(segments)
+    for (prev_offset, prev), (offset, _) in zip(windows, windows[1:]):
+        # cada ventana arranca dentro de la anterior (solape) y siempre avanza
+        assert prev_offset < offset <= prev_offset + len(prev)
+
+
+auto_captions_vtt = """WEBVTT
+Kind: captions
+Language: es
+
+00:01:56.190 --> 00:01:58.430 align:start position:0%
+ 
+Estamos<00:01:56.200><c> causa.</c>
+
+00:01:58.430 --> 00:01:58.440 align:start position:0%
+Estamos causa.
+ 
+
+00:01:58.440 --> 00:02:02.630 align:start position:0%
+Estamos causa.
+llegamos a Mecausa.
+"""
+
+
+def test_iter_raw_vtt_keeps_only_new_lines(tmp_path):
+    vtt_path = tmp_path / "auto.vtt"
+    vtt_path.write_text(auto_captions_vtt, encoding="utf-8")
+
+    result = parse_raw_vtt(vtt_path)
+    assert result == [
+        {"start": "00:01:56.190", "end": "00:01:58.430", "text": "Estamos causa."},
+        {"start": "00:01:58.440", "end": "00:02:02.630", "text": "llegamos a Mecausa."},
+    ]
+    # "llegamos" no empieza en mayúscula: se agrupa con el segmento anterior
+    assert parse_vtt_(vtt_path) == [
+        {
+            "start": "00:01:56.190",
+            "end": "00:02:02.630",
+            "text": "Estamos causa. llegamos a Mecausa.",
+        }
+    ]
+
+
+def test_text_segment_keeps_milliseconds():
+    seg = TextSegment.from_dict(
+        {"start": "00:01:56.190", "end": "00:01:58.429", "text": "Llegamos."}
+    )
+    assert (seg.start_ms, seg.end_ms) == (116190, 118429)
+    assert seg.duration == 2.24
+    assert seg.to_dict() == {
+        "start": "00:01:56.190",
+        "end": "00:01:58.429",
+        "text": "Llegamos.",
+    }
+
+
+def test_parse_discovery_results_rounds_segments():
+    moments = [{"start": "00:01:56.190", "end": "00:02:21.000", "text": "x", "score": 0.9}]
+    result = parse_discovery_results(moments, prefix="ep01", url="https://x")
+
+    assert result[0]["start_segment"] == "00:01:56"
+    assert result[0]["end_segment"] == "00:02:21"
+    assert result[0]["duration"] == 24.81
+    assert result[0]["output_filename"] == "ep01_00"
+
+
+def test_group_functions_do_not_mutate_input():
+    segments = [
+        {"start": "00:00:00.000", "end": "00:00:10.000", "text": "Hola"},
+        {"start": "00:00:10.000", "end": "00:00:20.000", "text": "que tal."},
+        {"start": "00:00:20.000", "end": "00:01:40.000", "text": "Otro tema."},
+    ]
+    snapshot = [dict(seg) for seg in segments]
+
+    assert group_when_starts_with_uppercase(segments) == [
+        {"start": "00:00:00.000", "end": "00:00:20.000", "text": "Hola que tal."},
+        {"start": "00:00:20.000", "end": "00:01:40.000", "text": "Otro tema."},
+    ]
+    # 20s + 80s se pasa de 90s: el último segmento queda solo
+    assert [seg["end"] for seg in group_by_duration(segments)] == [
+        "00:00:20.000",
+        "00:01:40.000",
+    ]
+    assert group_when_starts_with_connector(
+        [{**segments[0], "text": "Hola."}, {**segments[1], "text": "Pero no."}]
+    ) == [{"start": "00:00:00.000", "end": "00:00:20.000", "text": "Hola. Pero no."}]
+    assert segments == snapshot
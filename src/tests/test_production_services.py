@@ -0,0 +1,136 @@
+from datetime import datetime
+import pytest
+
+pytest.importorskip("requests")
+pytest.importorskip("pymongo")
+
+from src.infra.dbs.interfaces import DuplicateEntityError, IRepository
+from src.infra.dbs.mongo import MongoRepository
+from src.services.production.download_service import (
+    LAST_DOWNLOAD_FIELDS,
+    DownloadService,
+    DownloadValidationError,
+)
+from src.domain.download.models import Download
+
+
+class UniqueFilenameRepo(IRepository):
+    """Keeps documents in memory with the same unique key as the Mongo index."""
+
+    def __init__(self):
+        self.items = {}
+
+    def get_all(self):
+        return list(self.items.values())
+
+    def get_by_id(self, entity_id):
+        return next((i for i in self.items.values() if i.id == entity_id), None)
+
+    def delete(self, entity_id):
+        item = self.get_by_id(entity_id)
+        if item is None:
+            return False
+        del self.items[item.output_filename]
+        return True
+
+    def add(self, entity):
+        if entity.output_filename in self.items:
+            raise DuplicateEntityError("duplicate", {"output_filename": entity.output_filename})
+        self.items[entity.output_filename] = entity
+        return entity
+
+    def exists_by_filename(self, filename):
+        return filename in self.items
+
+    def delete_by_filename(self, filename):
+        return self.items.pop(filename, None) is not None
+
+
+def test_second_insert_of_a_validated_download_is_a_validation_error():
+    service = DownloadService(UniqueFilenameRepo())
+    params = {
+        "url": "https://youtu.be/x",
+        "start_segment": "00:00:01",
+        "end_segment": "00:00:09",
+        "output_filename": "clip",
+        "file_type": "vtt",
+    }
+
+    # dos requests que pasan validate antes de que cualquiera inserte
+    service.validate(params)
+    service.validate(params)
+    service.project(params)
+    with pytest.raises(DownloadValidationError, match="clip"):
+        service.project(params)
+
+
+def test_project_many_skips_taken_filenames_and_release_frees_them():
+    service = DownloadService(UniqueFilenameRepo())
+    service.project_many([{"url": "u", "start_segment": "0", "end_segment": "1", "output_filename": "a"}])
+
+    # los resultados de discovery traen campos extra (score, text, ...)
+    payloads = [
+        {"url": "u", "start_segment": "0", "end_segment": "1", "output_filename": name, "score": 0.9}
+        for name in ["a", "b", "b"]
+    ]
+    first, second, third = service.project_many(payloads)
+    assert first is None and third is None
+    assert second.output_filename == "b"
+
+    # el trigger falló: la reserva se libera y el reintento vuelve a pasar
+    service.release([second.id])
+    assert service.project_many(payloads[1:2])[0].output_filename == "b"
+
+
+def test_release_filename_frees_the_reservation_of_a_failed_task():
+    service = DownloadService(UniqueFilenameRepo())
+    params = {"url": "u", "start_segment": "0", "end_segment": "1", "output_filename": "clip"}
+    service.project(params)
+
+    # el worker reportó FAILED: el mismo output_filename vuelve a validar
+    service.release_filename("clip")
+    service.validate(params)
+    assert service.project(params).output_filename == "clip"
+
+
+class SortedCollection:
+    """find_one over a list: applies the sort and projection it receives."""
+
+    def __init__(self, docs):
+        self.docs = docs
+
+    def find_one(self, query, projection=None, sort=None):
+        docs = [dict(doc) for doc in self.docs]
+        for key, direction in reversed(sort or []):
+            docs.sort(key=lambda doc: doc[key], reverse=direction < 0)
+        if not docs:
+            return None
+        doc = docs[0]
+        if projection is None:
+            return doc
+        return {k: v for k, v in doc.items() if k == "_id" or k in projection}
+
+
+def test_last_download_is_the_newest_one_with_only_the_form_fields():
+    docs = [
+        {
+            "_id": f"id-{day}",
+            "url": f"https://youtu.be/{day}",
+            "start_segment": "00:00:01",
+            "end_segment": "00:00:09",
+            "output_filename": f"clip-{day}",
+            "file_type": "vtt",
+            "force_download": False,
+            "created_at": datetime(2026, 1, day),
+        }
+        for day in (3, 10, 7)
+    ]
+    repo = MongoRepository(
+        {"db": {"downloads": SortedCollection(docs)}}, "db", "downloads", Download
+    )
+
+    last = DownloadService(repo).get_last_download()
+
+    assert last["id"] == "id-10"
+    assert last["url"] == "https://youtu.be/10"
+    assert set(last) == {*LAST_DOWNLOAD_FIELDS, "id", "created_at"}
@@ -0,0 +1,31 @@
+from src.infra.clients.ratelimit import RateLimiter, TokenBucket, parse_reset_seconds
+
+
+def test_parse_reset_seconds():
+    assert parse_reset_seconds("7.66s") == 7.66
+    assert round(parse_reset_seconds("2m59.56s"), 2) == 179.56
+    assert parse_reset_seconds("120ms") == 0.12
+    assert parse_reset_seconds("30") == 30.0
+    assert parse_reset_seconds(None) is None
+
+
+def test_bucket_waits_only_when_exhausted():
+    bucket = TokenBucket(capacity=60, period_seconds=60)  # 1 unit/s
+    assert bucket.reserve(60, now=bucket.updated) == 0.0
+    assert bucket.reserve(2, now=bucket.updated) == 2.0
+
+
+def test_limiter_syncs_with_headers():
+    limiter = RateLimiter("test", requests_per_minute=30, tokens_per_minute=6000)
+    assert limiter._reserve({"requests": 1, "tokens": 100}) == 0.0
+
+    limiter.update_from_headers(
+        {"x-ratelimit-remaining-tokens": "0", "x-ratelimit-reset-tokens": "5s"}
+    )
+    assert 4.0 < limiter._reserve({"requests": 1}) <= 5.0
+
+
+def test_limiter_retry_after():
+    limiter = RateLimiter("test", requests_per_minute=30)
+    limiter.update_from_headers({"retry-after": "3"})
+    assert 2.0 < limiter._reserve({"requests": 1}) <= 3.0
@@ -0,0 +1,56 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from src.domain.discovery.models import TextSegment
+from src.domain.discovery.scoring import score_candidates
+from src.infra.dbs.numpy_index import NumpyVectorIndex
+
+
+class FakeEmbedder:
+    vector_size = 3
+    vocabulary = ["risa", "fútbol", "política"]
+
+    def get_vectors(self, texts):
+        # un eje por palabra clave: similitud coseno fácil de razonar
+        return np.array(
+            [[float(word in text) for word in self.vocabulary] for text in texts]
+        )
+
+
+def test_numpy_index_scores_candidates_by_gold_samples():
+    index = NumpyVectorIndex(FakeEmbedder())
+    added = index.add_many(
+        [
+            {"id": "1", "text": "risa", "metadata": {"filename": "gold_01"}},
+            {"id": "2", "text": "risa y fútbol", "metadata": {"filename": "gold_02"}},
+            {"id": "1", "text": "risa", "metadata": {"filename": "gold_01"}},
+        ]
+    )
+    assert added == 2
+
+    candidates = [
+        TextSegment("hablamos de política", 0, 80_000),
+        TextSegment("pura risa", 80_000, 160_000),
+    ]
+    result = score_candidates(candidates, index, limit=1)
+
+    assert [item["text"] for item in result] == ["pura risa", "hablamos de política"]
+    assert result[0]["score"] == 1.0
+    assert result[0]["matches"] == ["gold_01"]
+    assert result[1]["score"] == 0.0
+
+
+def test_numpy_index_applies_payload_filters():
+    index = NumpyVectorIndex(FakeEmbedder())
+    index.add_many(
+        [
+            {"id": "1", "text": "risa", "metadata": {"show": "a", "duration": 30.0}},
+            {"id": "2", "text": "risa", "metadata": {"show": "b", "duration": 90.0}},
+        ]
+    )
+
+    [response] = index.search_batch(["risa"], limit=5, filter={"show": "b"})
+    assert [p.id for p in response.points] == ["2"]
+    [response] = index.search_batch(["risa"], limit=5, filter={"duration": {"lte": 60}})
+    assert [p.id for p in response.points] == ["1"]
@@ -0,0 +1,35 @@
+import pytest
+
+pytest.importorskip("groq")
+pytest.importorskip("deepgram")
+
+from src.infra.clients import transcription
+from src.infra.clients.transcription import CachedTranscriber
+from src.infra.dbs.cache import SqliteCache
+
+
+class FakeTranscriber:
+    name = "fake"
+    model = "fake-1"
+
+    def __init__(self):
+        self.calls = 0
+
+    def transcribe(self, file_path):
+        self.calls += 1
+        return {"text": "Hola.", "segments": []}
+
+
+def test_cached_transcriber_skips_upload_for_same_audio(tmp_path, monkeypatch):
+    # el mismo audio con otro nombre produce el mismo hash
+    monkeypatch.setattr(transcription, "hash_audio", lambda path: "same-audio")
+    first, renamed = tmp_path / "a.mp4", tmp_path / "b.mp4"
+    first.write_bytes(b"")
+    renamed.write_bytes(b"")
+
+    inner = FakeTranscriber()
+    transcriber = CachedTranscriber(inner, SqliteCache(tmp_path / "t.sqlite"))
+
+    assert transcriber.transcribe(str(first)) == {"text": "Hola.", "segments": []}
+    assert transcriber.transcribe(str(renamed)) == {"text": "Hola.", "segments": []}
+    assert inner.calls == 1
@@ -0,0 +1,56 @@
+import pytest
+
+pd = pytest.importorskip("pandas")
+
+from src.domain.discovery.transcription import gen_video_transcriptions_concurrent
+
+
+def test_concurrent_transcriptions_resume_from_csv(tmp_path):
+    for name in ["a", "b", "c"]:
+        (tmp_path / f"{name}.mp4").write_bytes(b"")
+    pd.DataFrame(
+        {"filename": ["a", "b", "c"], "transcription": ["Ya estaba.", "", ""]}
+    ).to_csv(tmp_path / "metadata.csv", index=False)
+
+    calls = []
+
+    def fake_transcriber(file_path):
+        calls.append(file_path)
+        return {"text": "Hola.", "segments": [{"start": 0, "end": 30, "text": "Hola."}]}
+
+    stats = gen_video_transcriptions_concurrent(
+        tmp_path, [fake_transcriber, fake_transcriber]
+    )
+
+    df = pd.read_csv(tmp_path / "metadata.csv")
+    assert df["transcription"].tolist() == ["Ya estaba.", "Hola.", "Hola."]
+    assert len(calls) == 2  # "a" ya tenía texto
+    assert stats["done"] == 2
+    assert stats["audio_seconds"] == 60
+
+
+def test_concurrent_transcriptions_save_in_checkpoints(tmp_path, monkeypatch):
+    import src.domain.discovery.transcription as transcription
+
+    for i in range(5):
+        (tmp_path / f"{i}.mp4").write_bytes(b"")
+    saves = []
+    real_save = transcription.save_metadata
+    monkeypatch.setattr(
+        transcription,
+        "save_metadata",
+        lambda df, path: saves.append(len(df)) or real_save(df, path),
+    )
+
+    gen_video_transcriptions_concurrent(
+        tmp_path,
+        [lambda path: {"text": "Hola.", "segments": []}],
+        workers_per_transcriber=1,
+        save_every=2,
+        save_interval_seconds=3600,
+    )
+
+    # cada 2 resultados + el guardado final, no uno por archivo
+    assert len(saves) == 3
+    df = pd.read_csv(tmp_path / "metadata.csv")
+    assert df["transcription"].tolist() == ["Hola."] * 5
@@ -1,6 +1,6 @@
 import traceback
 from prefect import flow, tags
-#from infra.context.gen import metal_detector
+from src.infra.context.discovery import run_discovery
 from src.config import WEBHOOK_URI
 import httpx
 
@@ -41,8 +41,8 @@ def discovery(task_id: str, data: dict):
     print(f"--- [WORKER] Iniciando proceso de: {data.get("output_filename")}---")
 
     try:
-        #metal_detector.run(data)
-        print("not implemented")
+        output_path = run_discovery(data)
+        print(f"Resultados guardados en: {output_path}")
 
         print(f"--- [WORKER] Finalizado con éxito: {data.get("output_filename")}---")
 
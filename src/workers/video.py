@@ -1,6 +1,6 @@
 import traceback
 from prefect import flow, tags
-from src.infra.context.video import vb4 as video_builder
+from src.infra.context.video import build_v1
 from src.config import WEBHOOK_URI
 import httpx
 
@@ -41,7 +41,7 @@ async def video_build(task_id: str, data: dict):
     print(f"--- [WORKER] Iniciando proceso de: {data.get("output_filename")} ---")
 
     try:
-        await video_builder.run_async(params=data)
+        await build_v1(params=data, task_id=task_id)
 
         print(f"--- [WORKER] Finalizado con éxito: {data.get("output_filename")} ---")
 